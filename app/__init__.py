@@ -10,34 +10,95 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # SQLite under a threaded server: wait for locks instead of failing with
+    # "database is locked", share connections across threads, and pool one
+    # connection per server thread plus a few for the background workers.
+    # Pooled connections stay open, so their page cache and mmap are reused
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if uri.startswith('sqlite') and uri not in ('sqlite://', 'sqlite:///:memory:'):
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        connect_args = dict(options.get('connect_args') or {})
+        connect_args.setdefault('timeout', app.config.get('SQLITE_BUSY_TIMEOUT', 30))
+        connect_args.setdefault('check_same_thread', False)
+        options['connect_args'] = connect_args
+        options.setdefault('pool_size', app.config.get('SERVER_THREADS', 8) + 4)
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
     db.init_app(app)
     migrate.init_app(app, db)
 
+    # Cached query results of this app (see app/services/cache.py)
+    from app.services.cache import CacheStore
+    app.extensions['query_cache'] = CacheStore()
+
+    from app.services import sqlite_tuning
+    with app.app_context():
+        sqlite_tuning.configure_engine(db.engine, app.config)
+        if db.engine.dialect.name == 'sqlite' and app.config.get('SQLITE_MAINTENANCE_INTERVAL'):
+            app.extensions['sqlite_maintenance'] = sqlite_tuning.SQLiteMaintenance(
+                db.engine,
+                interval=app.config['SQLITE_MAINTENANCE_INTERVAL']
+            )
+
     from app.main.routes import main as main_bp
     app.register_blueprint(main_bp)
 
+    from app.services.activity_log import ActivityLogWriter, should_log
+    if app.config.get('ACTIVITY_LOG_BUFFERED', True):
+        from app.models import ActivityLog
+        with app.app_context():
+            app.extensions['activity_log'] = ActivityLogWriter(
+                db.engine,
+                ActivityLog.__table__,
+                batch_size=app.config.get('ACTIVITY_LOG_BATCH_SIZE', 100),
+                flush_interval=app.config.get('ACTIVITY_LOG_FLUSH_INTERVAL', 2.0),
+                max_retries=app.config.get('ACTIVITY_LOG_MAX_RETRIES', 5),
+                logger=app.logger
+            )
+
+    # The export job manager starts with the first export (see
+    # app.services.export_jobs.get_export_jobs)
+
+    from app.services import columnar_export
+    if app.config.get('ANALYTICS_SNAPSHOT_DIR'):
+        if columnar_export.available():
+            app.extensions['analytics_snapshot'] = columnar_export.AnalyticsSnapshotWriter(
+                app,
+                app.config['ANALYTICS_SNAPSHOT_DIR'],
+                interval=app.config.get('ANALYTICS_SNAPSHOT_INTERVAL', 60)
+            )
+        else:
+            app.logger.warning("ANALYTICS_SNAPSHOT_DIR is set but pyarrow is not installed.")
+
+    @app.before_request
+    def sync_query_cache():
+        # Commits of other processes (CLI commands) never reach the commit
+        # hook below; drop the results they made stale before serving
+        if request.endpoint != 'static':
+            app.extensions['query_cache'].sync(db.session)
+
     @app.before_request
     def log_activity():
+        if not should_log(request.path, request.method,
+                          app.config.get('ACTIVITY_LOG_EXCLUDE_PREFIXES', ()),
+                          app.config.get('ACTIVITY_LOG_EXCLUDE_METHODS', ())):
+            return
+
+        action = f"{request.method} {request.path}"
+        writer = app.extensions.get('activity_log')
+        if writer:
+            # Queued and written in batches by the background writer
+            writer.enqueue(action, request.remote_addr)
+            return
+
         from app.models import ActivityLog
-        # Log all activity globally
-        log = ActivityLog(
-            action=f"{request.method} {request.path}",
-            ip_address=request.remote_addr
-        )
+        log = ActivityLog(action=action, ip_address=request.remote_addr)
         db.session.add(log)
         db.session.commit()
 
     from app.accounts.routes import accounts as accounts_bp
     app.register_blueprint(accounts_bp, url_prefix='/accounts')
 
-    @app.context_processor
-    def inject_global_data():
-        from app.models import Account, Category
-        return {
-            'global_accounts': Account.query.all(),
-            'global_categories': Category.query.all()
-        }
-
     from app.transactions.routes import transactions as transactions_bp
     app.register_blueprint(transactions_bp, url_prefix='/transactions')
 
@@ -58,23 +119,40 @@ def create_app(config_class=Config):
 
     @app.context_processor
     def inject_global_data():
-        from app.models import Account, Category, Profile
-        current_profile = Profile.query.filter_by(is_active=True).first()
-        if not current_profile and Profile.query.count() > 0:
+        from app.models import Profile
+        from app.services.category_tree import get_category_tree
+        from app.services.profile_service import (get_current_profile, get_profile_accounts,
+                                                  get_all_categories, get_all_profiles)
+        current_profile = get_current_profile()
+        if not current_profile and get_all_profiles():
             current_profile = Profile.query.first()
             current_profile.is_active = True
             db.session.commit()
         
         return {
-            'global_accounts': Account.query.filter_by(profile_id=current_profile.id).all() if current_profile else [],
-            'global_categories': Category.query.all(),
+            'global_accounts': get_profile_accounts(current_profile.id) if current_profile else [],
+            'global_categories': get_all_categories(),
+            'global_category_tree': get_category_tree(current_profile.id) if current_profile else [],
             'current_profile': current_profile,
-            'all_profiles': Profile.query.all()
+            'all_profiles': get_all_profiles()
         }
 
+    from app.commands import (rollup_cli, category_tree_cli, currency_cli, ledger_cli, analytics_cli,
+                              check_query_plans_command, bootstrap_command)
+    app.cli.add_command(rollup_cli)
+    app.cli.add_command(category_tree_cli)
+    app.cli.add_command(currency_cli)
+    app.cli.add_command(ledger_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(bootstrap_command)
+
     # Database Change Notifications
     from sqlalchemy import event
-    from app.services.telegram_service import TelegramService
+    from app.services.backup_service import BackupWorker
+    from app.services.changelog import capture_row, read_tracked_rows
+    from app.services.cache import stamp_tables
+    from app.services.profile_service import forget_current_profile
     import os
 
     def get_db_path():
@@ -90,12 +168,36 @@ def create_app(config_class=Config):
             return db_path
         return None
 
+    token = app.config.get('TELEGRAM_BOT_TOKEN')
+    chat_id = app.config.get('TELEGRAM_CHAT_ID')
+    db_path = get_db_path()
+    if token and chat_id and db_path:
+        app.extensions['backup_worker'] = BackupWorker(
+            token,
+            chat_id,
+            db_path,
+            api_url=app.config.get('TELEGRAM_API_URL'),
+            connectivity_url=app.config.get('TELEGRAM_CONNECTIVITY_URL'),
+            debounce=app.config.get('BACKUP_DEBOUNCE_SECONDS', 10.0),
+            max_retries=app.config.get('BACKUP_MAX_RETRIES', 5),
+            backoff=app.config.get('BACKUP_RETRY_BACKOFF', 2.0),
+            compression=app.config.get('BACKUP_COMPRESSION', 'gzip'),
+            mode=app.config.get('BACKUP_MODE', 'full'),
+            full_interval=app.config.get('BACKUP_FULL_INTERVAL_HOURS', 24) * 3600
+        )
+
     @event.listens_for(db.session, 'after_flush')
     def receive_after_flush(session, flush_context):
         # Prevent recursion if we're logging activity
         if getattr(session, '_in_notification', False):
             return
 
+        # Remember which tables this transaction touched for cache invalidation
+        if not hasattr(session, '_touched_tables'):
+            session._touched_tables = set()
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            session._touched_tables.add(obj.__table__.name)
+
         changes = []
         for obj in session.new:
             changes.append(f"Created: {type(obj).__name__}")
@@ -109,15 +211,80 @@ def create_app(config_class=Config):
                 session._pending_changes = []
             session._pending_changes.extend(changes)
 
+        # Row-level changelog for incremental backups
+        worker = app.extensions.get('backup_worker')
+        if worker and worker.incremental:
+            dialect = session.get_bind().dialect
+            rows = [capture_row(obj, 'insert', dialect) for obj in session.new]
+            rows += [capture_row(obj, 'update', dialect) for obj in session.dirty if session.is_modified(obj)]
+            rows += [capture_row(obj, 'delete', dialect) for obj in session.deleted]
+            if rows:
+                if not hasattr(session, '_pending_rows'):
+                    session._pending_rows = []
+                session._pending_rows.extend(rows)
+
+    @event.listens_for(db.session, 'do_orm_execute')
+    def receive_orm_execute(orm_execute_state):
+        # Bulk INSERT/UPDATE/DELETE statements bypass the flush, so their rows
+        # can't go into a delta; make the next backup a full snapshot instead
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            session = orm_execute_state.session
+            if not orm_execute_state.execution_options.get('changelog_tracked'):
+                session._pending_full_backup = True
+            if not hasattr(session, '_touched_tables'):
+                session._touched_tables = set()
+            session._touched_tables.add(orm_execute_state.statement.table.name)
+
+    @event.listens_for(db.session, 'before_commit')
+    def receive_before_commit(session):
+        # Rows changed by tracked Core statements (rollups, balance updates)
+        # are re-read last so they win over stale ORM state in the delta
+        if getattr(session, '_tracked_rows', None):
+            worker = app.extensions.get('backup_worker')
+            if worker and worker.incremental:
+                session.flush()
+                if not hasattr(session, '_pending_rows'):
+                    session._pending_rows = []
+                session._pending_rows.extend(read_tracked_rows(session, db.metadata))
+            session._tracked_rows = []
+
+        # Stamp the touched tables in the same transaction, so other
+        # processes see which of their cached results this commit outdates
+        session.flush()
+        if getattr(session, '_touched_tables', None):
+            stamp_tables(session, session._touched_tables)
+
+    @event.listens_for(db.session, 'after_rollback')
+    def receive_after_rollback(session):
+        session._pending_changes = []
+        session._pending_rows = []
+        session._tracked_rows = []
+        session._pending_full_backup = False
+        session._touched_tables = set()
+
     @event.listens_for(db.session, 'after_commit')
     def receive_after_commit(session):
+        if getattr(session, '_touched_tables', None):
+            app.extensions['query_cache'].invalidate_tables(session._touched_tables)
+            if 'profile' in session._touched_tables:
+                forget_current_profile()
+            session._touched_tables = set()
+
         if getattr(session, '_skip_notification', False):
             session._skip_notification = False # Reset for next use
             return
 
-        if hasattr(session, '_pending_changes') and session._pending_changes:
-            changes_text = "\n".join(set(session._pending_changes))
+        force_full = getattr(session, '_pending_full_backup', False)
+        if getattr(session, '_pending_changes', None) or force_full:
+            changes = getattr(session, '_pending_changes', None) or ["Bulk update"]
+            rows = getattr(session, '_pending_rows', [])
             session._pending_changes = []
+            session._pending_rows = []
+            session._pending_full_backup = False
+
+            worker = app.extensions.get('backup_worker')
+            if not worker:
+                return
             
             # Use current_profile name in caption if available
             # We use a new session here to avoid "session in committed state" errors
@@ -131,56 +298,12 @@ def create_app(config_class=Config):
             except:
                 profile_name = "System"
 
-            db_path = get_db_path()
-            if db_path and os.path.exists(db_path):
-                caption = f"<b>Database Updated!</b>\nProfile: <b>{profile_name}</b>\n\nChanges:\n{changes_text}"
-                token = app.config.get('TELEGRAM_BOT_TOKEN')
-                chat_id = app.config.get('TELEGRAM_CHAT_ID')
-                
-                if token and chat_id:
-                    # Non-blocking background sync
-                    TelegramService.send_document_with_token(token, chat_id, db_path, caption=caption)
-
-    # Ensure default profile exists and tables are created/updated
+            # Coalesced and uploaded by the background backup worker
+            worker.submit(changes, profile_name, rows=rows, force_full=force_full)
+
+    # Create/upgrade the schema and seed defaults, once per schema version
+    from app.bootstrap import bootstrap
     with app.app_context():
-        # First, ensure all tables are created (especially the new 'profile' table)
-        db.create_all()
-        
-        # Check for missing columns in existing tables (SQLite specific auto-migration)
-        engine = db.engine
-        from sqlalchemy import inspect
-        inspector = inspect(engine)
-        
-        db.session._skip_notification = True
-        
-        tables_to_patch = ['account', 'category', 'budget', 'loan', 'investment']
-        for table_name in tables_to_patch:
-            if table_name in inspector.get_table_names():
-                columns = [c['name'] for c in inspector.get_columns(table_name)]
-                if 'profile_id' not in columns:
-                    try:
-                        with engine.connect() as conn:
-                            conn.execute(db.text(f"ALTER TABLE {table_name} ADD COLUMN profile_id INTEGER REFERENCES profile(id)"))
-                            conn.commit()
-                        app.logger.info(f"Added profile_id column to {table_name} table.")
-                    except Exception as e:
-                        app.logger.error(f"Error patching table {table_name}: {e}")
-
-        from app.models import Profile, Account, Category, Budget, Loan, Investment
-        if Profile.query.count() == 0:
-            default_profile = Profile(name="Ariful Islam", is_active=True)
-            db.session.add(default_profile)
-            db.session.commit()
-            
-            # Map existing records to the default profile
-            db.session._skip_notification = True
-            Account.query.update({Account.profile_id: default_profile.id})
-            Category.query.filter(Category.profile_id == None).update({Category.profile_id: default_profile.id})
-            Budget.query.update({Budget.profile_id: default_profile.id})
-            Loan.query.update({Loan.profile_id: default_profile.id})
-            Investment.query.update({Investment.profile_id: default_profile.id})
-            db.session.commit()
-        
-        db.session._skip_notification = False
+        bootstrap(app)
 
     return app
@@ -1,13 +1,11 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from app import db
-from app.models import Account, Currency, Profile
-from seed_data import seed_currencies
+from app.models import Account, Currency
+from app.services.profile_service import get_current_profile
+from app.services import rollup_service
 
 accounts = Blueprint('accounts', __name__)
 
-def get_current_profile():
-    return Profile.query.filter_by(is_active=True).first()
-
 @accounts.route('/')
 def index():
     profile = get_current_profile()
@@ -38,6 +36,7 @@ def add():
             name=name,
             account_type=account_type,
             balance=balance,
+            opening_balance=balance,
             color_theme=color,
             currency_id=currency_id
         )
@@ -46,7 +45,6 @@ def add():
         flash('Account added successfully!', 'success')
         return redirect(url_for('accounts.index'))
     
-    seed_currencies()
     currencies = Currency.query.all()
     return render_template('accounts/add.html', currencies=currencies)
 
@@ -58,7 +56,11 @@ def edit(id):
     if request.method == 'POST':
         account.name = request.form.get('name')
         account.account_type = request.form.get('account_type')
-        account.balance = float(request.form.get('balance', 0))
+        # A manual balance correction shifts the opening balance so the
+        # ledger still reconciles with the transaction history
+        new_balance = float(request.form.get('balance', 0))
+        account.opening_balance = (account.opening_balance or 0.0) + new_balance - (account.balance or 0.0)
+        account.balance = new_balance
         account.color_theme = request.form.get('color', '#4f46e5')
         account.currency_id = request.form.get('currency_id')
         
@@ -66,7 +68,6 @@ def edit(id):
         flash('Account updated successfully!', 'success')
         return redirect(url_for('accounts.index'))
     
-    seed_currencies()
     currencies = Currency.query.all()
     return render_template('accounts/edit.html', account=account, currencies=currencies)
 
@@ -75,6 +76,7 @@ def delete(id):
     profile = get_current_profile()
     account = Account.query.filter_by(id=id, profile_id=profile.id).first_or_404()
     
+    rollup_service.remove_account(account.id)
     db.session.delete(account)
     db.session.commit()
     flash('Account deleted.', 'info')
@@ -0,0 +1,172 @@
+from sqlalchemy import Integer, inspect
+
+from app import db
+
+# Bump whenever the bootstrap steps below change, so existing databases
+# run them once more on their next start
+SCHEMA_VERSION = 5
+
+# (table, column, DDL type) added to databases created by older versions
+PATCH_COLUMNS = [
+    ('account', 'profile_id', 'INTEGER REFERENCES profile(id)'),
+    ('category', 'profile_id', 'INTEGER REFERENCES profile(id)'),
+    ('budget', 'profile_id', 'INTEGER REFERENCES profile(id)'),
+    ('loan', 'profile_id', 'INTEGER REFERENCES profile(id)'),
+    ('investment', 'profile_id', 'INTEGER REFERENCES profile(id)'),
+    ('account', 'opening_balance', 'INTEGER DEFAULT 0'),
+    ('transaction', 'fingerprint', 'VARCHAR(16)'),
+    ('profile', 'base_currency_id', 'INTEGER REFERENCES currency(id)'),
+]
+
+
+def schema_version(engine):
+    """The version stamped by the last bootstrap (SQLite's user_version).
+
+    A single read of the database header, so checking it costs next to
+    nothing on every start. Non-SQLite databases always report 0.
+    """
+    if engine.dialect.name != 'sqlite':
+        return 0
+    with engine.connect() as conn:
+        return conn.exec_driver_sql('PRAGMA user_version').scalar() or 0
+
+
+def stamp_schema_version(engine, version=SCHEMA_VERSION):
+    if engine.dialect.name != 'sqlite':
+        return
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f'PRAGMA user_version = {int(version)}')
+        conn.commit()
+
+
+def convert_money_columns(engine):
+    """Rewrite money columns still stored as floats as integer cents.
+
+    Older databases keep amounts in REAL columns. Values are scaled and
+    rounded in place, then the table is rebuilt with INTEGER columns (SQLite
+    can't change a column type otherwise). Columns that are already integer
+    are left alone, so this is safe to run again. Returns the converted
+    (table, column) pairs.
+    """
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+    from app.models import MINOR_UNITS, Money
+
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    converted = []
+    with engine.begin() as conn:
+        op = Operations(MigrationContext.configure(conn))
+        for table in db.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            declared = {c['name']: c['type'] for c in inspector.get_columns(table.name)}
+            legacy = [c.name for c in table.columns if isinstance(c.type, Money)
+                      and c.name in declared and not isinstance(declared[c.name], Integer)]
+            if not legacy:
+                continue
+            op.execute(f'UPDATE "{table.name}" SET ' + ', '.join(
+                f'"{name}" = CAST(ROUND("{name}" * {MINOR_UNITS}) AS INTEGER)' for name in legacy))
+            with op.batch_alter_table(table.name) as batch_op:
+                for name in legacy:
+                    batch_op.alter_column(name, type_=Integer(), existing_type=declared[name])
+            converted += [(table.name, name) for name in legacy]
+    return converted
+
+
+def bootstrap(app, force=False):
+    """Bring the database up to SCHEMA_VERSION. Returns True if anything ran.
+
+    Creates missing tables, columns and indexes, converts float amounts to
+    integer cents, maps legacy rows to a default profile, seeds currencies and categories and backfills derived
+    data (rate history, category tree, monthly rollup, opening balances, fingerprints). All steps are
+    idempotent; once done the version is stamped and later starts skip them.
+    """
+    engine = db.engine
+    if not force and schema_version(engine) >= SCHEMA_VERSION:
+        return False
+
+    # First, ensure all tables are created (especially the new 'profile' table)
+    db.create_all()
+
+    # Check for missing columns in existing tables (SQLite specific auto-migration)
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    added = set()
+    db.session._skip_notification = True
+    for table_name, column, ddl in PATCH_COLUMNS:
+        if table_name not in tables:
+            continue
+        if column not in [c['name'] for c in inspector.get_columns(table_name)]:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(db.text(f'ALTER TABLE "{table_name}" ADD COLUMN {column} {ddl}'))
+                    conn.commit()
+                added.add((table_name, column))
+                app.logger.info(f"Added {column} column to {table_name} table.")
+            except Exception as e:
+                app.logger.error(f"Error patching table {table_name}: {e}")
+
+    # Amounts used to be floats; store them as integer cents
+    try:
+        for table_name, column in convert_money_columns(engine):
+            app.logger.info(f"Converted {table_name}.{column} to integer cents.")
+    except Exception as e:
+        app.logger.error(f"Error converting money columns: {e}")
+
+    # create_all() only indexes new tables; add any indexes existing ones lack
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(engine, checkfirst=True)
+            except Exception as e:
+                app.logger.error(f"Error creating index {index.name}: {e}")
+
+    from app.models import Profile, Account, Category, Budget, Loan, Investment, MonthlySummary, Transaction
+    if Profile.query.count() == 0:
+        default_profile = Profile(name="Ariful Islam", is_active=True)
+        db.session.add(default_profile)
+        db.session.commit()
+
+        # Map existing records to the default profile
+        db.session._skip_notification = True
+        Account.query.update({Account.profile_id: default_profile.id})
+        Category.query.filter(Category.profile_id == None).update({Category.profile_id: default_profile.id})
+        Budget.query.update({Budget.profile_id: default_profile.id})
+        Loan.query.update({Loan.profile_id: default_profile.id})
+        Investment.query.update({Investment.profile_id: default_profile.id})
+        db.session.commit()
+
+    # Default data, previously ensured on every dashboard and account form hit
+    from seed_data import seed_categories, seed_currencies
+    seed_currencies()
+    seed_categories()
+
+    # Currencies whose rate predates the rate history get it as their first entry
+    from app.services import currency_service
+    currency_service.seed_rate_history()
+
+    # Categories seeded or created before the closure table existed
+    from app.services import category_tree
+    if category_tree.check():
+        category_tree.rebuild()
+
+    # Build the monthly rollup once for databases that predate it
+    if MonthlySummary.query.first() is None and Transaction.query.first() is not None:
+        from app.services import rollup_service
+        rollup_service.rebuild()
+
+    # Accounts created before the balance ledger get an opening balance
+    # derived from their current balance and history
+    if ('account', 'opening_balance') in added:
+        from app.services import ledger_service
+        ledger_service.backfill_opening_balances()
+
+    # Fingerprint transactions stored before duplicate detection existed
+    if Transaction.query.filter(Transaction.fingerprint == None).first() is not None:
+        from app.services import dedup_service
+        dedup_service.backfill_fingerprints()
+
+    db.session._skip_notification = False
+    stamp_schema_version(engine)
+    return True
@@ -1,19 +1,17 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from app import db
-from app.models import Budget, Category, Profile
+from app.models import Budget, Category
+from app.services.budget_service import get_budget_status
+from app.services.profile_service import get_current_profile
 
 budgets = Blueprint('budgets', __name__)
 
-def get_current_profile():
-    return Profile.query.filter_by(is_active=True).first()
-
 @budgets.route('/')
 def index():
     profile = get_current_profile()
     if not profile:
         return redirect(url_for('profiles.index'))
-    user_budgets = Budget.query.filter_by(profile_id=profile.id).all()
-    return render_template('budgets/index.html', budgets=user_budgets)
+    return render_template('budgets/index.html', statuses=get_budget_status(profile.id))
 
 @budgets.route('/add', methods=['GET', 'POST'])
 def add():
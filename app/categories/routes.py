@@ -1,20 +1,33 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort
 from app import db
-from app.models import Category, Profile
+from app.models import Category
+from app.services import category_tree
+from app.services.profile_service import get_current_profile
 
 categories = Blueprint('categories', __name__)
 
-def get_current_profile():
-    return Profile.query.filter_by(is_active=True).first()
+def get_parent_id(profile, category=None):
+    parent_id = request.form.get('parent_id') or None
+    if parent_id is None:
+        return None
+    # Security: Ensure the parent is one of the profile's categories or a global
+    # one, and a global category only goes under another global one, so a
+    # tree never links two profiles
+    scope = Category.profile_id == None
+    if category is None or category.profile_id is not None:
+        scope = scope | (Category.profile_id == profile.id)
+    parent = Category.query.filter((Category.id == parent_id) & scope).first()
+    if parent is None:
+        abort(400)
+    return parent.id
 
 @categories.route('/')
 def index():
     profile = get_current_profile()
     if not profile:
         return redirect(url_for('profiles.index'))
-    # Show categories from this profile or global ones (profile_id is NULL)
-    user_categories = Category.query.filter((Category.profile_id == profile.id) | (Category.profile_id == None)).all()
-    return render_template('categories/index.html', categories=user_categories)
+    # Show categories from this profile or global ones (profile_id is NULL), as a tree
+    return render_template('categories/index.html', categories=category_tree.get_category_tree(profile.id))
 
 @categories.route('/add', methods=['GET', 'POST'])
 def add():
@@ -27,15 +40,19 @@ def add():
         icon = request.form.get('icon', 'ph-tag')
         color = request.form.get('color', '#4f46e5')
         is_income = request.form.get('type') == 'Income'
+        parent_id = get_parent_id(profile)
         
         new_category = Category(
             profile_id=profile.id,
             name=name,
             icon=icon,
             color=color,
-            is_income=is_income
+            is_income=is_income,
+            parent_id=parent_id
         )
         db.session.add(new_category)
+        db.session.flush()
+        category_tree.add_category(new_category)
         db.session.commit()
         flash('Category added successfully!', 'success')
         
@@ -46,30 +63,43 @@ def add():
             
         return redirect(url_for('categories.index'))
     
-    return render_template('categories/add.html')
+    return render_template('categories/add.html', parents=category_tree.get_category_tree(profile.id))
 
 @categories.route('/edit/<int:id>', methods=['GET', 'POST'])
 def edit(id):
     profile = get_current_profile()
+    if not profile:
+        return redirect(url_for('profiles.index'))
     category = Category.query.filter((Category.id == id) & ((Category.profile_id == profile.id) | (Category.profile_id == None))).first_or_404()
+    # A category can't become a child of itself or of its own subcategories
+    subtree = category_tree.subtree_ids(category.id)
     
     if request.method == 'POST':
+        parent_id = get_parent_id(profile, category)
+        if parent_id in subtree:
+            flash("A category can't be moved under itself or one of its subcategories.", 'danger')
+            return redirect(url_for('categories.edit', id=id))
+
         category.name = request.form.get('name')
         category.icon = request.form.get('icon')
         category.color = request.form.get('color')
         category.is_income = request.form.get('type') == 'Income'
+        category_tree.move_category(category, parent_id)
         
         db.session.commit()
         flash('Category updated successfully!', 'success')
         return redirect(url_for('categories.index'))
     
-    return render_template('categories/edit.html', category=category)
+    parents = [node for node in category_tree.get_category_tree(profile.id) if node.id not in subtree
+               and (category.profile_id is not None or node.profile_id is None)]
+    return render_template('categories/edit.html', category=category, parents=parents)
 
 @categories.route('/delete/<int:id>', methods=['POST'])
 def delete(id):
     profile = get_current_profile()
     category = Category.query.filter_by(id=id, profile_id=profile.id).first_or_404()
     
+    category_tree.remove_category(category)
     db.session.delete(category)
     db.session.commit()
     flash('Category deleted.', 'info')
@@ -0,0 +1,149 @@
+import click
+from flask.cli import AppGroup, with_appcontext
+
+rollup_cli = AppGroup('rollup', help="Maintain the monthly transaction rollup.")
+
+
+@rollup_cli.command('rebuild')
+def rollup_rebuild():
+    """Recompute the monthly rollup from the transaction history."""
+    from app.services import rollup_service
+    rows = rollup_service.rebuild()
+    click.echo(f"Rebuilt monthly rollup: {rows} rows.")
+
+
+@rollup_cli.command('check')
+def rollup_check():
+    """Report rollup rows that disagree with the transactions."""
+    from app.services import rollup_service
+    problems = rollup_service.check()
+    for key, expected, actual in problems:
+        click.echo(f"{key}: expected total={expected[0]} count={expected[1]}, found total={actual[0]} count={actual[1]}")
+    if problems:
+        raise click.ClickException(f"{len(problems)} inconsistent rollup rows; run 'flask rollup rebuild'.")
+    click.echo("Monthly rollup is consistent.")
+
+
+@click.command('check-query-plans')
+@click.option('--verbose', '-v', is_flag=True, help="Print the full plan of every query.")
+@with_appcontext
+def check_query_plans_command(verbose):
+    """Fail if any known query falls back to a full table scan."""
+    from app.services.query_plans import check_query_plans
+    failures = 0
+    for name, (plan, scans) in check_query_plans().items():
+        if scans:
+            failures += 1
+            click.echo(f"FULL SCAN  {name}: {'; '.join(scans)}")
+        elif verbose:
+            click.echo(f"ok         {name}: {'; '.join(plan)}")
+    if failures:
+        raise click.ClickException(f"{failures} queries fall back to a full table scan.")
+    click.echo("All known queries use indexes.")
+
+
+
+category_tree_cli = AppGroup('category-tree', help="Maintain the category closure table.")
+
+
+@category_tree_cli.command('rebuild')
+def category_tree_rebuild():
+    """Recompute the category closure table from the parent links."""
+    from app.services import category_tree
+    rows = category_tree.rebuild()
+    click.echo(f"Rebuilt category tree: {rows} rows.")
+
+
+@category_tree_cli.command('check')
+def category_tree_check():
+    """Report closure rows that disagree with the parent links."""
+    from app.services import category_tree
+    problems = category_tree.check()
+    for ancestor_id, descendant_id, expected, actual in problems:
+        click.echo(f"{ancestor_id} -> {descendant_id}: expected depth={expected}, found depth={actual}")
+    if problems:
+        raise click.ClickException(f"{len(problems)} inconsistent closure rows; run 'flask category-tree rebuild'.")
+    click.echo("Category tree is consistent.")
+
+
+currency_cli = AppGroup('currency', help="Manage exchange rates and their history.")
+
+
+@currency_cli.command('set-rate')
+@click.argument('code')
+@click.argument('rate', type=float)
+@click.option('--from', 'effective_from', type=click.DateTime(formats=['%Y-%m-%d', '%Y-%m-%d %H:%M']),
+              help="When the rate took effect (defaults to now); earlier dates revise history.")
+def currency_set_rate(code, rate, effective_from):
+    """Record RATE (units per USD) for the currency CODE."""
+    from app import db
+    from app.models import Currency
+    from app.services import currency_service
+    currency = Currency.query.filter_by(code=code.upper()).first()
+    if not currency:
+        raise click.ClickException(f"Unknown currency {code}.")
+    if rate <= 0:
+        raise click.ClickException("The rate must be positive.")
+    currency_service.set_rate(currency, rate, effective_from)
+    db.session.commit()
+    click.echo(f"{currency.code} rate {rate} recorded; current rate is {currency.exchange_rate}.")
+
+
+@currency_cli.command('rates')
+@click.argument('code', required=False)
+def currency_rates(code):
+    """List the rate history of one currency, or of all of them."""
+    from app.models import Currency, ExchangeRate
+    query = Currency.query.order_by(Currency.code)
+    if code:
+        query = query.filter_by(code=code.upper())
+    for currency in query:
+        click.echo(f"{currency.code} (current {currency.exchange_rate})")
+        for entry in ExchangeRate.query.filter_by(currency_id=currency.id).order_by(ExchangeRate.effective_from):
+            click.echo(f"  from {entry.effective_from:%Y-%m-%d %H:%M}  {entry.rate}")
+
+ledger_cli = AppGroup('ledger', help="Check account balances against the transaction history.")
+
+
+@ledger_cli.command('reconcile')
+@click.option('--fix', is_flag=True, help="Reset drifted balances to the recomputed values.")
+def ledger_reconcile(fix):
+    """Report accounts whose balance disagrees with opening balance + history."""
+    from app.services import ledger_service
+    drift = ledger_service.reconcile(fix=fix)
+    for account_id, stored, expected in drift:
+        click.echo(f"account {account_id}: stored balance={stored:.2f}, expected={expected:.2f}")
+    if drift and not fix:
+        raise click.ClickException(f"{len(drift)} accounts have drifted; run 'flask ledger reconcile --fix'.")
+    click.echo(f"Fixed {len(drift)} accounts." if drift else "All account balances reconcile.")
+
+
+analytics_cli = AppGroup('analytics', help="Maintain the Arrow analytics snapshot.")
+
+
+@analytics_cli.command('snapshot')
+@click.option('--dir', 'directory', help="Output directory (defaults to ANALYTICS_SNAPSHOT_DIR).")
+def analytics_snapshot(directory):
+    """Write every transaction to an Arrow IPC file external tools can memory-map."""
+    from flask import current_app
+    from app.services.columnar_export import write_analytics_snapshot
+    directory = directory or current_app.config.get('ANALYTICS_SNAPSHOT_DIR')
+    if not directory:
+        raise click.ClickException("Pass --dir or set ANALYTICS_SNAPSHOT_DIR.")
+    try:
+        path = write_analytics_snapshot(directory)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Wrote analytics snapshot to {path}.")
+
+
+@click.command('bootstrap')
+@click.option('--force', is_flag=True, help="Run every step even if the schema version is current.")
+@with_appcontext
+def bootstrap_command(force):
+    """Create/upgrade the schema and seed default data."""
+    from flask import current_app
+    from app.bootstrap import SCHEMA_VERSION, bootstrap
+    ran = bootstrap(current_app, force=force)
+    click.echo(f"Bootstrapped schema version {SCHEMA_VERSION}." if ran
+               else f"Schema version {SCHEMA_VERSION} is current; nothing to do.")
@@ -1,12 +1,10 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from app import db
-from app.models import Investment, Profile
+from app.models import Investment
+from app.services.profile_service import get_current_profile
 
 investments = Blueprint('investments', __name__)
 
-def get_current_profile():
-    return Profile.query.filter_by(is_active=True).first()
-
 @investments.route('/')
 def index():
     profile = get_current_profile()
@@ -1,12 +1,10 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from app import db
-from app.models import Loan, Profile
+from app.models import Loan
+from app.services.profile_service import get_current_profile
 
 loans = Blueprint('loans', __name__)
 
-def get_current_profile():
-    return Profile.query.filter_by(is_active=True).first()
-
 @loans.route('/')
 def index():
     profile = get_current_profile()
@@ -1,50 +1,35 @@
-from flask import Blueprint, render_template, send_file, Response
+from flask import Blueprint, render_template, redirect, url_for, send_file, Response, jsonify, current_app, stream_with_context, request, abort, flash
 from app import db
-from app.models import Account, Transaction, Category, Loan, Investment, Currency
+from app.models import Account, Transaction, Category, Loan
 from app.main.utils import export_transactions_to_excel, export_transactions_to_csv
-from sqlalchemy import func
+from app.services.currency_service import get_base_currency
+from app.services.dashboard_service import get_dashboard_metrics, get_net_worth
+from app.services import columnar_export
+from app.services.export_jobs import EXPORT_FORMATS, get_export_jobs
+from app.services.profile_service import get_current_profile
+from app.services.transaction_service import parse_filters
+from werkzeug.utils import secure_filename
 from datetime import datetime
-from seed_data import seed_currencies, seed_categories
+import tempfile
 
 main = Blueprint('main', __name__)
 
 @main.route('/')
 def index():
-    # Ensure default data exists
-    seed_currencies()
-    seed_categories()
-    
-    from app.models import Profile
-    current_profile = Profile.query.filter_by(is_active=True).first()
+    current_profile = get_current_profile()
     if not current_profile:
         return redirect(url_for('profiles.index'))
 
-    # Calculate Net Worth
-    total_balance = db.session.query(func.sum(Account.balance)).filter(Account.profile_id == current_profile.id).scalar() or 0
-    investment_value = db.session.query(func.sum(Investment.current_value)).filter(Investment.profile_id == current_profile.id).scalar() or 0
-    total_net_worth = total_balance + investment_value
+    # Calculate Net Worth (balances converted into the profile's base currency)
+    total_net_worth = get_net_worth(current_profile.id)
 
     # Recent Transactions (Filter by accounts belonging to this profile)
     recent_transactions = Transaction.query.join(Account, Transaction.account_id == Account.id).filter(Account.profile_id == current_profile.id).order_by(Transaction.date.desc()).limit(5).all()
     
-    # Calculate Monthly Metrics
-    now = datetime.now()
-    month = now.month
-    year = now.year
-    
-    monthly_income = db.session.query(func.sum(Transaction.amount))\
-        .join(Account, Transaction.account_id == Account.id)\
-        .filter(Account.profile_id == current_profile.id)\
-        .filter(Transaction.transaction_type == 'Income')\
-        .filter(func.extract('month', Transaction.date) == month)\
-        .filter(func.extract('year', Transaction.date) == year).scalar() or 0
-        
-    monthly_expense = db.session.query(func.sum(Transaction.amount))\
-        .join(Account, Transaction.account_id == Account.id)\
-        .filter(Account.profile_id == current_profile.id)\
-        .filter(Transaction.transaction_type == 'Expense')\
-        .filter(func.extract('month', Transaction.date) == month)\
-        .filter(func.extract('year', Transaction.date) == year).scalar() or 0
+    # Monthly metrics, chart data and category breakdown (single cached query)
+    metrics = get_dashboard_metrics(current_profile.id)
+    monthly_income = metrics['monthly_income']
+    monthly_expense = metrics['monthly_expense']
         
     savings_rate = 0
     if monthly_income > 0:
@@ -53,47 +38,6 @@ def index():
     # Accounts
     user_accounts = Account.query.filter_by(profile_id=current_profile.id).all()
 
-    # Calculate Chart Data (Last 6 Months)
-    from datetime import timedelta
-    chart_months = []
-    income_data = []
-    expense_data = []
-    
-    for i in range(5, -1, -1):
-        first_of_month = (now.replace(day=1) - timedelta(days=i*30)).replace(day=1)
-        m = first_of_month.month
-        y = first_of_month.year
-        chart_months.append(first_of_month.strftime('%b'))
-        
-        inc = db.session.query(func.sum(Transaction.amount))\
-            .join(Account, Transaction.account_id == Account.id)\
-            .filter(Account.profile_id == current_profile.id)\
-            .filter(Transaction.transaction_type == 'Income')\
-            .filter(func.extract('month', Transaction.date) == m)\
-            .filter(func.extract('year', Transaction.date) == y).scalar() or 0
-        income_data.append(float(inc))
-        
-        exp = db.session.query(func.sum(Transaction.amount))\
-            .join(Account, Transaction.account_id == Account.id)\
-            .filter(Account.profile_id == current_profile.id)\
-            .filter(Transaction.transaction_type == 'Expense')\
-            .filter(func.extract('month', Transaction.date) == m)\
-            .filter(func.extract('year', Transaction.date) == y).scalar() or 0
-        expense_data.append(float(exp))
-        
-    # Category Data for Donut Chart (Current Month)
-    category_data = db.session.query(Category.name, func.sum(Transaction.amount))\
-        .join(Transaction, Transaction.category_id == Category.id)\
-        .join(Account, Transaction.account_id == Account.id)\
-        .filter(Account.profile_id == current_profile.id)\
-        .filter(Transaction.transaction_type == 'Expense')\
-        .filter(func.extract('month', Transaction.date) == month)\
-        .filter(func.extract('year', Transaction.date) == year)\
-        .group_by(Category.name).all()
-        
-    category_labels = [row[0] for row in category_data]
-    category_values = [float(row[1]) for row in category_data]
-
     return render_template('index.html', 
                            net_worth=total_net_worth,
                            transactions=recent_transactions,
@@ -101,23 +45,107 @@ def index():
                            monthly_income=monthly_income,
                            monthly_expense=monthly_expense,
                            savings_rate=savings_rate,
-                           chart_months=chart_months,
-                           income_data=income_data,
-                           expense_data=expense_data,
-                           category_labels=category_labels,
-                           category_values=category_values,
-                           base_currency=Currency.query.filter_by(code='BDT').first())
+                           chart_months=metrics['chart_months'],
+                           income_data=metrics['income_data'],
+                           expense_data=metrics['expense_data'],
+                           category_labels=metrics['category_labels'],
+                           category_values=metrics['category_values'],
+                           base_currency=get_base_currency(current_profile.id))
+
+def export_filename(profile, extension):
+    return secure_filename(f"transactions_{profile.name}_{datetime.now().strftime('%Y%m%d')}.{extension}")
 
 @main.route('/export/excel')
 def export_excel():
-    output = export_transactions_to_excel()
+    profile = get_current_profile()
+    if not profile:
+        return redirect(url_for('profiles.index'))
+    output = export_transactions_to_excel(profile.id, parse_filters(request.args))
     return send_file(output, 
-                     download_name=f"transactions_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                     mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                     download_name=export_filename(profile, 'xlsx'),
                      as_attachment=True)
 
 @main.route('/export/csv')
 def export_csv():
-    output = export_transactions_to_csv()
-    return Response(output,
+    profile = get_current_profile()
+    if not profile:
+        return redirect(url_for('profiles.index'))
+    # Streamed chunk by chunk; the first rows go out before the query finishes
+    output = export_transactions_to_csv(profile.id, parse_filters(request.args))
+    return Response(stream_with_context(output),
                     mimetype="text/csv",
-                    headers={"Content-disposition": f"attachment; filename=transactions_{datetime.now().strftime('%Y%m%d')}.csv"})
+                    headers={"Content-disposition": f"attachment; filename={export_filename(profile, 'csv')}"})
+
+@main.route('/export/parquet', defaults={'fmt': 'parquet'})
+@main.route('/export/arrow', defaults={'fmt': 'arrow'})
+def export_columnar(fmt):
+    profile = get_current_profile()
+    if not profile:
+        return redirect(url_for('profiles.index'))
+    if not columnar_export.available():
+        flash('Parquet and Arrow exports need the pyarrow package installed.', 'danger')
+        return redirect(url_for('transactions.index'))
+    # Parquet writes its footer last, so build the file first and then send it
+    output = tempfile.TemporaryFile()
+    columnar_export.export_transactions_to_columnar(profile.id, parse_filters(request.args), output=output, fmt=fmt)
+    output.seek(0)
+    return send_file(output, mimetype=EXPORT_FORMATS[fmt],
+                     download_name=export_filename(profile, fmt), as_attachment=True)
+
+def job_payload(job):
+    return {
+        **job.to_dict(),
+        'status_url': url_for('main.export_job_status', job_id=job.id),
+        'download_url': url_for('main.export_job_download', job_id=job.id) if job.status == 'done' else None
+    }
+
+def get_export_job(job_id):
+    profile = get_current_profile()
+    job = get_export_jobs(current_app._get_current_object()).get(job_id)
+    # Jobs are only visible to the profile that started them
+    if not job or not profile or job.profile_id != profile.id:
+        abort(404)
+    return job
+
+@main.route('/export/jobs', methods=['POST'])
+def export_job_submit():
+    profile = get_current_profile()
+    if not profile:
+        abort(404)
+    fmt = request.values.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unsupported export format: {fmt}"}), 400
+    job = get_export_jobs(current_app._get_current_object()).submit(fmt, profile.id, parse_filters(request.values))
+    return jsonify(job_payload(job)), 202
+
+@main.route('/export/jobs/<job_id>')
+def export_job_status(job_id):
+    return jsonify(job_payload(get_export_job(job_id)))
+
+@main.route('/export/jobs/<job_id>/download')
+def export_job_download(job_id):
+    job = get_export_job(job_id)
+    if job.status != 'done':
+        return jsonify(job_payload(job)), 409
+    profile = get_current_profile()
+    return send_file(job.path, mimetype=EXPORT_FORMATS[job.format],
+                     download_name=export_filename(profile, job.format), as_attachment=True)
+
+@main.route('/backup/status')
+def backup_status():
+    worker = current_app.extensions.get('backup_worker')
+    if not worker:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **worker.status()})
+
+@main.route('/healthz')
+def healthz():
+    # Readiness probe polled by the launcher; one header read, no ORM work
+    from app.bootstrap import SCHEMA_VERSION, schema_version
+    try:
+        version = schema_version(db.engine)
+    except Exception as e:
+        return jsonify({'ready': False, 'error': str(e)}), 503
+    ready = version >= SCHEMA_VERSION or db.engine.dialect.name != 'sqlite'
+    return jsonify({'ready': ready, 'schema_version': version}), 200 if ready else 503
@@ -1,42 +1,84 @@
-import pandas as pd
-from io import BytesIO
-from app.models import Transaction, Account
-
-def export_transactions_to_excel():
-    transactions = Transaction.query.all()
-    
-    data = []
-    for tx in transactions:
-        data.append({
-            'Date': tx.date.strftime('%Y-%m-%d'),
-            'Account': tx.account.name,
-            'Type': tx.transaction_type,
-            'Category': tx.category.name if tx.category else 'Uncategorized',
-            'Amount': tx.amount,
-            'Description': tx.description
-        })
-    
-    df = pd.DataFrame(data)
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Transactions')
-    
-    output.seek(0)
+import csv
+import tempfile
+from io import StringIO
+from sqlalchemy import case, func
+from app.models import Transaction, Account, Category
+from app.services.transaction_service import filtered_query
+
+EXPORT_COLUMNS = ['Date', 'Account', 'Type', 'Category', 'Amount', 'Description']
+EXPORT_CHUNK_SIZE = 5000
+
+def export_transactions_to_excel(profile_id, filters=None, output=None, progress=None):
+    """Write the export as .xlsx into `output` (a path or binary file).
+
+    Uses openpyxl's write-only mode, which streams each row to disk as it is
+    appended, so neither the rows nor the workbook are held in memory. A
+    Summary sheet carries per-month totals computed in SQL. Without `output`
+    an anonymous temp file is used; it is returned rewound.
+    """
+    # Imported here so only an actual Excel export pays for loading openpyxl
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Transactions')
+    sheet.append(EXPORT_COLUMNS)
+    for row in export_rows(profile_id, filters, progress=progress):
+        sheet.append(row)
+
+    summary = workbook.create_sheet('Summary')
+    summary.append(['Month', 'Income', 'Expense', 'Transfer', 'Transactions'])
+    for row in export_monthly_totals(profile_id, filters):
+        summary.append(list(row))
+
+    if output is None:
+        output = tempfile.TemporaryFile()
+    workbook.save(output)
+    if hasattr(output, 'seek'):
+        output.seek(0)
     return output
 
-def export_transactions_to_csv():
-    transactions = Transaction.query.all()
-    
-    data = []
-    for tx in transactions:
-        data.append({
-            'Date': tx.date.strftime('%Y-%m-%d'),
-            'Account': tx.account.name,
-            'Type': tx.transaction_type,
-            'Category': tx.category.name if tx.category else 'Uncategorized',
-            'Amount': tx.amount,
-            'Description': tx.description
-        })
-    
-    df = pd.DataFrame(data)
-    return df.to_csv(index=False).encode('utf-8')
+def export_monthly_totals(profile_id, filters=None):
+    """(month, income, expense, transfer, count) for the exported slice."""
+    def total(tx_type):
+        return func.coalesce(func.sum(case((Transaction.transaction_type == tx_type, Transaction.amount))), 0)
+    month = func.strftime('%Y-%m', Transaction.date)
+    return filtered_query(profile_id, filters or {})\
+        .with_entities(month, total('Income'), total('Expense'), total('Transfer'), func.count(Transaction.id))\
+        .group_by(month).order_by(month).all()
+
+def export_rows(profile_id, filters=None, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """Yield (date, account, type, category, amount, description) tuples.
+
+    Only the profile's transactions matching `filters` (see
+    transaction_service.parse_filters), selecting just the exported columns
+    in one joined query. Rows are read through the cursor `chunk_size` at a
+    time, so memory stays flat no matter how long the history is.
+    `progress`, if given, is called with the running row count per chunk.
+    """
+    query = filtered_query(profile_id, filters or {})\
+        .outerjoin(Category, Transaction.category_id == Category.id)\
+        .with_entities(Transaction.date, Account.name, Transaction.transaction_type,
+                       func.coalesce(Category.name, 'Uncategorized'), Transaction.amount, Transaction.description)\
+        .order_by(Transaction.date, Transaction.id)\
+        .yield_per(chunk_size)
+    count = 0
+    for date, account, tx_type, category, amount, description in query:
+        yield date.strftime('%Y-%m-%d'), account, tx_type, category, amount, description
+        count += 1
+        if progress and count % chunk_size == 0:
+            progress(count)
+    if progress:
+        progress(count)
+
+def export_transactions_to_csv(profile_id, filters=None, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """Generate the CSV export as UTF-8 chunks of about `chunk_size` rows."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for count, row in enumerate(export_rows(profile_id, filters, chunk_size, progress), 1):
+        writer.writerow(row)
+        if count % chunk_size == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
@@ -1,11 +1,34 @@
 from datetime import datetime, UTC
 from app import db
 
+MINOR_UNITS = 100 # Cents per unit; money columns store whole cents
+
+class Money(db.TypeDecorator):
+    """A monetary amount stored as an integer number of cents.
+
+    Python code keeps working with float amounts: values are rounded to the
+    cent on the way in and divided back on the way out. SUM() and balance
+    arithmetic in SQL run on integers, so they are exact.
+    """
+    impl = db.Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return round(float(value) * MINOR_UNITS)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return value / MINOR_UNITS
+
 class Profile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(64), unique=True, nullable=False)
-    is_active = db.Column(db.Boolean, default=False)
+    is_active = db.Column(db.Boolean, default=False, index=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+    base_currency_id = db.Column(db.Integer, db.ForeignKey('currency.id')) # Totals are converted into this
 
     accounts = db.relationship('Account', backref='profile', lazy='dynamic')
     categories = db.relationship('Category', backref='profile', lazy='dynamic')
@@ -17,17 +40,31 @@ class Currency(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(10), unique=True, nullable=False) # USD, BDT, etc.
     symbol = db.Column(db.String(5))
-    exchange_rate = db.Column(db.Float, default=1.0) # Relative to base currency
+    exchange_rate = db.Column(db.Float, default=1.0) # Units per USD; the latest ExchangeRate
     last_updated = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
 
+class ExchangeRate(db.Model):
+    # Rate history: a currency's rate from effective_from until its next row.
+    # Maintained by app.services.currency_service.set_rate.
+    __tablename__ = 'exchange_rate'
+    __table_args__ = (
+        db.UniqueConstraint('currency_id', 'effective_from', name='uq_exchange_rate_currency_from'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    currency_id = db.Column(db.Integer, db.ForeignKey('currency.id'), nullable=False)
+    rate = db.Column(db.Float, nullable=False)
+    effective_from = db.Column(db.DateTime, nullable=False)
+
 class Account(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    profile_id = db.Column(db.Integer, db.ForeignKey('profile.id'), nullable=False)
+    profile_id = db.Column(db.Integer, db.ForeignKey('profile.id'), nullable=False, index=True)
     name = db.Column(db.String(64), nullable=False)
     account_type = db.Column(db.String(32)) # Bank, Cash, Credit Card, etc.
     currency_id = db.Column(db.Integer, db.ForeignKey('currency.id'))
     currency = db.relationship('Currency', backref='accounts')
-    balance = db.Column(db.Float, default=0.0)
+    balance = db.Column(Money, default=0)
+    opening_balance = db.Column(Money, default=0) # Balance before any recorded transaction
     color_theme = db.Column(db.String(20))
     icon = db.Column(db.String(64))
     is_archived = db.Column(db.Boolean, default=False)
@@ -50,19 +87,44 @@ class Account(db.Model):
 
 class Category(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    profile_id = db.Column(db.Integer, db.ForeignKey('profile.id')) # Optional, some can be global
+    profile_id = db.Column(db.Integer, db.ForeignKey('profile.id'), index=True) # Optional, some can be global
     name = db.Column(db.String(64), nullable=False)
-    parent_id = db.Column(db.Integer, db.ForeignKey('category.id')) # For subcategories
+    parent_id = db.Column(db.Integer, db.ForeignKey('category.id'), index=True) # For subcategories
     icon = db.Column(db.String(64))
     color = db.Column(db.String(20))
     is_income = db.Column(db.Boolean, default=False)
 
+class CategoryClosure(db.Model):
+    # Every (ancestor, descendant) pair of the category tree, each category
+    # also paired with itself at depth 0. Maintained by app.services.category_tree.
+    __tablename__ = 'category_closure'
+    __table_args__ = (
+        db.Index('ix_category_closure_descendant', 'descendant_id', 'depth'),
+    )
+
+    ancestor_id = db.Column(db.Integer, primary_key=True)
+    descendant_id = db.Column(db.Integer, primary_key=True)
+    depth = db.Column(db.Integer, nullable=False, default=0)
+
 class Transaction(db.Model):
+    __table_args__ = (
+        # Keyset pagination of the transaction list orders by (date, id)
+        db.Index('ix_transaction_date_id', 'date', 'id'),
+        # Per-account history, date ranges and balance reconciliation
+        db.Index('ix_transaction_account_date', 'account_id', 'date'),
+        db.Index('ix_transaction_category_date', 'category_id', 'date'),
+        db.Index('ix_transaction_type_date', 'transaction_type', 'date'),
+        db.Index('ix_transaction_transfer_to', 'transfer_to_account_id'),
+        # Duplicate detection: exact fingerprints and (account, amount) blocking
+        db.Index('ix_transaction_fingerprint', 'fingerprint'),
+        db.Index('ix_transaction_account_amount', 'account_id', 'amount'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     account_id = db.Column(db.Integer, db.ForeignKey('account.id'), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'))
     category = db.relationship('Category', backref='transactions')
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)
     transaction_type = db.Column(db.String(20)) # Income, Expense, Transfer
     description = db.Column(db.String(256))
     tags = db.Column(db.String(128))
@@ -70,35 +132,38 @@ class Transaction(db.Model):
     attachment_path = db.Column(db.String(256))
     is_recurring = db.Column(db.Boolean, default=False)
     transfer_to_account_id = db.Column(db.Integer, db.ForeignKey('account.id')) # For Transfers
+    fingerprint = db.Column(db.String(16)) # Normalized account/date/amount/description hash
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
 
 class Budget(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    profile_id = db.Column(db.Integer, db.ForeignKey('profile.id'), nullable=False)
+    profile_id = db.Column(db.Integer, db.ForeignKey('profile.id'), nullable=False, index=True)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)
     period = db.Column(db.String(20)) # Monthly, Yearly
     start_date = db.Column(db.Date)
     end_date = db.Column(db.Date)
 
+    category = db.relationship('Category')
+
 class Loan(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    profile_id = db.Column(db.Integer, db.ForeignKey('profile.id'), nullable=False)
+    profile_id = db.Column(db.Integer, db.ForeignKey('profile.id'), nullable=False, index=True)
     lender_borrower_name = db.Column(db.String(128), nullable=False)
     loan_type = db.Column(db.String(20)) # Given, Taken
-    total_amount = db.Column(db.Float, nullable=False)
-    remaining_balance = db.Column(db.Float, nullable=False)
+    total_amount = db.Column(Money, nullable=False)
+    remaining_balance = db.Column(Money, nullable=False)
     interest_rate = db.Column(db.Float, default=0.0)
     due_date = db.Column(db.Date)
     status = db.Column(db.String(20)) # Active, Paid
 
 class Investment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    profile_id = db.Column(db.Integer, db.ForeignKey('profile.id'), nullable=False)
+    profile_id = db.Column(db.Integer, db.ForeignKey('profile.id'), nullable=False, index=True)
     name = db.Column(db.String(128), nullable=False)
     asset_type = db.Column(db.String(32)) # Stock, Crypto, FD, etc.
-    principal_amount = db.Column(db.Float, nullable=False)
-    current_value = db.Column(db.Float, nullable=False)
+    principal_amount = db.Column(Money, nullable=False)
+    current_value = db.Column(Money, nullable=False)
     last_updated = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
 
 class ActivityLog(db.Model):
@@ -106,3 +171,31 @@ class ActivityLog(db.Model):
     action = db.Column(db.String(256))
     ip_address = db.Column(db.String(45))
     timestamp = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+
+class MonthlySummary(db.Model):
+    # Per-month rollup of transactions, maintained by app.services.rollup_service.
+    # category_id is 0 for uncategorized transactions so the key stays unique.
+    __tablename__ = 'monthly_summary'
+    __table_args__ = (
+        db.UniqueConstraint('profile_id', 'account_id', 'category_id', 'transaction_type', 'year', 'month',
+                            name='uq_monthly_summary_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    profile_id = db.Column(db.Integer, db.ForeignKey('profile.id'), nullable=False)
+    account_id = db.Column(db.Integer, nullable=False)
+    category_id = db.Column(db.Integer, nullable=False, default=0)
+    transaction_type = db.Column(db.String(20), nullable=False, default='')
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    total = db.Column(Money, nullable=False, default=0)
+    tx_count = db.Column(db.Integer, nullable=False, default=0)
+
+class TableVersion(db.Model):
+    # Bumped by every commit that touches a table (see app.services.cache), so
+    # other processes can tell which of their cached results went stale.
+    __tablename__ = 'table_version'
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    writer = db.Column(db.String(32)) # WRITER_ID of the process that committed last
@@ -1,24 +1,43 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from app import db
-from app.models import Profile
+from app.models import Currency, Profile
 
 profiles = Blueprint('profiles', __name__)
 
+def get_base_currency_id():
+    """The base currency chosen on the form, None for the default.
+
+    Raises ValueError when the id is not a known currency.
+    """
+    currency_id = request.form.get('base_currency_id')
+    if not currency_id:
+        return None
+    currency = db.session.get(Currency, int(currency_id)) if currency_id.isdigit() else None
+    if currency is None:
+        raise ValueError('Unknown currency.')
+    return currency.id
+
 @profiles.route('/')
 def index():
     all_profiles = Profile.query.all()
-    return render_template('profiles/index.html', profiles=all_profiles)
+    currencies = Currency.query.order_by(Currency.code).all()
+    return render_template('profiles/index.html', profiles=all_profiles, currencies=currencies)
 
 @profiles.route('/add', methods=['POST'])
 def add():
     name = request.form.get('name')
     if name:
+        try:
+            base_currency_id = get_base_currency_id()
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('profiles.index'))
         if Profile.query.filter_by(name=name).first():
             flash('Profile already exists!', 'danger')
         else:
             # If this is the first profile, make it active
             is_active = Profile.query.count() == 0
-            new_profile = Profile(name=name, is_active=is_active)
+            new_profile = Profile(name=name, is_active=is_active, base_currency_id=base_currency_id)
             db.session.add(new_profile)
             db.session.commit()
             flash(f'Profile "{name}" created successfully!', 'success')
@@ -32,3 +51,15 @@ def switch(id):
     db.session.commit()
     flash(f'Switched to profile: {profile.name}', 'success')
     return redirect(url_for('main.index'))
+
+@profiles.route('/currency/<int:id>', methods=['POST'])
+def set_currency(id):
+    profile = Profile.query.get_or_404(id)
+    try:
+        profile.base_currency_id = get_base_currency_id()
+    except ValueError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('profiles.index'))
+    db.session.commit()
+    flash(f'Totals for {profile.name} are now shown in the selected currency.', 'success')
+    return redirect(url_for('profiles.index'))
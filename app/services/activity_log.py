@@ -0,0 +1,97 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, UTC
+
+
+class ActivityLogWriter:
+    """Buffers ActivityLog rows in memory and writes them in batches.
+
+    Entries are flushed by a background thread once `batch_size` rows are
+    queued or `flush_interval` seconds have passed, and once more on shutdown.
+    Rows are inserted through the engine directly, so they never touch
+    `db.session` or its notification hooks. A batch that fails to write (e.g.
+    the database is locked by a checkpoint or backup) is kept and retried
+    with the next flush, up to `max_retries` times before it is dropped.
+    """
+
+    def __init__(self, engine, table, batch_size=100, flush_interval=2.0, max_retries=5, logger=None):
+        self.engine = engine
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.logger = logger or logging.getLogger(__name__)
+        self._failed = [] # Rows of the last failed write, retried first
+        self._failures = 0
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._flush_requested = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='activity-log-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def enqueue(self, action, ip_address=None):
+        self._queue.put({
+            'action': action,
+            'ip_address': ip_address,
+            'timestamp': datetime.now(UTC)
+        })
+        if self._queue.qsize() >= self.batch_size:
+            self._flush_requested.set()
+
+    def flush(self):
+        """Write every queued entry now. Returns the number of rows written."""
+        with self._lock:
+            rows, self._failed = self._failed, []
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not rows:
+                return 0
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(self.table.insert(), rows)
+            except Exception as e:
+                self._failures += 1
+                if self._failures > self.max_retries:
+                    self.logger.error(f"Activity log: dropped {len(rows)} entries after "
+                                      f"{self._failures} failed writes: {e}")
+                    self._failures = 0
+                else:
+                    self.logger.warning(f"Activity log: write of {len(rows)} entries failed "
+                                        f"(attempt {self._failures}), retrying with the next flush: {e}")
+                    self._failed = rows
+                return 0
+            self._failures = 0
+            return len(rows)
+
+    def stop(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._flush_requested.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while not self._stop.is_set():
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            self._flush_requested.wait(timeout)
+            self._flush_requested.clear()
+            if self._stop.is_set():
+                break
+            self.flush()
+            last_flush = time.monotonic()
+
+
+def should_log(path, method, exclude_prefixes=(), exclude_methods=()):
+    if method in exclude_methods:
+        return False
+    return not any(path.startswith(prefix) for prefix in exclude_prefixes)
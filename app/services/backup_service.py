@@ -0,0 +1,262 @@
+import atexit
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, UTC
+
+from app.services.changelog import write_delta
+from app.services.telegram_service import TelegramService
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def create_snapshot(db_path, compression='gzip', directory=None):
+    """Write a consistent, compacted copy of a live SQLite database.
+
+    Uses `VACUUM INTO` (falling back to the online backup API on older SQLite
+    builds) so the copy never contains half-written pages, then optionally
+    compresses it with gzip or zstd. Returns the path of the snapshot file;
+    the caller is responsible for removing it.
+    """
+    directory = directory or tempfile.mkdtemp(prefix='balancetrack_backup_')
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    snapshot_path = os.path.join(directory, f"{stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
+
+    source = sqlite3.connect(db_path, timeout=30)
+    try:
+        try:
+            source.execute("VACUUM INTO ?", (snapshot_path,))
+        except sqlite3.OperationalError:
+            if os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+            target = sqlite3.connect(snapshot_path)
+            try:
+                source.backup(target, pages=1024)
+            finally:
+                target.close()
+    finally:
+        source.close()
+
+    if compression == 'zstd' and zstandard is None:
+        compression = 'gzip'
+
+    if compression == 'gzip':
+        compressed_path = snapshot_path + '.gz'
+        with open(snapshot_path, 'rb') as src, gzip.open(compressed_path, 'wb', compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    elif compression == 'zstd':
+        compressed_path = snapshot_path + '.zst'
+        with open(snapshot_path, 'rb') as src, open(compressed_path, 'wb') as dst:
+            zstandard.ZstdCompressor(level=10).copy_stream(src, dst)
+    else:
+        return snapshot_path
+
+    os.remove(snapshot_path)
+    return compressed_path
+
+
+def remove_snapshot(snapshot_path):
+    if os.path.exists(snapshot_path):
+        os.remove(snapshot_path)
+    # Drop the temporary directory create_snapshot made for it
+    directory = os.path.dirname(snapshot_path)
+    if os.path.basename(directory).startswith('balancetrack_backup_'):
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class BackupWorker:
+    """Single long-lived thread that uploads database backups to Telegram.
+
+    Commits only record what changed. The worker waits until no new changes
+    have arrived for `debounce` seconds, then uploads once with every pending
+    change summary in the caption. Connectivity checks and retries (with
+    exponential backoff) all happen on the worker thread.
+
+    In `incremental` mode the upload is a compact delta of the changed rows
+    against the last full snapshot, and a full snapshot is only sent every
+    `full_interval` seconds or when a change could not be captured row by row.
+    """
+
+    def __init__(self, token, chat_id, db_path, api_url=None, connectivity_url=None,
+                 debounce=10.0, max_retries=5, backoff=2.0, compression='gzip',
+                 mode='full', full_interval=86400):
+        self.token = token
+        self.chat_id = chat_id
+        self.db_path = db_path
+        self.api_url = api_url
+        self.connectivity_url = connectivity_url
+        self.debounce = debounce
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.compression = compression
+        self.mode = mode
+        self.full_interval = full_interval
+
+        self.last_success = None
+        self.last_error = None
+        self.last_snapshot_bytes = None
+        self.uploads = 0
+        self.failures = 0
+
+        self._changes = []
+        self._rows = []
+        self._force_full = False
+        self._profile_name = None
+        self._last_submit = 0.0
+        self._base = None
+        self._seq = 0
+        self._last_full = None
+        self._uploading = False
+        self._stopping = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='telegram-backup', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    @property
+    def incremental(self):
+        return self.mode == 'incremental'
+
+    @property
+    def queue_depth(self):
+        with self._cond:
+            return len(self._changes)
+
+    def status(self):
+        with self._cond:
+            return {
+                'mode': self.mode,
+                'queue_depth': len(self._changes),
+                'pending_rows': len(self._rows),
+                'uploading': self._uploading,
+                'uploads': self.uploads,
+                'failures': self.failures,
+                'last_success': self.last_success.isoformat() if self.last_success else None,
+                'last_snapshot_bytes': self.last_snapshot_bytes,
+                'snapshot': self._base,
+                'deltas_since_snapshot': self._seq,
+                'last_error': self.last_error
+            }
+
+    def submit(self, changes, profile_name=None, rows=None, force_full=False):
+        with self._cond:
+            self._changes.extend(changes)
+            if rows:
+                self._rows.extend(rows)
+            if force_full:
+                self._force_full = True
+            if profile_name:
+                self._profile_name = profile_name
+            self._last_submit = time.monotonic()
+            self._cond.notify()
+
+    def stop(self, timeout=30):
+        with self._cond:
+            if self._stopping:
+                return
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout=timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._changes and not self._stopping:
+                    self._cond.wait()
+                if not self._changes:
+                    return
+
+                # Debounce: keep collecting until the database has been quiet for a while
+                while not self._stopping:
+                    remaining = self.debounce - (time.monotonic() - self._last_submit)
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                changes, rows, force_full = self._changes, self._rows, self._force_full
+                profile_name = self._profile_name or "Unknown"
+                self._changes, self._rows, self._force_full = [], [], False
+                self._uploading = True
+
+            ok = self._upload(changes, profile_name, rows, force_full)
+
+            with self._cond:
+                self._uploading = False
+                if not ok:
+                    # Keep everything so the next backup still covers it,
+                    # and wait out another debounce window before trying again
+                    self._changes = changes + self._changes
+                    self._rows = rows + self._rows
+                    self._force_full = self._force_full or force_full
+                    self._last_submit = time.monotonic()
+
+            if not ok and self._stopping:
+                return
+
+    def _needs_full(self, force_full):
+        if not self.incremental or force_full or self._base is None:
+            return True
+        return time.monotonic() - self._last_full >= self.full_interval
+
+    def _build_payload(self, full, rows):
+        if full:
+            return create_snapshot(self.db_path, self.compression)
+        directory = tempfile.mkdtemp(prefix='balancetrack_backup_')
+        path = os.path.join(directory, f"{self._base}_delta_{self._seq + 1:04d}.jsonl.gz")
+        return write_delta(path, rows, self._base, self._seq + 1)
+
+    def _upload(self, changes, profile_name, rows=None, force_full=False):
+        full = self._needs_full(force_full)
+        changes_text = "\n".join(sorted(set(changes)))
+        kind = "Full snapshot" if full else f"Incremental #{self._seq + 1} of {self._base}"
+        caption = f"<b>Database Updated!</b>\nProfile: <b>{profile_name}</b>\nBackup: {kind}\n\nChanges:\n{changes_text}"
+
+        payload_path = None
+        delay = self.backoff
+        try:
+            for attempt in range(self.max_retries):
+                if attempt:
+                    time.sleep(delay)
+                    delay *= 2
+
+                if not os.path.exists(self.db_path):
+                    self.last_error = f"Database not found: {self.db_path}"
+                    break
+                if not TelegramService.is_connected(self.connectivity_url):
+                    self.last_error = "No Internet Connection"
+                    continue
+                if payload_path is None:
+                    try:
+                        payload_path = self._build_payload(full, rows or [])
+                    except Exception as e:
+                        # Never let a bad payload take the worker thread down
+                        self.last_error = f"Snapshot failed: {e}"
+                        continue
+                    self.last_snapshot_bytes = os.path.getsize(payload_path)
+                if TelegramService._send_document_raw(self.token, self.chat_id, payload_path,
+                                                      caption=caption, api_url=self.api_url):
+                    if full:
+                        self._base = os.path.basename(payload_path).split('.')[0]
+                        self._seq = 0
+                        self._last_full = time.monotonic()
+                    else:
+                        self._seq += 1
+                    self.uploads += 1
+                    self.last_success = datetime.now(UTC)
+                    self.last_error = None
+                    return True
+                self.last_error = "Upload failed"
+        finally:
+            if payload_path:
+                remove_snapshot(payload_path)
+
+        self.failures += 1
+        print(f"Telegram Sync Failed: {self.last_error}")
+        return False
@@ -0,0 +1,159 @@
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import String, and_, case, func, literal, or_, select, union_all
+
+from app import db
+from app.models import Account, Budget, CategoryClosure, MonthlySummary, Transaction
+from app.services.cache import QueryCache
+from app.services.currency_service import converted, get_base_currency, historic_factor
+
+budget_cache = QueryCache('budgets', {'transaction', 'budget', 'category', 'category_closure', 'account',
+                                      'currency', 'exchange_rate', 'profile'})
+
+BudgetStatus = namedtuple('BudgetStatus', 'budget start end spent remaining utilization projected')
+
+
+def period_bounds(period, today):
+    """[start, end) of the Monthly or Yearly period containing `today`."""
+    if period == 'Yearly':
+        return date(today.year, 1, 1), date(today.year + 1, 1, 1)
+    start = date(today.year, today.month, 1)
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+def budget_window(budget, today):
+    """The budget's current period, clipped to its start/end dates (end inclusive)."""
+    start, end = period_bounds(budget.period, today)
+    if budget.start_date and budget.start_date > start:
+        start = budget.start_date
+    if budget.end_date and budget.end_date + timedelta(days=1) < end:
+        end = budget.end_date + timedelta(days=1)
+    return start, max(start, end)
+
+
+def projected_spend(spent, start, end, today):
+    """Spend at the end of the window if it continues at the rate so far."""
+    total_days = (end - start).days
+    elapsed_days = (min(today + timedelta(days=1), end) - start).days
+    if elapsed_days <= 0 or total_days <= 0 or elapsed_days >= total_days:
+        return spent
+    return spent * total_days / elapsed_days
+
+
+def partial_months(windows):
+    """First days of the months a budget window starts or ends inside of."""
+    months = set()
+    for start, end in windows:
+        if start >= end:
+            continue
+        if start.day != 1:
+            months.add(start.replace(day=1))
+        if end.day != 1:
+            months.add(end.replace(day=1))
+    return sorted(months)
+
+
+def spend_source(profile_id, today, split_months=(), base_currency_id=None):
+    """Expense totals as (category_id, lo, hi, total) rows covering [lo, hi).
+
+    Whole months come from the monthly rollup; the months in `split_months`,
+    where some budget window begins or ends mid-month, come from per-day
+    transaction totals instead. Every transaction is counted in exactly one row.
+    Totals are grouped per account currency and converted into the base
+    currency at the rates in effect at the end of their month.
+    """
+    split_keys = [month.year * 100 + month.month for month in split_months]
+    period = MonthlySummary.year * 100 + MonthlySummary.month
+    month_lo = func.printf('%04d-%02d-01', MonthlySummary.year, MonthlySummary.month)
+    monthly = select(MonthlySummary.category_id, month_lo.label('lo'), func.date(month_lo, '+1 month').label('hi'),
+                     Account.currency_id, func.sum(MonthlySummary.total).label('total'))\
+        .join(Account, MonthlySummary.account_id == Account.id)\
+        .where(MonthlySummary.profile_id == profile_id, MonthlySummary.transaction_type == 'Expense',
+               MonthlySummary.year == today.year, period.notin_(split_keys))\
+        .group_by(MonthlySummary.category_id, MonthlySummary.year, MonthlySummary.month, Account.currency_id)
+    parts = [monthly]
+
+    if split_months:
+        day = func.date(Transaction.date)
+        ranges = [and_(Transaction.date >= datetime.combine(month, time.min),
+                       Transaction.date < datetime.combine(period_bounds('Monthly', month)[1], time.min))
+                  for month in split_months]
+        parts.append(select(Transaction.category_id, day.label('lo'), func.date(day, '+1 day').label('hi'),
+                            Account.currency_id, func.sum(Transaction.amount).label('total'))
+                     .join(Account, Transaction.account_id == Account.id)
+                     .where(Account.profile_id == profile_id, Transaction.transaction_type == 'Expense',
+                            or_(*ranges))
+                     .group_by(Transaction.category_id, day, Account.currency_id))
+
+    rows = union_all(*parts).subquery() if len(parts) > 1 else monthly.subquery()
+    month_end = func.date(rows.c.lo, 'start of month', '+1 month')
+    factor = historic_factor(rows.c.currency_id, base_currency_id, month_end)
+    # Materialized, so each row is converted once rather than once per budget joining it
+    return select(rows.c.category_id, rows.c.lo, rows.c.hi, converted(rows.c.total * factor).label('total'))\
+        .cte('spend_source').prefix_with('MATERIALIZED')
+
+
+def spend_query(profile_id, today, split_months=(), base_currency_id=None):
+    """Expense total per budget over each budget's window, in one grouped query.
+
+    Windows are built in SQL from the current month/year bounds and the
+    budget's own start/end dates (the same rules as budget_window), so the
+    query size doesn't grow with the number of budgets. Each budget sums the
+    spend_source rows of its category subtree (through the category closure
+    table) that lie inside its window, so overlapping budgets share month
+    totals instead of rescanning transactions.
+    """
+    month_start, month_end = period_bounds('Monthly', today)
+    year_start, year_end = period_bounds('Yearly', today)
+
+    def bound(value):
+        return literal(value.isoformat(), String)
+
+    # Windows and source rows compare as ISO date strings
+    start = func.max(case((Budget.period == 'Yearly', bound(year_start)), else_=bound(month_start)),
+                     func.coalesce(Budget.start_date, ''))
+    end = func.min(case((Budget.period == 'Yearly', bound(year_end)), else_=bound(month_end)),
+                   func.coalesce(func.date(Budget.end_date, '+1 day'), '9999-12-31'))
+
+    source = spend_source(profile_id, today, split_months, base_currency_id)
+    return select(Budget.id, func.coalesce(func.sum(source.c.total), 0))\
+        .join(CategoryClosure, CategoryClosure.ancestor_id == Budget.category_id)\
+        .outerjoin(source, and_(source.c.category_id == CategoryClosure.descendant_id,
+                                source.c.lo >= start, source.c.hi <= end))\
+        .where(Budget.profile_id == profile_id)\
+        .group_by(Budget.id)
+
+
+def get_budget_status(profile_id, today=None):
+    """Spend, utilization and projection for every budget of a profile.
+
+    Spend is in the profile's base currency. Cached per profile and day; the
+    cache is cleared whenever a commit touches transactions, budgets,
+    categories, accounts, currencies, rates or profiles.
+    """
+    today = today or date.today()
+    return budget_cache.get((profile_id, today), lambda: compute_budget_status(profile_id, today))
+
+
+def compute_budget_status(profile_id, today=None):
+    today = today or date.today()
+    budgets = Budget.query.filter_by(profile_id=profile_id).order_by(Budget.id).all()
+    windows = [budget_window(budget, today) for budget in budgets]
+    base = get_base_currency(profile_id)
+    query = spend_query(profile_id, today, partial_months(windows), base.id if base else None)
+    spent = dict(db.session.execute(query).all()) if budgets else {}
+    statuses = []
+    for budget, (start, end) in zip(budgets, windows):
+        amount = budget.amount or 0.0
+        total = spent.get(budget.id, 0.0)
+        statuses.append(BudgetStatus(
+            budget=budget,
+            start=start,
+            end=end - timedelta(days=1),
+            spent=total,
+            remaining=amount - total,
+            utilization=total / amount * 100 if amount else 0.0,
+            projected=projected_spend(total, start, end, today)
+        ))
+    return statuses
@@ -0,0 +1,134 @@
+import threading
+import uuid
+
+from flask import current_app
+from sqlalchemy import exc, insert, select, update
+
+# Marks this process's commits in the table_version stamps, so a process
+# only reacts to the commits of others when it syncs
+WRITER_ID = uuid.uuid4().hex[:16]
+
+# Every QueryCache declared; caches are module-level, so this stays small
+_caches = []
+
+
+class QueryCache:
+    """Cache for query results that depend on a set of tables.
+
+    Declared once at module level; the entries live per app in its
+    CacheStore (`app.extensions['query_cache']`), so apps on different
+    databases never share results. Entries are dropped whenever a commit
+    touches one of `tables`: commits of this process right away (see
+    `CacheStore.invalidate_tables`, called from the session commit hook in
+    create_app), commits of other processes such as CLI commands at the
+    next `CacheStore.sync`, which runs at the start of every request.
+    """
+
+    def __init__(self, name, tables):
+        self.name = name
+        self.tables = frozenset(tables)
+        _caches.append(self)
+
+    def _entries(self):
+        return current_app.extensions['query_cache'].entries(self)
+
+    @property
+    def version(self):
+        """Bumped on every invalidation, for callers that key files or
+        snapshots on the state of the tables instead of caching values."""
+        return self._entries().version
+
+    def get(self, key, loader):
+        return self._entries().get(key, loader)
+
+    def invalidate(self):
+        self._entries().invalidate()
+
+
+class CacheEntries:
+    def __init__(self, tables):
+        self.tables = tables
+        self.version = 0
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        with self._lock:
+            if key in self._data:
+                return self._data[key]
+            version = self.version
+        value = loader()
+        with self._lock:
+            # Don't keep a result computed while an invalidation happened
+            if version == self.version:
+                self._data[key] = value
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._data.clear()
+            self.version += 1
+
+
+class CacheStore:
+    """The cached entries of one app, and the table stamps it last saw."""
+
+    def __init__(self):
+        self._entries = {}
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def entries(self, cache):
+        with self._lock:
+            if cache.name not in self._entries:
+                self._entries[cache.name] = CacheEntries(cache.tables)
+            return self._entries[cache.name]
+
+    def invalidate_tables(self, tables):
+        with self._lock:
+            stale = [entries for entries in self._entries.values() if entries.tables & tables]
+        for entries in stale:
+            entries.invalidate()
+
+    def sync(self, session):
+        """Drop the entries that commits of other processes made stale.
+
+        One read of the small table_version table. Until the first sync
+        after such a commit (the next request, or the next run of a
+        background worker) cached results may be stale.
+        """
+        from app.models import TableVersion
+        try:
+            stamps = session.execute(select(TableVersion.table_name, TableVersion.version,
+                                            TableVersion.writer)).all()
+        except exc.OperationalError:
+            # Databases the bootstrap hasn't upgraded yet
+            session.rollback()
+            return
+        with self._lock:
+            stale = {name for name, version, writer in stamps
+                     if writer != WRITER_ID and self._seen.get(name) != version}
+            self._seen = {name: version for name, version, writer in stamps}
+        if stale:
+            self.invalidate_tables(stale)
+
+
+def stamp_tables(session, tables):
+    """Bump the table_version stamp of `tables` in the committing transaction.
+
+    Goes through the session's connection rather than session.execute, so
+    the stamp itself doesn't count as a touched table.
+    """
+    from app.models import TableVersion
+    table = TableVersion.__table__
+    conn = session.connection()
+    try:
+        for name in sorted(tables):
+            bumped = conn.execute(update(table).where(table.c.table_name == name)
+                                  .values(version=table.c.version + 1, writer=WRITER_ID))
+            if not bumped.rowcount:
+                conn.execute(insert(table).values(table_name=name, version=1, writer=WRITER_ID))
+    except exc.OperationalError:
+        # No table_version table yet: the bootstrap creates it first thing,
+        # so only its own earliest commits get here
+        pass
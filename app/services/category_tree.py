@@ -0,0 +1,152 @@
+from collections import namedtuple
+
+from sqlalchemy import delete, func, literal, select, true, update
+
+from app import db
+from app.models import Category, CategoryClosure
+from app.services.cache import QueryCache
+
+tree_cache = QueryCache('category_tree', {'category', 'category_closure'})
+
+CategoryNode = namedtuple('CategoryNode', 'id profile_id name parent_id icon color is_income depth')
+
+closure = CategoryClosure.__table__
+
+
+def add_category(category):
+    """Link a new (flushed) category under its parent in the closure table."""
+    db.session.execute(closure.insert().from_select(
+        ['ancestor_id', 'descendant_id', 'depth'],
+        select(closure.c.ancestor_id, literal(category.id), closure.c.depth + 1)
+        .where(closure.c.descendant_id == category.parent_id)
+        .union_all(select(literal(category.id), literal(category.id), literal(0)))
+    ))
+
+
+def descendants_query(category_id):
+    """Ids of the category and all of its descendants, through one index lookup."""
+    return select(closure.c.descendant_id).where(closure.c.ancestor_id == category_id)
+
+
+def subtree_ids(category_id):
+    return set(db.session.scalars(descendants_query(category_id)))
+
+
+def move_category(category, parent_id):
+    """Re-parent a category together with its whole subtree.
+
+    Raises ValueError if `parent_id` is the category itself or one of its
+    descendants, which would make the tree a cycle.
+    """
+    parent_id = int(parent_id) if parent_id else None
+    if parent_id == category.parent_id:
+        return
+    subtree = descendants_query(category.id)
+    if parent_id is not None and parent_id in subtree_ids(category.id):
+        raise ValueError("A category can't be moved under itself or one of its subcategories.")
+
+    # Drop the paths from the old ancestors into the subtree, keep the paths inside it
+    db.session.execute(delete(closure).where(
+        closure.c.descendant_id.in_(subtree),
+        closure.c.ancestor_id.notin_(subtree)
+    ))
+    if parent_id is not None:
+        above = closure.alias('above')
+        below = closure.alias('below')
+        db.session.execute(closure.insert().from_select(
+            ['ancestor_id', 'descendant_id', 'depth'],
+            # Every ancestor of the new parent times every node of the subtree
+            select(above.c.ancestor_id, below.c.descendant_id, above.c.depth + below.c.depth + 1)
+            .select_from(above.join(below, true()))
+            .where(above.c.descendant_id == parent_id, below.c.ancestor_id == category.id)
+        ))
+    category.parent_id = parent_id
+
+
+def remove_category(category):
+    """Take a category out of the tree before it is deleted.
+
+    Its children move up to its parent, so their subtrees stay intact.
+    """
+    ancestors = select(closure.c.ancestor_id).where(closure.c.descendant_id == category.id,
+                                                    closure.c.ancestor_id != category.id)
+    descendants = select(closure.c.descendant_id).where(closure.c.ancestor_id == category.id,
+                                                        closure.c.descendant_id != category.id)
+    db.session.execute(update(closure).where(
+        closure.c.ancestor_id.in_(ancestors),
+        closure.c.descendant_id.in_(descendants)
+    ).values(depth=closure.c.depth - 1))
+    db.session.execute(delete(closure).where(
+        (closure.c.ancestor_id == category.id) | (closure.c.descendant_id == category.id)
+    ))
+    Category.query.filter_by(parent_id=category.id).update({Category.parent_id: category.parent_id})
+
+
+def _expected_closure():
+    walk = select(Category.id.label('ancestor_id'), Category.id.label('descendant_id'), literal(0).label('depth'))\
+        .cte('walk', recursive=True)
+    # The depth cap stops a parent_id cycle from recursing forever
+    walk = walk.union_all(
+        select(walk.c.ancestor_id, Category.id, walk.c.depth + 1)
+        .join(walk, Category.parent_id == walk.c.descendant_id)
+        .where(walk.c.depth < select(func.count(Category.id)).scalar_subquery())
+    )
+    return select(walk.c.ancestor_id, walk.c.descendant_id, func.min(walk.c.depth))\
+        .group_by(walk.c.ancestor_id, walk.c.descendant_id)
+
+
+def rebuild():
+    """Recompute the whole closure table from Category.parent_id."""
+    db.session.execute(delete(closure))
+    db.session.execute(closure.insert().from_select(['ancestor_id', 'descendant_id', 'depth'], _expected_closure()))
+    db.session.commit()
+    return CategoryClosure.query.count()
+
+
+def check():
+    """Compare the closure table with a fresh walk of Category.parent_id.
+
+    Returns a list of (ancestor_id, descendant_id, expected depth, actual
+    depth) for every pair that is missing, wrong or should not exist.
+    """
+    expected = {(a, d): depth for a, d, depth in db.session.execute(_expected_closure())}
+    actual = {(a, d): depth for a, d, depth in db.session.execute(select(closure))}
+    return sorted((a, d, expected.get((a, d)), actual.get((a, d)))
+                  for a, d in expected.keys() | actual.keys()
+                  if expected.get((a, d)) != actual.get((a, d)))
+
+
+def get_category_tree(profile_id=None):
+    """Categories in display order (parents before their children, siblings
+    by name) with their depth, for the category pickers.
+
+    With a profile, only that profile's and the global categories are kept; a
+    category whose parent is hidden is shown at the top level. Cached as
+    plain rows and refreshed whenever a commit touches the categories.
+    """
+    return tree_cache.get(profile_id, lambda: _build_tree(profile_id))
+
+
+def _build_tree(profile_id):
+    query = db.session.query(Category.id, Category.profile_id, Category.name, Category.parent_id, Category.icon,
+                             Category.color, Category.is_income)
+    if profile_id is not None:
+        query = query.filter((Category.profile_id == profile_id) | (Category.profile_id == None))
+    rows = query.order_by(Category.name, Category.id).all()
+    visible = {row.id for row in rows}
+    children = {}
+    for row in rows:
+        parent_id = row.parent_id if row.parent_id in visible else None
+        children.setdefault(parent_id, []).append(row)
+
+    nodes, seen = [], set()
+    stack = [(row, 0) for row in reversed(children.get(None, []))]
+    while stack:
+        row, depth = stack.pop()
+        if row.id in seen:
+            continue
+        seen.add(row.id)
+        nodes.append(CategoryNode(*row, depth))
+        stack.extend((child, depth + 1) for child in reversed(children.get(row.id, [])))
+    return nodes
+
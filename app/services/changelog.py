@@ -0,0 +1,156 @@
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import scoped_session
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def capture_row(obj, op, dialect):
+    """Describe one flushed ORM row as a JSON-safe changelog entry.
+
+    Values are run through each column's bind processor so they are stored
+    exactly as SQLAlchemy wrote them to SQLite (datetimes as strings,
+    booleans as integers), which keeps a restored database identical at the
+    row level.
+    """
+    mapper = sa_inspect(obj).mapper
+    table = mapper.local_table
+    entry = {
+        'table': table.name,
+        'op': op,
+        'pk': {col.name: _db_value(col, getattr(obj, mapper.get_property_by_column(col).key), dialect)
+               for col in table.primary_key.columns}
+    }
+    if op != 'delete':
+        entry['values'] = {
+            col.name: _db_value(col, getattr(obj, mapper.get_property_by_column(col).key), dialect)
+            for col in table.columns
+        }
+    return entry
+
+
+def track_rows(session, table, **criteria):
+    """Note rows changed by a Core statement (which bypasses the flush).
+
+    Statements run with the `changelog_tracked` execution option should call
+    this so the rows can be re-read into the changelog before commit instead
+    of forcing a full snapshot.
+    """
+    if isinstance(session, scoped_session):
+        # Session events see the real session, not the thread-local proxy
+        session = session()
+    if not hasattr(session, '_tracked_rows'):
+        session._tracked_rows = []
+    session._tracked_rows.append((table, criteria))
+
+
+def note_change(session, summary):
+    """Add a line to the next backup caption, e.g. for a bulk statement whose
+    rows never pass through the flush."""
+    if isinstance(session, scoped_session):
+        session = session()
+    if not hasattr(session, '_pending_changes'):
+        session._pending_changes = []
+    session._pending_changes.append(summary)
+
+
+def read_tracked_rows(session, metadata):
+    """Re-read the rows noted by `track_rows` as changelog 'update' entries."""
+    entries = []
+    conn = session.connection()
+    for table, criteria in getattr(session, '_tracked_rows', []):
+        where = ' AND '.join(f'"{name}" = ?' for name in criteria)
+        result = conn.exec_driver_sql(f'SELECT * FROM "{table}" WHERE {where}', tuple(criteria.values()))
+        columns = list(result.keys())
+        pk_names = [col.name for col in metadata.tables[table].primary_key.columns]
+        for row in result:
+            values = dict(zip(columns, row))
+            entries.append({
+                'table': table,
+                'op': 'update',
+                'pk': {name: values[name] for name in pk_names},
+                'values': values
+            })
+    return entries
+
+
+def _db_value(column, value, dialect):
+    if value is None:
+        return None
+    processor = column.type.dialect_impl(dialect).bind_processor(dialect)
+    return processor(value) if processor else value
+
+
+def write_delta(path, rows, base, seq):
+    """Write changelog entries as a gzip-compressed JSON lines file."""
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write(json.dumps({'base': base, 'seq': seq, 'rows': len(rows)}) + '\n')
+        for row in rows:
+            f.write(json.dumps(row, separators=(',', ':')) + '\n')
+    return path
+
+
+def read_delta(path):
+    """Return (header, rows) for a delta file written by `write_delta`."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        rows = [json.loads(line) for line in f if line.strip()]
+    return header, rows
+
+
+def apply_rows(conn, rows):
+    for row in rows:
+        table = row['table']
+        if row['op'] == 'delete':
+            where = ' AND '.join(f'"{name}" = ?' for name in row['pk'])
+            conn.execute(f'DELETE FROM "{table}" WHERE {where}', list(row['pk'].values()))
+        else:
+            names = list(row['values'])
+            columns = ', '.join(f'"{name}"' for name in names)
+            placeholders = ', '.join('?' for _ in names)
+            conn.execute(f'INSERT OR REPLACE INTO "{table}" ({columns}) VALUES ({placeholders})',
+                         [row['values'][name] for name in names])
+
+
+def restore(snapshot_path, delta_paths, output_path):
+    """Rebuild a database from a full snapshot plus its delta files.
+
+    Every delta must have been taken against this snapshot, and together they
+    must form an unbroken sequence; they are then applied in order inside
+    one transaction. Returns the number of deltas applied.
+    """
+    deltas = [read_delta(path) for path in delta_paths]
+    deltas.sort(key=lambda delta: delta[0]['seq'])
+    for header, _ in deltas:
+        if header['base'] not in os.path.basename(snapshot_path):
+            raise ValueError(f"Delta {header['seq']} was taken against snapshot {header['base']}")
+    if [header['seq'] for header, _ in deltas] != list(range(1, len(deltas) + 1)):
+        raise ValueError("Delta sequence has gaps; restore needs every delta since the snapshot")
+
+    if snapshot_path.endswith('.gz'):
+        with gzip.open(snapshot_path, 'rb') as src, open(output_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    elif snapshot_path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to restore .zst snapshots")
+        with open(snapshot_path, 'rb') as src, open(output_path, 'wb') as dst:
+            zstandard.ZstdDecompressor().copy_stream(src, dst)
+    else:
+        shutil.copyfile(snapshot_path, output_path)
+
+    conn = sqlite3.connect(output_path)
+    try:
+        with conn:
+            for _, rows in deltas:
+                apply_rows(conn, rows)
+    finally:
+        conn.close()
+    return len(deltas)
@@ -0,0 +1,214 @@
+import atexit
+import importlib.util
+import os
+import threading
+import time
+
+from app import db
+from app.models import Account, Category, Transaction
+from app.services.cache import QueryCache
+from app.services.transaction_service import filtered_query
+
+# pyarrow is optional and slow to import; it is loaded on first export
+pa = None
+pq = None
+
+COLUMNAR_CHUNK_SIZE = 50000
+UNCATEGORIZED = 'Uncategorized'
+
+
+def available():
+    return pa is not None or importlib.util.find_spec('pyarrow') is not None
+
+
+def require_pyarrow():
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet/Arrow export needs the 'pyarrow' package installed.")
+        pa, pq = pyarrow, pyarrow.parquet
+
+
+def transaction_schema(with_profile=False):
+    label = pa.dictionary(pa.int32(), pa.string())
+    fields = [
+        ('Date', pa.timestamp('us')),
+        ('Account', label),
+        ('Type', label),
+        ('Category', label),
+        ('Amount', pa.float64()),
+        ('Description', pa.string()),
+    ]
+    if with_profile:
+        fields.append(('Profile', pa.int32()))
+    return pa.schema(fields)
+
+
+def _dictionaries(profile_id=None):
+    """Fixed label dictionaries shared by every batch of one export, limited
+    to the profile's accounts and categories when given one.
+
+    Rows carry account/category ids, which are turned into indices into
+    these dictionaries, so the export query needs no joins for the labels
+    and every batch of an Arrow IPC file uses the same dictionary.
+    """
+    accounts = Account.query.with_entities(Account.id, Account.name)
+    if profile_id is not None:
+        accounts = accounts.filter(Account.profile_id == profile_id)
+    accounts = accounts.all()
+    categories = Category.query.with_entities(Category.id, Category.name)
+    if profile_id is not None:
+        # The profile's own and the global categories, never another profile's
+        categories = categories.filter((Category.profile_id == profile_id) | (Category.profile_id.is_(None)))
+    categories = categories.all()
+    types = sorted(t for (t,) in db.session.query(Transaction.transaction_type).distinct() if t)
+    return {
+        'account': ({a.id: i for i, a in enumerate(accounts)}, pa.array([a.name for a in accounts], pa.string())),
+        'category': ({c.id: i for i, c in enumerate(categories)},
+                     pa.array([c.name for c in categories] + [UNCATEGORIZED], pa.string())),
+        'type': ({t: i for i, t in enumerate(types)}, pa.array(types + [''], pa.string())),
+    }
+
+
+def _batches(query, schema, dictionaries, chunk_size, progress=None):
+    account_index, account_labels = dictionaries['account']
+    category_index, category_labels = dictionaries['category']
+    type_index, type_labels = dictionaries['type']
+    uncategorized = len(category_labels) - 1
+    untyped = len(type_labels) - 1
+    with_profile = 'Profile' in schema.names
+
+    def to_batch(rows):
+        columns = list(zip(*rows))
+        arrays = [
+            pa.array(columns[0], pa.timestamp('us')),
+            pa.DictionaryArray.from_arrays(pa.array([account_index[a] for a in columns[1]], pa.int32()), account_labels),
+            pa.DictionaryArray.from_arrays(pa.array([type_index.get(t, untyped) for t in columns[2]], pa.int32()), type_labels),
+            pa.DictionaryArray.from_arrays(
+                pa.array([category_index.get(c, uncategorized) for c in columns[3]], pa.int32()), category_labels),
+            pa.array(columns[4], pa.float64()),
+            pa.array(columns[5], pa.string()),
+        ]
+        if with_profile:
+            arrays.append(pa.array(columns[6], pa.int32()))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    rows = []
+    count = 0
+    for row in query.yield_per(chunk_size):
+        rows.append(row)
+        if len(rows) == chunk_size:
+            count += len(rows)
+            yield to_batch(rows)
+            rows = []
+            if progress:
+                progress(count)
+    if rows:
+        count += len(rows)
+        yield to_batch(rows)
+    if progress:
+        progress(count)
+
+
+def _write(batches, schema, output, fmt):
+    if fmt == 'parquet':
+        with pq.ParquetWriter(output, schema, compression='zstd') as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    else:
+        # Uncompressed IPC file, so readers can memory-map it
+        with pa.ipc.new_file(output, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+
+def export_transactions_to_columnar(profile_id, filters=None, output=None, fmt='parquet',
+                                    chunk_size=COLUMNAR_CHUNK_SIZE, progress=None):
+    """Write the profile's (filtered) transactions as Parquet or Arrow IPC.
+
+    Columns are typed (timestamp date, float64 amount) and account, type
+    and category are dictionary-encoded. Rows are read and written in
+    chunks of `chunk_size`. Returns `output`.
+    """
+    require_pyarrow()
+    schema = transaction_schema()
+    query = filtered_query(profile_id, filters or {})\
+        .with_entities(Transaction.date, Transaction.account_id, Transaction.transaction_type,
+                       Transaction.category_id, Transaction.amount, Transaction.description)\
+        .order_by(Transaction.date, Transaction.id)
+    _write(_batches(query, schema, _dictionaries(profile_id), chunk_size, progress), schema, output, fmt)
+    return output
+
+
+def write_analytics_snapshot(directory, chunk_size=COLUMNAR_CHUNK_SIZE):
+    """Write every profile's transactions to <directory>/transactions.arrow.
+
+    The file is written next to the old one and swapped in with os.replace,
+    so a reader never sees a partial snapshot. Returns the snapshot path.
+    """
+    require_pyarrow()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, 'transactions.arrow')
+    schema = transaction_schema(with_profile=True)
+    query = Transaction.query.join(Account, Transaction.account_id == Account.id)\
+        .with_entities(Transaction.date, Transaction.account_id, Transaction.transaction_type,
+                       Transaction.category_id, Transaction.amount, Transaction.description, Account.profile_id)\
+        .order_by(Transaction.date, Transaction.id)
+    partial = path + '.part'
+    _write(_batches(query, schema, _dictionaries(), chunk_size), schema, partial, 'arrow')
+    os.replace(partial, path)
+    return path
+
+
+# Never holds values; its version changes with the snapshot's tables
+snapshot_data = QueryCache('analytics_snapshot', {'transaction', 'account', 'category'})
+
+
+class AnalyticsSnapshotWriter:
+    """Keeps the on-disk Arrow analytics snapshot in step with the database.
+
+    A background thread checks every `interval` seconds whether a commit
+    has touched transactions, accounts or categories since the last write
+    and, if so, rewrites the snapshot. External tools read the snapshot
+    file instead of the live SQLite database.
+    """
+
+    def __init__(self, app, directory, interval=60.0):
+        self.app = app
+        self.directory = directory
+        self.interval = interval
+        self.last_written = None
+        self.last_version = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='analytics-snapshot', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def refresh(self):
+        try:
+            with self.app.app_context():
+                version = snapshot_data.version
+                write_analytics_snapshot(self.directory)
+        except Exception as e:
+            print(f"Analytics Snapshot Error: {e}")
+            return False
+        self.last_version = version
+        self.last_written = time.time()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        # The first check waits one interval, so startup has created the tables
+        while not self._stop.wait(self.interval):
+            with self.app.app_context():
+                # Also catch the commits of other processes
+                self.app.extensions['query_cache'].sync(db.session)
+                changed = snapshot_data.version != self.last_version
+            if changed:
+                self.refresh()
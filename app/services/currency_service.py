@@ -0,0 +1,113 @@
+from collections import namedtuple
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import Float, func, literal, select, type_coerce
+
+from app import db
+from app.models import Currency, ExchangeRate, Money, Profile
+from app.services.cache import QueryCache
+
+# Rates, and each profile's base currency, refreshed whenever a commit
+# touches currencies, the rate history or profiles. Rates set with
+# `flask currency set-rate` are committed by another process; a running app
+# picks them up at its next request (see app.services.cache)
+rate_cache = QueryCache('rates', {'currency', 'exchange_rate', 'profile'})
+
+CurrencyRate = namedtuple('CurrencyRate', 'id code symbol rate')
+
+# effective_from of the rates a currency had before any history was kept
+EPOCH = datetime(1970, 1, 1)
+
+
+def get_currencies():
+    """{currency id: CurrencyRate} with the current rates."""
+    return rate_cache.get('currencies', lambda: {
+        row.id: CurrencyRate(*row)
+        for row in db.session.query(Currency.id, Currency.code, Currency.symbol, Currency.exchange_rate)
+    })
+
+
+def get_base_currency(profile_id):
+    """The currency a profile's totals are converted into.
+
+    The profile's own base currency, else the BASE_CURRENCY setting, else
+    None (amounts are then added up unconverted).
+    """
+    def load():
+        currencies = get_currencies()
+        base_id = db.session.query(Profile.base_currency_id).filter(Profile.id == profile_id).scalar()
+        if base_id in currencies:
+            return currencies[base_id]
+        code = current_app.config.get('BASE_CURRENCY')
+        return next((c for c in currencies.values() if c.code == code), None)
+    return rate_cache.get(('base', profile_id), load)
+
+
+def current_factor(source, base):
+    """SQL factor taking amounts in the `source` currency to the `base` one.
+
+    Both are Currency aliases the caller outer-joins (source on the
+    account's currency, base on the base currency id); a missing account
+    currency counts as the base currency and a missing base leaves amounts
+    unconverted.
+    """
+    return func.coalesce(base.exchange_rate / func.coalesce(source.exchange_rate, base.exchange_rate),
+                         literal(1.0, Float))
+
+
+def rate_at(currency_id, at):
+    """SQL scalar: the currency's rate in effect just before `at`.
+
+    Falls back to the current rate for dates older than the whole history.
+    One lookup on the (currency_id, effective_from) unique index.
+    """
+    historic = select(ExchangeRate.rate)\
+        .where(ExchangeRate.currency_id == currency_id, ExchangeRate.effective_from < at)\
+        .order_by(ExchangeRate.effective_from.desc()).limit(1).scalar_subquery()
+    current = select(Currency.exchange_rate).where(Currency.id == currency_id).scalar_subquery()
+    return func.coalesce(historic, current)
+
+
+def historic_factor(currency_id, base_currency_id, at):
+    """SQL factor taking amounts in `currency_id` to the base currency at the
+    rates in effect just before `at` (an ISO date string expression)."""
+    if base_currency_id is None:
+        return literal(1.0, Float)
+    base_id = literal(base_currency_id)
+    return rate_at(base_id, at) / rate_at(func.coalesce(currency_id, base_id), at)
+
+
+def converted(cents):
+    """A converted amount of cents (no longer whole) rounded back to a Money value."""
+    return type_coerce(func.round(cents), Money)
+
+
+def set_rate(currency, rate, effective_from=None):
+    """Record a new rate for a currency from `effective_from` (default now).
+
+    Currency.exchange_rate keeps the latest rate in the history, so setting
+    a past rate only changes historical conversions.
+    """
+    effective_from = effective_from or datetime.now()
+    entry = ExchangeRate.query.filter_by(currency_id=currency.id, effective_from=effective_from).first()
+    if entry:
+        entry.rate = rate
+    else:
+        db.session.add(ExchangeRate(currency_id=currency.id, rate=rate, effective_from=effective_from))
+    db.session.flush()
+    latest = ExchangeRate.query.filter_by(currency_id=currency.id)\
+        .order_by(ExchangeRate.effective_from.desc()).first()
+    currency.exchange_rate = latest.rate
+    currency.last_updated = datetime.now()
+
+
+def seed_rate_history():
+    """Start the history of every currency that has none with its current rate."""
+    missing = Currency.query.filter(~Currency.id.in_(select(ExchangeRate.currency_id))).all()
+    for currency in missing:
+        db.session.add(ExchangeRate(currency_id=currency.id, rate=currency.exchange_rate or 1.0,
+                                    effective_from=EPOCH))
+    if missing:
+        db.session.commit()
+    return len(missing)
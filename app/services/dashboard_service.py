@@ -0,0 +1,115 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.models import MINOR_UNITS, Account, Category, Currency, Investment, MonthlySummary
+from app.services.cache import QueryCache
+from app.services.currency_service import converted, current_factor, get_base_currency, historic_factor
+
+dashboard_cache = QueryCache('dashboard', {'transaction', 'account', 'category', 'monthly_summary',
+                                           'currency', 'exchange_rate', 'profile'})
+
+
+def net_worth_query(profile_id, base_currency_id):
+    """Account balances converted at the current rates plus investments, in one query.
+
+    Investments carry no currency of their own and count as base currency.
+    """
+    source, base = aliased(Currency), aliased(Currency)
+    balances = select(converted(func.sum(Account.balance * current_factor(source, base))))\
+        .outerjoin(source, Account.currency_id == source.id)\
+        .outerjoin(base, base.id == base_currency_id)\
+        .where(Account.profile_id == profile_id)
+    investments = select(func.sum(Investment.current_value)).where(Investment.profile_id == profile_id)
+    return select(balances.scalar_subquery(), investments.scalar_subquery())
+
+
+def get_net_worth(profile_id):
+    base = get_base_currency(profile_id)
+    balances, investments = db.session.execute(net_worth_query(profile_id, base.id if base else None)).one()
+    return (cents(balances) + cents(investments)) / MINOR_UNITS
+
+
+def cents(amount):
+    """A Money value (a float of whole cents) back as an exact integer of cents."""
+    return round((amount or 0) * MINOR_UNITS)
+
+
+def month_starts(now, months):
+    """First day of each of the last `months` months, oldest first."""
+    starts = []
+    year, month = now.year, now.month
+    for _ in range(months):
+        starts.append(datetime(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts[::-1]
+
+
+def get_dashboard_metrics(profile_id, months=6, now=None):
+    """Income/expense per month and current-month expense per category.
+
+    Amounts are in the profile's base currency, each month converted at the
+    rates in effect at its end. Cached per profile and month; the cache is
+    cleared whenever a commit touches transactions, accounts, categories,
+    currencies, rates or profiles.
+    """
+    now = now or datetime.now()
+    key = (profile_id, months, now.year, now.month)
+    return dashboard_cache.get(key, lambda: compute_dashboard_metrics(profile_id, months, now))
+
+
+def rollup_query(profile_id, first_month, now, base_currency_id=None):
+    """Income/expense per month, type and category name from the monthly rollup,
+    converted into the base currency at the rates in effect at each month's end."""
+    # One grouped query over the monthly rollup, O(months) rows instead of O(transactions).
+    # Totals are first grouped per account currency, so rates are looked up once per group.
+    period = MonthlySummary.year * 100 + MonthlySummary.month
+    per_currency = db.session.query(MonthlySummary.year, MonthlySummary.month, MonthlySummary.transaction_type,
+                                    Category.name.label('category_name'), Account.currency_id,
+                                    func.sum(MonthlySummary.total).label('total'))\
+        .join(Account, MonthlySummary.account_id == Account.id)\
+        .outerjoin(Category, MonthlySummary.category_id == Category.id)\
+        .filter(MonthlySummary.profile_id == profile_id)\
+        .filter(MonthlySummary.transaction_type.in_(('Income', 'Expense')))\
+        .filter(period >= first_month.year * 100 + first_month.month, period <= now.year * 100 + now.month)\
+        .group_by(MonthlySummary.year, MonthlySummary.month, MonthlySummary.transaction_type, Category.name,
+                  Account.currency_id)\
+        .having(func.sum(MonthlySummary.tx_count) != 0).subquery()
+
+    rows = per_currency.c
+    month_end = func.date(func.printf('%04d-%02d-01', rows.year, rows.month), '+1 month')
+    factor = historic_factor(rows.currency_id, base_currency_id, month_end)
+    return db.session.query(rows.year, rows.month, rows.transaction_type, rows.category_name,
+                            converted(func.sum(rows.total * factor)))\
+        .group_by(rows.year, rows.month, rows.transaction_type, rows.category_name)
+
+
+def compute_dashboard_metrics(profile_id, months=6, now=None):
+    now = now or datetime.now()
+    starts = month_starts(now, months)
+
+    base = get_base_currency(profile_id)
+    rows = rollup_query(profile_id, starts[0], now, base.id if base else None).all()
+
+    # Added up in integer cents and turned into amounts once, so no float drift
+    keys = [start.strftime('%Y-%m') for start in starts]
+    totals = {(k, t): 0 for k in keys for t in ('Income', 'Expense')}
+    current = keys[-1]
+    categories = {}
+    for year, month_number, tx_type, category_name, amount in rows:
+        month = f"{year:04d}-{month_number:02d}"
+        totals[(month, tx_type)] = totals.get((month, tx_type), 0) + cents(amount)
+        if month == current and tx_type == 'Expense' and category_name is not None:
+            categories[category_name] = categories.get(category_name, 0) + cents(amount)
+
+    return {
+        'chart_months': [start.strftime('%b') for start in starts],
+        'income_data': [totals[(k, 'Income')] / MINOR_UNITS for k in keys],
+        'expense_data': [totals[(k, 'Expense')] / MINOR_UNITS for k in keys],
+        'monthly_income': totals[(current, 'Income')] / MINOR_UNITS,
+        'monthly_expense': totals[(current, 'Expense')] / MINOR_UNITS,
+        'category_labels': list(categories),
+        'category_values': [v / MINOR_UNITS for v in categories.values()]
+    }
@@ -0,0 +1,131 @@
+import hashlib
+import re
+from datetime import timedelta
+from difflib import SequenceMatcher
+
+from sqlalchemy import bindparam, func, update
+
+from app import db
+from app.models import Transaction
+
+FINGERPRINT_BATCH_SIZE = 5000
+# SQLite builds before 3.32 allow at most 999 bound parameters per statement
+IN_CLAUSE_SIZE = 900
+FUZZY_DATE_WINDOW = timedelta(days=1)
+FUZZY_MIN_SIMILARITY = 0.8
+
+
+def normalize_description(text):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', (text or '').lower()).split())
+
+
+def fingerprint(account_id, date, amount, description):
+    """Short stable hash of (account, day, amount in cents, normalized description)."""
+    day = date.strftime('%Y-%m-%d') if date else ''
+    raw = f"{int(account_id)}|{day}|{round(float(amount or 0) * 100)}|{normalize_description(description)}"
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def fingerprint_for(transaction):
+    return fingerprint(transaction.account_id, transaction.date, transaction.amount, transaction.description)
+
+
+def _chunks(values, size=IN_CLAUSE_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class DuplicateChecker:
+    """Checks batches of candidate rows against the transactions already stored.
+
+    Exact duplicates are found by fingerprint with one IN query per batch.
+    Fingerprints are counted, so a statement that legitimately has two
+    identical lines only loses as many rows as already exist. Near
+    duplicates (same account and amount, date within a day, similar
+    description) are looked up through the (account_id, amount) index and
+    only compared within that block.
+
+    Only rows with an id up to `max_id` count as existing, so rows inserted
+    by the import doing the checking are never matched against each other.
+    """
+
+    def __init__(self, max_id=None):
+        if max_id is None:
+            max_id = db.session.query(func.max(Transaction.id)).scalar() or 0
+        self.max_id = max_id
+        self._remaining = {}
+
+    def exact(self, fingerprints):
+        """Return a list of booleans: True where the row already exists."""
+        unknown = {fp for fp in fingerprints if fp not in self._remaining}
+        for chunk in _chunks(unknown):
+            counts = db.session.query(Transaction.fingerprint, func.count(Transaction.id))\
+                .filter(Transaction.fingerprint.in_(chunk), Transaction.id <= self.max_id)\
+                .group_by(Transaction.fingerprint).all()
+            self._remaining.update({fp: 0 for fp in chunk})
+            self._remaining.update(dict(counts))
+        duplicates = []
+        for fp in fingerprints:
+            if self._remaining[fp] > 0:
+                self._remaining[fp] -= 1
+                duplicates.append(True)
+            else:
+                duplicates.append(False)
+        return duplicates
+
+    def near(self, rows):
+        """Map row index -> id of a similar existing transaction.
+
+        `rows` are dicts with account_id, date, amount and description.
+        """
+        if not rows:
+            return {}
+        first = min(row['date'] for row in rows) - FUZZY_DATE_WINDOW
+        last = max(row['date'] for row in rows) + FUZZY_DATE_WINDOW
+        blocks = {}
+        for account_id in {row['account_id'] for row in rows}:
+            amounts = {row['amount'] for row in rows if row['account_id'] == account_id}
+            for chunk in _chunks(amounts):
+                existing = db.session.query(Transaction.id, Transaction.amount, Transaction.date,
+                                            Transaction.description)\
+                    .filter(Transaction.account_id == account_id, Transaction.amount.in_(chunk),
+                            Transaction.date.between(first, last), Transaction.id <= self.max_id).all()
+                for tx_id, amount, date, description in existing:
+                    blocks.setdefault((account_id, amount), []).append(
+                        (tx_id, date, normalize_description(description)))
+
+        matches = {}
+        for index, row in enumerate(rows):
+            candidates = blocks.get((row['account_id'], row['amount']))
+            if not candidates:
+                continue
+            description = normalize_description(row['description'])
+            for tx_id, date, existing_description in candidates:
+                if date is None or abs(date - row['date']) > FUZZY_DATE_WINDOW:
+                    continue
+                if not description or not existing_description or \
+                        SequenceMatcher(None, description, existing_description).ratio() >= FUZZY_MIN_SIMILARITY:
+                    matches[index] = tx_id
+                    break
+        return matches
+
+
+def backfill_fingerprints(batch_size=FINGERPRINT_BATCH_SIZE):
+    """Fill in fingerprints for transactions stored before they existed."""
+    table = Transaction.__table__
+    stmt = update(table).where(table.c.id == bindparam('tx_id')).values(fingerprint=bindparam('fp'))
+    total = 0
+    while True:
+        rows = db.session.query(Transaction.id, Transaction.account_id, Transaction.date,
+                                Transaction.amount, Transaction.description)\
+            .filter(Transaction.fingerprint == None).limit(batch_size).all()
+        if not rows:
+            break
+        db.session.execute(stmt, [{'tx_id': row.id, 'fp': fingerprint(row.account_id, row.date, row.amount,
+                                                                        row.description)}
+                                  for row in rows])
+        total += len(rows)
+    db.session.commit()
+    return total
@@ -0,0 +1,180 @@
+import atexit
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.cache import QueryCache
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+}
+
+# Never holds values; its version changes with the exported tables
+export_data = QueryCache('export_data', {'transaction', 'account', 'category'})
+
+# <cache key>.<format>, plus .part while being written: the only files the
+# manager ever deletes from its directory
+EXPORT_FILE = re.compile(r'^[0-9a-f]{40}\.(%s)(\.part)?$' % '|'.join(EXPORT_FORMATS))
+
+_manager_lock = threading.Lock()
+
+
+class ExportJob:
+    def __init__(self, job_id, fmt, profile_id, filters, key, path):
+        self.id = job_id
+        self.format = fmt
+        self.profile_id = profile_id
+        self.filters = filters
+        self.key = key
+        self.path = path
+        self.status = 'queued' # queued, running, done, failed
+        self.rows = 0
+        self.total = None
+        self.error = None
+        self.cached = False
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'format': self.format,
+            'status': self.status,
+            'rows': self.rows,
+            'total': self.total,
+            'cached': self.cached,
+            'error': self.error
+        }
+
+
+class ExportJobManager:
+    """Runs exports on a small thread pool and keeps the files on disk.
+
+    A finished file is cached under a key made of (format, profile, filters,
+    data version). The data version changes whenever a commit touches
+    transactions, accounts or categories, so a repeat request for the same
+    export is served straight from disk until the data changes. Files from
+    earlier runs of the app are never reused since their data version can't
+    be trusted; they are deleted once older than `job_ttl`.
+    """
+
+    def __init__(self, app, directory=None, max_workers=2, job_ttl=3600):
+        self.app = app
+        self.directory = directory or os.path.join(app.instance_path, 'exports')
+        self.job_ttl = job_ttl
+        self._boot = uuid.uuid4().hex[:8]
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export-job')
+        os.makedirs(self.directory, exist_ok=True)
+        self._sweep()
+        atexit.register(self.stop)
+
+    def cache_key(self, fmt, profile_id, filters):
+        filter_part = repr(sorted((filters or {}).items()))
+        raw = f"{self._boot}|{export_data.version}|{fmt}|{profile_id}|{filter_part}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def submit(self, fmt, profile_id, filters=None):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        key = self.cache_key(fmt, profile_id, filters)
+        path = os.path.join(self.directory, f"{key}.{fmt}")
+        with self._lock:
+            self._expire_jobs()
+            # Reuse an identical export that is queued, running or finished
+            for job in self._jobs.values():
+                if job.key == key and job.status != 'failed':
+                    return job
+            job = ExportJob(uuid.uuid4().hex, fmt, profile_id, filters or {}, key, path)
+            self._jobs[job.id] = job
+            if os.path.exists(path):
+                job.status, job.cached, job.finished_at = 'done', True, time.time()
+                return job
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stop(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _sweep(self):
+        # The directory may be a user-chosen EXPORT_DIR holding other files, or
+        # be shared with another running instance, so only old files named like
+        # the manager's own go
+        cutoff = time.time() - self.job_ttl
+        for entry in os.scandir(self.directory):
+            try:
+                if EXPORT_FILE.match(entry.name) and entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _expire_jobs(self):
+        now = time.time()
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and now - j.finished_at > self.job_ttl]:
+            job = self._jobs.pop(job_id)
+            if os.path.exists(job.path) and not any(j.path == job.path for j in self._jobs.values()):
+                os.remove(job.path)
+
+    def _run(self, job):
+        from app.main.utils import export_transactions_to_csv, export_transactions_to_excel
+        from app.services.columnar_export import export_transactions_to_columnar
+        from app.services.transaction_service import filtered_query
+
+        def progress(count):
+            job.rows = count
+
+        partial = job.path + '.part'
+        job.status = 'running'
+        try:
+            with self.app.app_context():
+                job.total = filtered_query(job.profile_id, job.filters).count()
+                if job.format == 'csv':
+                    with open(partial, 'wb') as output:
+                        for chunk in export_transactions_to_csv(job.profile_id, job.filters, progress=progress):
+                            output.write(chunk)
+                elif job.format == 'xlsx':
+                    export_transactions_to_excel(job.profile_id, job.filters, output=partial, progress=progress)
+                else:
+                    export_transactions_to_columnar(job.profile_id, job.filters, output=partial,
+                                                    fmt=job.format, progress=progress)
+            os.replace(partial, job.path)
+            job.status = 'done'
+        except Exception as e:
+            job.status, job.error = 'failed', str(e)
+            if os.path.exists(partial):
+                os.remove(partial)
+            print(f"Export Job Error: {e}")
+        finally:
+            job.finished_at = time.time()
+
+
+def get_export_jobs(app):
+    """The app's ExportJobManager, started with the first export.
+
+    Created on demand, so app instances that never export (CLI commands in
+    particular) don't start a thread pool or touch the export directory.
+    """
+    manager = app.extensions.get('export_jobs')
+    if manager is None:
+        with _manager_lock:
+            manager = app.extensions.get('export_jobs')
+            if manager is None:
+                manager = app.extensions['export_jobs'] = ExportJobManager(
+                    app,
+                    directory=app.config.get('EXPORT_DIR'),
+                    max_workers=app.config.get('EXPORT_JOB_WORKERS', 2),
+                    job_ttl=app.config.get('EXPORT_JOB_TTL_SECONDS', 3600)
+                )
+    return manager
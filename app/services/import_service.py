@@ -0,0 +1,289 @@
+import csv
+import io
+import os
+import re
+from datetime import datetime
+from types import SimpleNamespace
+
+from app import db
+from app.models import Account, Category, Transaction
+from app.services import ledger_service, rollup_service
+from app.services.changelog import note_change
+from app.services.dedup_service import DuplicateChecker, fingerprint
+
+IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 50
+
+# Header names recognised for each field, compared case-insensitively
+COLUMN_ALIASES = {
+    'date': ('date', 'transaction date', 'posted date', 'posting date', 'value date'),
+    'amount': ('amount', 'value', 'transaction amount'),
+    'debit': ('debit', 'withdrawal', 'withdrawals', 'money out'),
+    'credit': ('credit', 'deposit', 'deposits', 'money in'),
+    'description': ('description', 'memo', 'narration', 'details', 'payee', 'name'),
+    'type': ('type', 'transaction type'),
+    'account': ('account', 'account name'),
+    'category': ('category', 'category name'),
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y/%m/%d')
+
+TYPE_NAMES = {
+    'income': 'Income', 'credit': 'Income', 'cr': 'Income', 'deposit': 'Income',
+    'expense': 'Expense', 'debit': 'Expense', 'dr': 'Expense', 'withdrawal': 'Expense',
+    'transfer': 'Transfer',
+}
+
+
+class StatementImportError(ValueError):
+    pass
+
+
+def read_csv_rows(stream):
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    yield from csv.DictReader(text)
+
+
+def read_xlsx_rows(stream):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+        for values in rows:
+            if any(value is not None for value in values):
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def read_ofx_rows(stream, chunk_size=64 * 1024):
+    """Yield the STMTTRN entries of an OFX/QFX statement (SGML or XML).
+
+    Reads the file in chunks and splits it on tags, so statements of any
+    size are handled without loading them whole.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8', errors='replace')
+    current = None
+    rest = ''
+    while True:
+        chunk = text.read(chunk_size)
+        tokens = (rest + chunk).split('<')
+        rest = tokens.pop() if chunk else ''
+        for token in tokens:
+            tag, _, value = token.partition('>')
+            tag = tag.strip().upper()
+            if tag == 'STMTTRN':
+                current = {}
+            elif tag == '/STMTTRN' and current is not None:
+                yield {
+                    'Date': current.get('DTPOSTED', '')[:8],
+                    'Amount': current.get('TRNAMT', ''),
+                    'Description': ' - '.join(filter(None, (current.get('NAME'), current.get('MEMO')))),
+                }
+                current = None
+            elif current is not None and not tag.startswith('/') and value.strip():
+                current[tag] = value.strip()
+        if not chunk:
+            break
+
+
+READERS = {'.csv': read_csv_rows, '.txt': read_csv_rows, '.xlsx': read_xlsx_rows,
+           '.ofx': read_ofx_rows, '.qfx': read_ofx_rows}
+
+
+def detect_mapping(columns):
+    """Map each known field to the first matching column header."""
+    by_name = {str(column).strip().lower(): column for column in columns if column is not None}
+    mapping = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in by_name:
+                mapping[field] = by_name[alias]
+                break
+    return mapping
+
+
+def parse_amount(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    negative = text.startswith('(') and text.endswith(')')
+    text = re.sub(r'[^0-9.\-]', '', text)
+    amount = float(text)
+    return -amount if negative else amount
+
+
+def parse_date(value, date_format=None):
+    if isinstance(value, datetime):
+        return value
+    text = str(value).strip()
+    formats = (date_format,) if date_format else DATE_FORMATS + ('%Y%m%d',)
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised date '{text}'")
+
+
+def detect_date_format(value):
+    """The first known format that parses `value`, or None."""
+    if isinstance(value, datetime):
+        return None
+    for fmt in DATE_FORMATS + ('%Y%m%d',):
+        try:
+            datetime.strptime(str(value).strip(), fmt)
+            return fmt
+        except ValueError:
+            continue
+    return None
+
+
+def import_transactions(profile_id, rows, mapping=None, default_account_id=None, date_format=None,
+                        batch_size=IMPORT_BATCH_SIZE, skip_duplicates=True):
+    """Insert parsed statement rows as transactions for one profile.
+
+    Accounts and categories are resolved from in-memory lookup tables,
+    rows are inserted `batch_size` at a time with executemany, and balances
+    and the monthly rollup get one aggregated update per account / rollup
+    row at the end. Everything runs in a single database transaction, and
+    the backup hook sees one "Imported" change instead of one per row.
+
+    Each batch is checked against the stored transactions (see
+    dedup_service.DuplicateChecker): exact duplicates are skipped when
+    `skip_duplicates` is set, near duplicates are imported but reported.
+
+    Returns a dict with the number of rows imported, skipped and found to
+    be duplicates, the first few row errors as (line, message) and the
+    first few near duplicates as (line, existing transaction id).
+    """
+    accounts = {name.strip().lower(): account_id for account_id, name in
+                Account.query.with_entities(Account.id, Account.name).filter_by(profile_id=profile_id)}
+    account_ids = set(accounts.values())
+    if default_account_id is not None and int(default_account_id) not in account_ids:
+        raise StatementImportError("The default account does not belong to this profile.")
+    categories = {}
+    for category_id, name in Category.query.with_entities(Category.id, Category.name)\
+            .filter((Category.profile_id == profile_id) | (Category.profile_id == None)):
+        categories.setdefault(name.strip().lower(), category_id)
+
+    checker = DuplicateChecker()
+    balance_deltas = {}
+    rollup_totals = {}
+    batch = []
+    lines = []
+    result = {'imported': 0, 'skipped': 0, 'duplicates': 0, 'errors': [], 'possible_duplicates': []}
+
+    def write_batch():
+        duplicates = checker.exact([values['fingerprint'] for values in batch]) if skip_duplicates \
+            else [False] * len(batch)
+        fresh = [values for values, duplicate in zip(batch, duplicates) if not duplicate]
+        fresh_lines = [line for line, duplicate in zip(lines, duplicates) if not duplicate]
+        result['duplicates'] += len(batch) - len(fresh)
+
+        for index, existing_id in sorted(checker.near(fresh).items()):
+            if len(result['possible_duplicates']) < MAX_REPORTED_ERRORS:
+                result['possible_duplicates'].append((fresh_lines[index], existing_id))
+
+        for values in fresh:
+            transaction = SimpleNamespace(transfer_to_account_id=None, **values)
+            for account_id, delta in ledger_service.balance_effects(transaction):
+                balance_deltas[account_id] = balance_deltas.get(account_id, 0.0) + delta
+            key = tuple(rollup_service.summary_key(transaction, profile_id).items())
+            total = rollup_totals.setdefault(key, [0.0, 0])
+            total[0] += values['amount']
+            total[1] += 1
+        if fresh:
+            db.session.execute(Transaction.__table__.insert(), fresh)
+            result['imported'] += len(fresh)
+        batch.clear()
+        lines.clear()
+
+    try:
+        for line, row in enumerate(rows, 2):
+            if mapping is None:
+                mapping = detect_mapping(row.keys())
+                if 'date' not in mapping or not ({'amount', 'debit', 'credit'} & mapping.keys()):
+                    raise StatementImportError("Couldn't find date and amount columns in the file.")
+            if date_format is None and line == 2:
+                # Statements use one date format throughout; settle it on the first row
+                date_format = detect_date_format(row.get(mapping['date']))
+            try:
+                values = _map_row(row, mapping, accounts, categories, default_account_id, date_format)
+            except (KeyError, ValueError) as e:
+                result['skipped'] += 1
+                if len(result['errors']) < MAX_REPORTED_ERRORS:
+                    result['errors'].append((line, str(e)))
+                continue
+
+            values['fingerprint'] = fingerprint(values['account_id'], values['date'], values['amount'],
+                                                values['description'])
+            batch.append(values)
+            lines.append(line)
+            if len(batch) >= batch_size:
+                write_batch()
+        if batch:
+            write_batch()
+
+        for account_id, delta in balance_deltas.items():
+            ledger_service.adjust_balance(account_id, delta)
+        for key, (amount, count) in rollup_totals.items():
+            rollup_service.apply_total(dict(key), amount, count)
+        if result['imported']:
+            note_change(db.session, f"Imported: {result['imported']} Transaction")
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return result
+
+
+def _map_row(row, mapping, accounts, categories, default_account_id, date_format):
+    date = parse_date(row.get(mapping['date']), date_format)
+
+    if 'amount' in mapping:
+        amount = parse_amount(row.get(mapping['amount']))
+    else:
+        credit = parse_amount(row.get(mapping.get('credit'))) or 0.0
+        debit = parse_amount(row.get(mapping.get('debit'))) or 0.0
+        amount = credit - abs(debit)
+    if amount is None:
+        raise ValueError("missing amount")
+
+    tx_type = TYPE_NAMES.get(str(row.get(mapping.get('type')) or '').strip().lower())
+    if tx_type is None:
+        tx_type = 'Expense' if amount < 0 else 'Income'
+
+    account_name = str(row.get(mapping.get('account')) or '').strip().lower()
+    if account_name:
+        if account_name not in accounts:
+            raise ValueError(f"unknown account '{account_name}'")
+        account_id = accounts[account_name]
+    elif default_account_id is not None:
+        account_id = int(default_account_id)
+    else:
+        raise ValueError("no account given and no default account chosen")
+
+    category_name = str(row.get(mapping.get('category')) or '').strip().lower()
+    description = row.get(mapping.get('description'))
+    return {
+        'account_id': account_id,
+        'category_id': categories.get(category_name),
+        'amount': round(abs(amount), 2),
+        'transaction_type': tx_type,
+        'description': str(description)[:256] if description is not None else None,
+        'date': date,
+    }
+
+
+def import_file(profile_id, stream, filename, **kwargs):
+    """Import a CSV, XLSX or OFX/QFX statement; see import_transactions."""
+    extension = os.path.splitext(filename or '')[1].lower()
+    reader = READERS.get(extension)
+    if reader is None:
+        raise StatementImportError(f"Unsupported file type '{extension or filename}'. Use CSV, XLSX or OFX.")
+    return import_transactions(profile_id, reader(stream), **kwargs)
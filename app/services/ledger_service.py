@@ -0,0 +1,97 @@
+from sqlalchemy import case, func, literal, select, union_all, update
+
+from app import db
+from app.models import Account, Transaction
+from app.services.changelog import track_rows
+
+
+def balance_effects(transaction):
+    """(account_id, delta) pairs a transaction applies to account balances."""
+    amount = float(transaction.amount)
+    account_id = int(transaction.account_id)
+    if transaction.transaction_type == 'Expense':
+        return [(account_id, -amount)]
+    if transaction.transaction_type == 'Transfer':
+        effects = [(account_id, -amount)]
+        if transaction.transfer_to_account_id:
+            effects.append((int(transaction.transfer_to_account_id), amount))
+        return effects
+    return [(account_id, amount)]
+
+
+def apply_transaction(transaction, sign=1):
+    """Apply (sign=1) or reverse (sign=-1) a transaction's balance changes.
+
+    Each change is a single `UPDATE account SET balance = balance + :delta`
+    inside the caller's database transaction, so concurrent requests can't
+    overwrite each other's balance the way a Python read-modify-write can.
+    """
+    for account_id, delta in balance_effects(transaction):
+        adjust_balance(account_id, sign * delta)
+
+
+def adjust_balance(account_id, delta):
+    db.session.execute(
+        update(Account).where(Account.id == account_id).values(balance=Account.balance + delta),
+        execution_options={'changelog_tracked': True, 'synchronize_session': False}
+    )
+    track_rows(db.session, Account.__tablename__, id=account_id)
+    # Make sure an Account already loaded in this session shows the new balance
+    account = db.session.identity_map.get(db.session.identity_key(Account, account_id))
+    if account is not None:
+        db.session.expire(account, ['balance'])
+
+
+def _effects_query():
+    """Every balance effect in the transaction history as (account_id, delta)."""
+    signed = case(
+        (Transaction.transaction_type.in_(('Expense', 'Transfer')), -Transaction.amount),
+        else_=Transaction.amount
+    )
+    outgoing = select(Transaction.account_id.label('account_id'), signed.label('delta'))
+    incoming = select(Transaction.transfer_to_account_id.label('account_id'), Transaction.amount.label('delta'))\
+        .where(Transaction.transaction_type == 'Transfer', Transaction.transfer_to_account_id != None)
+    return union_all(outgoing, incoming).subquery()
+
+
+def expected_balances(profile_id=None):
+    """Map account id -> (stored balance, balance recomputed from history)."""
+    effects = _effects_query()
+    totals = select(effects.c.account_id, func.sum(effects.c.delta).label('total'))\
+        .group_by(effects.c.account_id).subquery()
+    query = select(Account.id, Account.balance,
+                   func.coalesce(Account.opening_balance, 0) + func.coalesce(totals.c.total, literal(0)))\
+        .outerjoin(totals, totals.c.account_id == Account.id)
+    if profile_id is not None:
+        query = query.where(Account.profile_id == profile_id)
+    return {row[0]: (row[1] or 0.0, row[2] or 0.0) for row in db.session.execute(query)}
+
+
+def reconcile(profile_id=None, fix=False):
+    """Report accounts whose balance has drifted from their transaction history.
+
+    Amounts are whole cents, so any difference at all is drift. Returns a
+    list of (account_id, stored, expected). With `fix=True` the stored
+    balances are reset to the recomputed values.
+    """
+    drift = [(account_id, stored, expected)
+             for account_id, (stored, expected) in sorted(expected_balances(profile_id).items())
+             if stored != expected]
+    if fix and drift:
+        for account_id, _, expected in drift:
+            Account.query.filter_by(id=account_id).update({Account.balance: expected})
+        db.session.commit()
+    return drift
+
+
+def backfill_opening_balances():
+    """Derive opening balances for accounts created before they were tracked.
+
+    Assumes the stored balances are correct and sets each opening balance so
+    that opening balance + history equals the current balance.
+    """
+    effects = _effects_query()
+    totals = select(func.coalesce(func.sum(effects.c.delta), 0))\
+        .where(effects.c.account_id == Account.id).scalar_subquery()
+    db.session.execute(update(Account).values(opening_balance=func.coalesce(Account.balance, 0) - totals))
+    db.session.commit()
@@ -0,0 +1,44 @@
+from flask import g, has_app_context
+
+from app import db
+from app.models import Account, Category, Currency, Profile
+from app.services.cache import QueryCache
+
+accounts_cache = QueryCache('accounts', {'account', 'currency'})
+categories_cache = QueryCache('categories', {'category'})
+profiles_cache = QueryCache('profiles', {'profile'})
+
+
+def get_current_profile():
+    """The active profile, looked up once per request and kept on `flask.g`."""
+    if 'current_profile' not in g:
+        g.current_profile = Profile.query.filter_by(is_active=True).first()
+    return g.current_profile
+
+
+def forget_current_profile():
+    if has_app_context():
+        g.pop('current_profile', None)
+
+
+# The lists below are cached across requests as plain rows (not ORM objects,
+# which would be detached once the request's session closes) and are
+# refreshed only when a commit touches their table.
+
+def get_profile_accounts(profile_id):
+    return accounts_cache.get(profile_id, lambda: db.session.query(
+        Account.id, Account.name, Account.account_type, Account.currency_id, Account.color_theme, Account.icon,
+        Account.balance, Currency.symbol.label('currency_symbol')
+    ).outerjoin(Currency, Account.currency_id == Currency.id)
+        .filter(Account.profile_id == profile_id).order_by(Account.id).all())
+
+
+def get_all_categories():
+    return categories_cache.get('all', lambda: db.session.query(
+        Category.id, Category.profile_id, Category.name, Category.parent_id, Category.icon, Category.color,
+        Category.is_income
+    ).all())
+
+
+def get_all_profiles():
+    return profiles_cache.get('all', lambda: db.session.query(Profile.id, Profile.name, Profile.is_active).all())
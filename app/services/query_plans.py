@@ -0,0 +1,100 @@
+import sqlite3
+from datetime import datetime
+
+from sqlalchemy import func
+
+from app import db
+from app.models import (Account, Budget, Category, CategoryClosure, Investment, Loan, MonthlySummary, Profile,
+                        Transaction)
+
+
+def known_queries(profile_id=1, account_id=1, category_id=1):
+    """The app's hot queries, built the same way the views build them."""
+    from app.services.budget_service import spend_query
+    from app.services.dashboard_service import net_worth_query, rollup_query
+    from app.services.transaction_service import filtered_query
+
+    month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    profile_transactions = Transaction.query.join(Account, Transaction.account_id == Account.id)\
+        .filter(Account.profile_id == profile_id)
+
+    return {
+        'active profile': Profile.query.filter_by(is_active=True),
+        'profile accounts': Account.query.filter_by(profile_id=profile_id),
+        'profile categories': Category.query.filter((Category.profile_id == profile_id) | (Category.profile_id == None)),
+        'subcategories': Category.query.filter_by(parent_id=category_id),
+        'profile budgets': Budget.query.filter_by(profile_id=profile_id),
+        'profile loans': Loan.query.filter_by(profile_id=profile_id),
+        'profile investments': Investment.query.filter_by(profile_id=profile_id),
+        'net worth': net_worth_query(profile_id, base_currency_id=1),
+        'recent transactions': profile_transactions.order_by(Transaction.date.desc()).limit(5),
+        'transaction page': profile_transactions.order_by(Transaction.date.desc(), Transaction.id.desc()).limit(51),
+        'transactions by account': filtered_query(profile_id, {'account_id': account_id, 'start': month_start})
+            .order_by(Transaction.date.desc(), Transaction.id.desc()).limit(51),
+        'transactions by category': filtered_query(profile_id, {'category_id': category_id, 'start': month_start}),
+        'account history': Transaction.query.filter(Transaction.account_id == account_id)
+            .filter(Transaction.date >= month_start),
+        'transfers into account': Transaction.query.filter(Transaction.transfer_to_account_id == account_id),
+        'duplicate fingerprints': db.session.query(Transaction.fingerprint, func.count(Transaction.id))
+            .filter(Transaction.fingerprint.in_(['0123456789abcdef']), Transaction.id <= 1000)
+            .group_by(Transaction.fingerprint),
+        'duplicate blocking': db.session.query(Transaction.id, Transaction.date, Transaction.description)
+            .filter(Transaction.account_id == account_id, Transaction.amount.in_([10.0, 20.0]),
+                    Transaction.date.between(month_start, datetime.now())),
+        'dashboard rollup': rollup_query(profile_id, month_start.replace(month=1), datetime.now(), base_currency_id=1),
+        'category subtree total': db.session.query(func.sum(MonthlySummary.total))
+            .join(CategoryClosure, CategoryClosure.descendant_id == MonthlySummary.category_id)
+            .filter(CategoryClosure.ancestor_id == category_id, MonthlySummary.profile_id == profile_id),
+        'budget spend': spend_query(profile_id, month_start.date(), [month_start.date()], base_currency_id=1),
+    }
+
+
+def schema_copy():
+    """An empty in-memory database with the live database's tables and indexes.
+
+    Plans are taken there so they show index coverage only: with the
+    statistics PRAGMA optimize leaves in sqlite_stat1, SQLite rightly scans
+    tables that hold a handful of rows, which is not a missing index.
+    """
+    statements = db.session.connection().exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' "
+        "ORDER BY type = 'index'").scalars().all()
+    conn = sqlite3.connect(':memory:')
+    for statement in statements:
+        conn.execute(statement)
+    return conn
+
+
+def explain(query, conn=None):
+    """Return the EXPLAIN QUERY PLAN detail lines for a query."""
+    statement = query.statement if hasattr(query, 'statement') else query
+    sql = statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}).string
+    if conn is None:
+        rows = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    else:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    return [row[-1] for row in rows]
+
+
+def full_scans(plan):
+    """Plan lines that read a whole table instead of using an index.
+
+    `SCAN t USING INDEX ...` walks an index in order (used for ORDER BY ...
+    LIMIT) and is allowed; a bare `SCAN t` is a full table scan. Scans of a
+    CTE (such as the queue of a recursive category walk) are not tables.
+    """
+    return [line for line in plan if line.startswith('SCAN ') and ' USING ' not in line
+            and line.split()[1] in db.metadata.tables]
+
+
+def check_query_plans(**kwargs):
+    """Map query name -> (plan, offending lines) for every known query."""
+    results = {}
+    conn = schema_copy()
+    try:
+        for name, query in known_queries(**kwargs).items():
+            plan = explain(query, conn)
+            results[name] = (plan, full_scans(plan))
+    finally:
+        conn.close()
+    return results
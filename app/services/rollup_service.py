@@ -0,0 +1,89 @@
+from sqlalchemy import func, cast, Integer, delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app import db
+from app.models import Account, MonthlySummary, Transaction
+from app.services.changelog import track_rows
+
+
+def summary_key(transaction, profile_id):
+    return {
+        'profile_id': profile_id,
+        'account_id': int(transaction.account_id),
+        'category_id': int(transaction.category_id) if transaction.category_id else 0,
+        'transaction_type': transaction.transaction_type or '',
+        'year': transaction.date.year,
+        'month': transaction.date.month
+    }
+
+
+def apply_transaction(transaction, profile_id, sign=1):
+    """Add (sign=1) or remove (sign=-1) a transaction from the monthly rollup.
+
+    Runs as a single atomic upsert in the caller's database transaction, so
+    it commits or rolls back together with the transaction row itself.
+    """
+    apply_total(summary_key(transaction, profile_id), sign * float(transaction.amount), sign)
+
+
+def apply_total(key, amount, count):
+    """Add `amount` and `count` to one rollup row, creating it if needed."""
+    stmt = sqlite_insert(MonthlySummary.__table__).values(total=amount, tx_count=count, **key)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={
+            'total': MonthlySummary.__table__.c.total + amount,
+            'tx_count': MonthlySummary.__table__.c.tx_count + count
+        }
+    )
+    db.session.execute(stmt, execution_options={'changelog_tracked': True})
+    track_rows(db.session, MonthlySummary.__tablename__, **key)
+
+
+def remove_account(account_id):
+    MonthlySummary.query.filter_by(account_id=account_id).delete()
+
+
+def _expected_rollup():
+    year = cast(func.strftime('%Y', Transaction.date), Integer)
+    month = cast(func.strftime('%m', Transaction.date), Integer)
+    # Older rows may hold '' for "no category"
+    category_id = func.coalesce(func.nullif(Transaction.category_id, ''), 0)
+    transaction_type = func.coalesce(Transaction.transaction_type, '')
+    return select(
+        Account.profile_id, Transaction.account_id, category_id, transaction_type, year, month,
+        func.sum(Transaction.amount), func.count(Transaction.id)
+    ).join(Account, Transaction.account_id == Account.id)\
+        .group_by(Account.profile_id, Transaction.account_id, category_id, transaction_type, year, month)
+
+
+def rebuild():
+    """Recompute the whole rollup table from the transaction history."""
+    table = MonthlySummary.__table__
+    db.session.execute(delete(table))
+    db.session.execute(table.insert().from_select(
+        ['profile_id', 'account_id', 'category_id', 'transaction_type', 'year', 'month', 'total', 'tx_count'],
+        _expected_rollup()
+    ))
+    db.session.commit()
+    return MonthlySummary.query.count()
+
+
+def check():
+    """Compare the rollup table with a fresh aggregation of the transactions.
+
+    Returns a list of (key, expected (total, count), actual (total, count))
+    for every rollup row that is missing, stale or should not exist.
+    """
+    expected = {tuple(row[:6]): (row[6], row[7]) for row in db.session.execute(_expected_rollup())}
+    actual = {
+        (s.profile_id, s.account_id, s.category_id, s.transaction_type, s.year, s.month): (s.total, s.tx_count)
+        for s in MonthlySummary.query.filter(MonthlySummary.tx_count != 0).all()
+    }
+    problems = []
+    for key in expected.keys() | actual.keys():
+        want = expected.get(key, (0.0, 0))
+        got = actual.get(key, (0.0, 0))
+        if want[1] != got[1] or (want[0] or 0) != (got[0] or 0):
+            problems.append((key, want, got))
+    return sorted(problems, key=repr)
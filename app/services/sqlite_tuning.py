@@ -0,0 +1,102 @@
+import atexit
+import threading
+
+from sqlalchemy import event
+
+JOURNAL_MODES = ('delete', 'truncate', 'persist', 'memory', 'wal', 'off')
+SYNCHRONOUS_MODES = ('off', 'normal', 'full', 'extra')
+TEMP_STORES = ('default', 'file', 'memory')
+
+
+def connection_pragmas(config):
+    """PRAGMA statements for every new connection, from the SQLITE_* settings.
+
+    Empty or zero settings are left at SQLite's default.
+    """
+    pragmas = []
+    journal_mode = (config.get('SQLITE_JOURNAL_MODE') or '').lower()
+    if journal_mode:
+        if journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"SQLITE_JOURNAL_MODE must be one of {', '.join(JOURNAL_MODES)}")
+        pragmas.append(f'PRAGMA journal_mode={journal_mode}')
+    synchronous = (config.get('SQLITE_SYNCHRONOUS') or '').lower()
+    if synchronous:
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"SQLITE_SYNCHRONOUS must be one of {', '.join(SYNCHRONOUS_MODES)}")
+        pragmas.append(f'PRAGMA synchronous={synchronous}')
+    temp_store = (config.get('SQLITE_TEMP_STORE') or '').lower()
+    if temp_store:
+        if temp_store not in TEMP_STORES:
+            raise ValueError(f"SQLITE_TEMP_STORE must be one of {', '.join(TEMP_STORES)}")
+        pragmas.append(f'PRAGMA temp_store={temp_store}')
+    if config.get('SQLITE_CACHE_SIZE_KB'):
+        # A negative cache_size is in KiB rather than pages
+        pragmas.append(f"PRAGMA cache_size=-{int(config['SQLITE_CACHE_SIZE_KB'])}")
+    if config.get('SQLITE_MMAP_SIZE_MB'):
+        pragmas.append(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE_MB']) * 1024 * 1024}")
+    if config.get('SQLITE_BUSY_TIMEOUT'):
+        pragmas.append(f"PRAGMA busy_timeout={int(float(config['SQLITE_BUSY_TIMEOUT']) * 1000)}")
+    return pragmas
+
+
+def configure_engine(engine, config):
+    """Apply the SQLite profile to each connection the engine opens."""
+    if engine.dialect.name != 'sqlite':
+        return []
+    pragmas = connection_pragmas(config)
+    if not pragmas:
+        return pragmas
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return pragmas
+
+
+def run_maintenance(engine, checkpoint=True):
+    """Let SQLite refresh its planner statistics and fold the WAL back
+    into the database file. Returns the checkpoint result or None."""
+    with engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA optimize')
+        result = None
+        if checkpoint and conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal':
+            # (busy, WAL frames, frames checkpointed); TRUNCATE also resets the WAL file
+            result = tuple(conn.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)').one())
+        conn.commit()
+    return result
+
+
+class SQLiteMaintenance:
+    """Runs run_maintenance() every `interval` seconds and once on shutdown."""
+
+    def __init__(self, engine, interval=600.0):
+        self.engine = engine
+        self.interval = interval
+        self.last_result = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sqlite-maintenance', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def run(self):
+        try:
+            self.last_result = run_maintenance(self.engine)
+        except Exception as e:
+            print(f"SQLite Maintenance Error: {e}")
+
+    def stop(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self.run()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run()
@@ -1,15 +1,18 @@
-import requests
 import os
 import threading
 from flask import current_app
 
 class TelegramService:
+    API_URL = "https://api.telegram.org"
+    CONNECTIVITY_URL = "https://8.8.8.8"
+
     @staticmethod
-    def is_connected():
+    def is_connected(url=None):
         """Check if internet connection is available."""
+        import requests
         try:
             # Try to connect to a reliable host (e.g., Google or Cloudflare DNS)
-            requests.get("https://8.8.8.8", timeout=2)
+            requests.get(url or TelegramService.CONNECTIVITY_URL, timeout=2)
             return True
         except (requests.ConnectionError, requests.Timeout):
             return False
@@ -20,13 +23,14 @@ class TelegramService:
         if not token or not chat_id:
             return False
             
-        url = f"https://api.telegram.org/bot{token}/sendMessage"
+        url = f"{TelegramService.API_URL}/bot{token}/sendMessage"
         payload = {
             "chat_id": chat_id,
             "text": text,
             "parse_mode": "HTML"
         }
         
+        import requests
         try:
             response = requests.post(url, json=payload, timeout=10)
             if response.status_code != 200:
@@ -77,12 +81,13 @@ class TelegramService:
             return TelegramService._send_document_raw(token, chat_id, document_path, caption)
 
     @staticmethod
-    def _send_document_raw(token, chat_id, document_path, caption=None):
+    def _send_document_raw(token, chat_id, document_path, caption=None, api_url=None):
         if not token or not chat_id or not os.path.exists(document_path):
             return False
             
-        url = f"https://api.telegram.org/bot{token}/sendDocument"
+        url = f"{api_url or TelegramService.API_URL}/bot{token}/sendDocument"
         
+        import requests
         try:
             with open(document_path, 'rb') as doc:
                 files = {'document': doc}
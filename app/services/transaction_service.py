@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import contains_eager, joinedload
+
+from app.models import Account, Transaction
+
+CURSOR_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+
+def encode_cursor(transaction):
+    return f"{transaction.date.strftime(CURSOR_DATE_FORMAT)}~{transaction.id}"
+
+
+def decode_cursor(cursor):
+    try:
+        date_str, id_str = cursor.split('~')
+        return datetime.strptime(date_str, CURSOR_DATE_FORMAT), int(id_str)
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_filters(args):
+    """Read the transaction list filters from request args, ignoring bad values."""
+    filters = {}
+    for name in ('start', 'end'):
+        try:
+            filters[name] = datetime.strptime(args.get(name, ''), '%Y-%m-%d')
+        except ValueError:
+            pass
+    for name in ('account_id', 'category_id'):
+        if args.get(name, '').isdigit():
+            filters[name] = int(args[name])
+    if args.get('type') in ('Income', 'Expense', 'Transfer'):
+        filters['type'] = args['type']
+    for name in ('min_amount', 'max_amount'):
+        try:
+            filters[name] = float(args.get(name, ''))
+        except ValueError:
+            pass
+    return filters
+
+
+def filtered_query(profile_id, filters):
+    query = Transaction.query.join(Account, Transaction.account_id == Account.id)\
+        .filter(Account.profile_id == profile_id)
+    if 'start' in filters:
+        query = query.filter(Transaction.date >= filters['start'])
+    if 'end' in filters:
+        # Inclusive end date
+        query = query.filter(Transaction.date < filters['end'] + timedelta(days=1))
+    if 'account_id' in filters:
+        query = query.filter(Transaction.account_id == filters['account_id'])
+    if 'category_id' in filters:
+        query = query.filter(Transaction.category_id == filters['category_id'])
+    if 'type' in filters:
+        query = query.filter(Transaction.transaction_type == filters['type'])
+    if 'min_amount' in filters:
+        query = query.filter(Transaction.amount >= filters['min_amount'])
+    if 'max_amount' in filters:
+        query = query.filter(Transaction.amount <= filters['max_amount'])
+    return query
+
+
+def page_transactions(profile_id, filters=None, after=None, before=None, per_page=50):
+    """One page of transactions, newest first, using keyset pagination on (date, id).
+
+    `after` continues past the last row of the previous page and `before`
+    goes back to the page preceding a row, so the cost of a page does not
+    depend on how deep into the history it is. Account, currency and
+    category are loaded in the same query.
+
+    Returns (transactions, next_cursor, prev_cursor).
+    """
+    query = filtered_query(profile_id, filters or {})\
+        .options(contains_eager(Transaction.account).joinedload(Account.currency),
+                 joinedload(Transaction.category))
+    key = tuple_(Transaction.date, Transaction.id)
+
+    after_key = decode_cursor(after) if after else None
+    before_key = decode_cursor(before) if before else None
+    if before_key:
+        rows = query.filter(key > before_key)\
+            .order_by(Transaction.date.asc(), Transaction.id.asc()).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        prev_cursor = encode_cursor(rows[0]) if has_more and rows else None
+        next_cursor = encode_cursor(rows[-1]) if rows else None
+        return rows, next_cursor, prev_cursor
+
+    if after_key:
+        query = query.filter(key < after_key)
+    rows = query.order_by(Transaction.date.desc(), Transaction.id.desc()).limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = encode_cursor(rows[-1]) if has_more else None
+    prev_cursor = encode_cursor(rows[0]) if after_key and rows else None
+    return rows, next_cursor, prev_cursor
@@ -0,0 +1,94 @@
+import threading
+import time
+
+# waitress: multi-threaded production WSGI server (needs the 'waitress' package)
+# threaded: Werkzeug's server with a thread per request
+# dev:      Werkzeug's single-threaded development server
+SERVER_MODES = ('waitress', 'threaded', 'dev')
+
+
+class AppServer:
+    """Serves a Flask app from a background thread and stops it cleanly.
+
+    In waitress mode requests are handled by a fixed pool of `threads`,
+    idle keep-alive connections are closed after `keepalive` seconds and
+    at most `connection_limit` connections are open at once. stop() stops
+    accepting connections, lets in-flight requests finish (up to
+    `shutdown_timeout` seconds) and then closes the remaining connections.
+    The sockets belong to the serving loop's thread, so in waitress mode
+    stop() only flags the loop and wakes it; the loop does the rest.
+    """
+
+    def __init__(self, app, host='127.0.0.1', port=5555, mode=None):
+        config = app.config
+        self.app = app
+        self.host = host
+        self.port = port
+        self.mode = mode or config.get('SERVER_MODE', 'waitress')
+        if self.mode not in SERVER_MODES:
+            raise ValueError(f"Unknown server mode '{self.mode}'; use one of {', '.join(SERVER_MODES)}.")
+        self.shutdown_timeout = config.get('SERVER_SHUTDOWN_TIMEOUT', 10)
+        if self.mode == 'waitress':
+            try:
+                import waitress
+            except ImportError:
+                app.logger.warning("waitress is not installed; serving with the threaded Werkzeug server.")
+                self.mode = 'threaded'
+            else:
+                # Our own socket map, so the loop can be run pass by pass
+                self._map = {}
+                self._server = waitress.create_server(
+                    app, map=self._map, host=host, port=port,
+                    threads=config.get('SERVER_THREADS', 8),
+                    channel_timeout=config.get('SERVER_KEEPALIVE_SECONDS', 120),
+                    connection_limit=config.get('SERVER_CONNECTION_LIMIT', 100),
+                    ident='BalanceTrack'
+                )
+        if self.mode != 'waitress':
+            from werkzeug.serving import make_server
+            self._server = make_server(host, port, app, threaded=self.mode == 'threaded')
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def serve_forever(self):
+        if self.mode == 'waitress':
+            from waitress import wasyncore
+            timeout = self._server.adj.asyncore_loop_timeout
+            while not self._stopping.is_set():
+                wasyncore.loop(timeout=timeout, map=self._map, count=1)
+            self._drain()
+        else:
+            self._server.serve_forever()
+
+    def _drain(self):
+        # Runs on the serving thread once stop() is called: stop accepting,
+        # keep the loop going until every request is answered and flushed,
+        # then stop the workers and close all sockets
+        from waitress import wasyncore
+        from waitress.channel import HTTPChannel
+
+        def busy():
+            return any(channel.requests or channel.writable() for channel in list(self._map.values())
+                       if isinstance(channel, HTTPChannel))
+
+        self._server.accepting = False
+        deadline = time.monotonic() + self.shutdown_timeout
+        while busy() and time.monotonic() < deadline:
+            wasyncore.loop(timeout=0.05, map=self._map, count=1)
+        self._server.task_dispatcher.shutdown(timeout=max(deadline - time.monotonic(), 0.1))
+        wasyncore.close_all(self._map)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='app-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self.mode == 'waitress':
+            self._stopping.set()
+            self._server.pull_trigger()
+        else:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=self.shutdown_timeout + 1)
@@ -1,21 +1,53 @@
 from datetime import datetime, UTC
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort
 from app import db
-from app.models import Transaction, Account, Category, Profile
+from app.models import Transaction, Account
+from app.services.profile_service import get_current_profile, get_profile_accounts
+from app.services import category_tree, columnar_export, dedup_service, import_service, ledger_service, rollup_service
+from app.services.transaction_service import page_transactions, parse_filters
 
 transactions = Blueprint('transactions', __name__)
 
-def get_current_profile():
-    return Profile.query.filter_by(is_active=True).first()
+def get_transfer_destination(profile, transaction_type, source_account_id):
+    """The destination account id of a transfer, None for other types.
+
+    Raises ValueError with a message for the form when no destination was
+    chosen or it is the source account.
+    """
+    if transaction_type != 'Transfer':
+        return None
+    destination_id = request.form.get('transfer_to_account_id', type=int)
+    destination = db.session.get(Account, destination_id) if destination_id else None
+    if destination is None:
+        raise ValueError('Choose the account to transfer to.')
+    # Security: Ensure destination account belongs to profile
+    if destination.profile_id != profile.id:
+        abort(404)
+    if destination.id == source_account_id:
+        raise ValueError('A transfer needs two different accounts.')
+    return destination.id
 
 @transactions.route('/')
 def index():
     profile = get_current_profile()
     if not profile:
         return redirect(url_for('profiles.index'))
-    # Filter by profile via Account
-    user_transactions = Transaction.query.join(Account, Transaction.account_id == Account.id).filter(Account.profile_id == profile.id).order_by(Transaction.date.desc()).all()
-    return render_template('transactions/index.html', transactions=user_transactions)
+    # Filter by profile via Account, one keyset page at a time
+    filters = parse_filters(request.args)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 10), 200)
+    user_transactions, next_cursor, prev_cursor = page_transactions(
+        profile.id, filters,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=per_page
+    )
+    filter_args = {k: v for k, v in request.args.items() if k not in ('after', 'before') and v}
+    accounts = get_profile_accounts(profile.id)
+    categories = category_tree.get_category_tree(profile.id)
+    return render_template('transactions/index.html', transactions=user_transactions,
+                           next_cursor=next_cursor, prev_cursor=prev_cursor,
+                           filter_args=filter_args, accounts=accounts, categories=categories,
+                           parquet_available=columnar_export.available())
 
 @transactions.route('/add', methods=['GET', 'POST'])
 def add():
@@ -25,7 +57,7 @@ def add():
 
     if request.method == 'POST':
         account_id = request.form.get('account_id')
-        category_id = request.form.get('category_id')
+        category_id = request.form.get('category_id') or None
         amount = float(request.form.get('amount'))
         transaction_type = request.form.get('type') # Income, Expense
         description = request.form.get('description')
@@ -34,72 +66,111 @@ def add():
         
         # Security: Ensure account belongs to profile
         account = Account.query.filter_by(id=account_id, profile_id=profile.id).first_or_404()
-        
-        if transaction_type == 'Expense':
-            account.balance -= amount
-        else:
-            account.balance += amount
-            
+        try:
+            transfer_to_account_id = get_transfer_destination(profile, transaction_type, account.id)
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return render_template('transactions/add.html', accounts=get_profile_accounts(profile.id),
+                                   categories=category_tree.get_category_tree(profile.id),
+                                   today=date_str or datetime.now().strftime('%Y-%m-%d'), form=request.form), 400
+
         transaction = Transaction(
             account_id=account_id,
             category_id=category_id,
             amount=amount,
             transaction_type=transaction_type,
             description=description,
-            date=transaction_date
+            date=transaction_date,
+            transfer_to_account_id=transfer_to_account_id
         )
+        transaction.fingerprint = dedup_service.fingerprint_for(transaction)
         db.session.add(transaction)
+        ledger_service.apply_transaction(transaction)
+        rollup_service.apply_transaction(transaction, profile.id)
         db.session.commit()
         flash('Transaction recorded!', 'success')
         return redirect(url_for('transactions.index'))
         
-    accounts = Account.query.filter_by(profile_id=profile.id).all()
-    categories = Category.query.all()
+    accounts = get_profile_accounts(profile.id)
+    categories = category_tree.get_category_tree(profile.id)
     today = datetime.now().strftime('%Y-%m-%d')
     return render_template('transactions/add.html', accounts=accounts, categories=categories, today=today)
 
+@transactions.route('/import', methods=['GET', 'POST'])
+def import_statement():
+    profile = get_current_profile()
+    if not profile:
+        return redirect(url_for('profiles.index'))
+
+    accounts = get_profile_accounts(profile.id)
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Choose a statement file to import.', 'danger')
+            return redirect(url_for('transactions.import_statement'))
+        try:
+            result = import_service.import_file(
+                profile.id, upload.stream, upload.filename,
+                default_account_id=request.form.get('account_id') or None,
+                date_format=request.form.get('date_format') or None
+            )
+        except import_service.StatementImportError as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('transactions.import_statement'))
+        flash(f"Imported {result['imported']} transactions"
+              f"{', skipped ' + str(result['duplicates']) + ' already recorded' if result['duplicates'] else ''}"
+              f"{', skipped ' + str(result['skipped']) + ' unreadable' if result['skipped'] else ''}.",
+              'success' if result['imported'] else 'info')
+        if result['errors'] or result['possible_duplicates']:
+            return render_template('transactions/import.html', accounts=accounts, errors=result['errors'],
+                                   skipped=result['skipped'], possible_duplicates=result['possible_duplicates'])
+        return redirect(url_for('transactions.index'))
+
+    return render_template('transactions/import.html', accounts=accounts)
+
 @transactions.route('/edit/<int:id>', methods=['GET', 'POST'])
 def edit(id):
     profile = get_current_profile()
     transaction = Transaction.query.join(Account, Transaction.account_id == Account.id).filter(Transaction.id == id, Account.profile_id == profile.id).first_or_404()
     
     if request.method == 'POST':
-        old_amount = transaction.amount
-        old_type = transaction.transaction_type
-        old_account = transaction.account
-        
-        # Reverse old balance change
-        if old_type == 'Expense':
-            old_account.balance += old_amount
-        else:
-            old_account.balance -= old_amount
-            
-        # Update transaction details
         new_account_id = request.form.get('account_id')
         # Security: Ensure new account belongs to profile
         new_account = Account.query.filter_by(id=new_account_id, profile_id=profile.id).first_or_404()
-        
-        transaction.account_id = new_account_id
-        transaction.category_id = request.form.get('category_id')
+        # Checked before anything changes, so the form can be re-rendered as is
+        try:
+            transfer_to_account_id = get_transfer_destination(profile, request.form.get('type'), new_account.id)
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return render_template('transactions/edit.html', transaction=transaction,
+                                   accounts=get_profile_accounts(profile.id),
+                                   categories=category_tree.get_category_tree(profile.id)), 400
+
+        # Reverse old balance change
+        ledger_service.apply_transaction(transaction, sign=-1)
+        rollup_service.apply_transaction(transaction, profile.id, sign=-1)
+
+        # Update transaction details
+        transaction.account_id = new_account.id
+        transaction.category_id = request.form.get('category_id') or None
         transaction.amount = float(request.form.get('amount'))
         transaction.transaction_type = request.form.get('type')
         transaction.description = request.form.get('description')
         date_str = request.form.get('date')
         if date_str:
             transaction.date = datetime.strptime(date_str, '%Y-%m-%d')
+        transaction.transfer_to_account_id = transfer_to_account_id
+        transaction.fingerprint = dedup_service.fingerprint_for(transaction)
         
         # Apply new balance change
-        if transaction.transaction_type == 'Expense':
-            new_account.balance -= transaction.amount
-        else:
-            new_account.balance += transaction.amount
-            
+        ledger_service.apply_transaction(transaction)
+        rollup_service.apply_transaction(transaction, profile.id)
         db.session.commit()
         flash('Transaction updated!', 'success')
         return redirect(url_for('transactions.index'))
     
-    accounts = Account.query.filter_by(profile_id=profile.id).all()
-    categories = Category.query.all()
+    accounts = get_profile_accounts(profile.id)
+    categories = category_tree.get_category_tree(profile.id)
     return render_template('transactions/edit.html', transaction=transaction, accounts=accounts, categories=categories)
 
 @transactions.route('/delete/<int:id>', methods=['POST'])
@@ -108,12 +179,8 @@ def delete(id):
     transaction = Transaction.query.join(Account, Transaction.account_id == Account.id).filter(Transaction.id == id, Account.profile_id == profile.id).first_or_404()
     
     # Reverse the balance change before deleting
-    account = transaction.account
-    if transaction.transaction_type == 'Expense':
-        account.balance += transaction.amount
-    else:
-        account.balance -= transaction.amount
-        
+    ledger_service.apply_transaction(transaction, sign=-1)
+    rollup_service.apply_transaction(transaction, profile.id, sign=-1)
     db.session.delete(transaction)
     db.session.commit()
     flash('Transaction deleted.', 'info')
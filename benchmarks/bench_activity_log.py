@@ -0,0 +1,34 @@
+"""Requests per second on /transactions/ with synchronous vs buffered activity logging.
+
+Usage: python benchmarks/bench_activity_log.py [requests] [transactions]
+"""
+import sys
+import time
+
+from common import cleanup, make_app, seed_transactions
+
+
+def run(buffered, requests, transactions):
+    app, db_path = make_app(ACTIVITY_LOG_BUFFERED=buffered)
+    try:
+        with app.app_context():
+            seed_transactions(transactions)
+        client = app.test_client()
+        client.get('/transactions/')
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get('/transactions/')
+        elapsed = time.perf_counter() - start
+        return requests / elapsed
+    finally:
+        cleanup(db_path, app)
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    transactions = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    old = run(False, requests, transactions)
+    new = run(True, requests, transactions)
+    print(f"Synchronous commit per request: {old:8.1f} req/s")
+    print(f"Buffered background writer:     {new:8.1f} req/s ({new / old:.2f}x)")
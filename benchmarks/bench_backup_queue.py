@@ -0,0 +1,80 @@
+"""Commit a burst of transactions against a local stand-in for the Telegram API.
+
+Shows that the backup worker coalesces the whole burst into a single upload
+and never blocks the request thread on network checks.
+
+Usage: python benchmarks/bench_backup_queue.py [commits] [seeded transactions]
+"""
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common import cleanup, make_app, seed_transactions
+
+
+class StandInTelegram(BaseHTTPRequestHandler):
+    uploads = []
+
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        StandInTelegram.uploads.append((self.path, len(body)))
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b'{"ok": true}')
+
+    def log_message(self, *args):
+        pass
+
+
+def wait_until_idle(worker):
+    while worker.queue_depth or worker.status()['uploading']:
+        time.sleep(0.05)
+
+
+if __name__ == '__main__':
+    commits = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    seeded = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInTelegram)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    app, db_path = make_app(
+        TELEGRAM_BOT_TOKEN='bench-token',
+        TELEGRAM_CHAT_ID='1',
+        TELEGRAM_API_URL=base_url,
+        TELEGRAM_CONNECTIVITY_URL=base_url,
+        BACKUP_DEBOUNCE_SECONDS=0.5
+    )
+    try:
+        with app.app_context():
+            account_ids = seed_transactions(seeded)
+        worker = app.extensions['backup_worker']
+        client = app.test_client()
+        wait_until_idle(worker)
+        StandInTelegram.uploads.clear()
+
+        start = time.perf_counter()
+        for i in range(commits):
+            client.post('/transactions/add', data={
+                'account_id': account_ids[0], 'category_id': 1, 'amount': '10',
+                'type': 'Expense', 'description': f'Burst {i}', 'date': '2026-01-01'
+            })
+        request_time = time.perf_counter() - start
+        print(f"{commits} commits in {request_time * 1000:.1f} ms, queue depth {worker.queue_depth}")
+
+        wait_until_idle(worker)
+        worker.stop()
+        print(f"Uploads received by stand-in: {len(StandInTelegram.uploads)}")
+        print(f"Live database: {os.path.getsize(db_path)} bytes, uploaded: {StandInTelegram.uploads[-1][1]} bytes")
+        print(f"Worker status: {worker.status()}")
+    finally:
+        server.shutdown()
+        cleanup(db_path, app)
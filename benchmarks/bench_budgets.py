@@ -0,0 +1,118 @@
+"""Budget spending engine: all of a profile's budgets evaluated in one grouped
+query, against the same numbers computed one budget at a time.
+
+Every seeded expense category gets two subcategories before the transactions
+are generated, so budgets on a parent category must include their children.
+Budgets mix Monthly/Yearly periods and optional start/end dates.
+
+Usage: python benchmarks/bench_budgets.py [--rows 1000000] [--budgets 300] [--dated 0.3]
+"""
+import argparse
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func
+
+from common import cleanup, make_app, seed_transactions, timed
+
+
+def add_subcategories():
+    from app import db
+    from app.models import Category
+    from app.services import category_tree
+    from seed_data import seed_categories, seed_currencies
+
+    seed_currencies()
+    seed_categories()
+    for parent in Category.query.filter_by(is_income=False, parent_id=None).all():
+        for i in range(2):
+            child = Category(name=f'{parent.name} {i + 1}', is_income=False, parent_id=parent.id,
+                             profile_id=parent.profile_id)
+            db.session.add(child)
+            db.session.flush()
+            category_tree.add_category(child)
+    db.session._skip_notification = True
+    db.session.commit()
+
+
+def add_budgets(profile_id, count, today, dated):
+    from app import db
+    from app.models import Budget, Category
+
+    random.seed(7)
+    categories = Category.query.filter_by(is_income=False).all()
+    for _ in range(count):
+        start_date = end_date = None
+        if random.random() < dated:
+            start_date = today - timedelta(days=random.randint(0, 60))
+        if random.random() < dated:
+            end_date = today + timedelta(days=random.randint(-20, 40))
+        db.session.add(Budget(profile_id=profile_id, category_id=random.choice(categories).id,
+                              amount=random.choice([100, 250, 500, 1000, 5000]),
+                              period=random.choice(['Monthly', 'Yearly']),
+                              start_date=start_date, end_date=end_date))
+    db.session._skip_notification = True
+    db.session.commit()
+
+
+def one_by_one(profile_id, today):
+    """The per-budget loop the engine replaces: a subtree walk and a SUM each."""
+    from app import db
+    from app.models import Account, Budget, Category, Transaction
+    from app.services.budget_service import budget_window
+
+    spent = {}
+    for budget in Budget.query.filter_by(profile_id=profile_id).all():
+        ids, frontier = {budget.category_id}, [budget.category_id]
+        while frontier:
+            frontier = [c.id for c in Category.query.filter(Category.parent_id.in_(frontier)) if c.id not in ids]
+            ids.update(frontier)
+        start, end = budget_window(budget, today)
+        spent[budget.id] = db.session.query(func.coalesce(func.sum(Transaction.amount), 0))\
+            .join(Account, Transaction.account_id == Account.id)\
+            .filter(Account.profile_id == profile_id, Transaction.transaction_type == 'Expense',
+                    Transaction.category_id.in_(ids),
+                    Transaction.date >= datetime.combine(start, datetime.min.time()),
+                    Transaction.date < datetime.combine(end, datetime.min.time())).scalar()
+    return spent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--budgets', type=int, default=300)
+    parser.add_argument('--dated', type=float, default=0.3, help="share of budgets with a start or end date")
+    args = parser.parse_args()
+
+    app, db_path = make_app(SQLITE_MAINTENANCE_INTERVAL=0)
+    try:
+        from app import db
+        from app.models import Profile
+        from app.services import budget_service
+        with app.app_context():
+            today = date.today()
+            add_subcategories()
+            seed_transactions(args.rows)
+            profile_id = Profile.query.filter_by(is_active=True).first().id
+            add_budgets(profile_id, args.budgets, today, args.dated)
+
+            print(f"{args.rows} transactions, {args.budgets} budgets, {args.dated:.0%} with start/end dates")
+            statuses, grouped = timed(lambda: budget_service.compute_budget_status(profile_id, today), repeat=3)
+            print(f"grouped query     {grouped * 1000:9.1f} ms")
+            budget_service.get_budget_status(profile_id, today)
+            _, cached = timed(lambda: budget_service.get_budget_status(profile_id, today), repeat=100)
+            print(f"cached            {cached * 1000:9.3f} ms")
+            expected, looped = timed(lambda: one_by_one(profile_id, today))
+            print(f"one budget a time {looped * 1000:9.1f} ms")
+
+            mismatches = [s.budget.id for s in statuses if s.spent != expected[s.budget.id]]
+            print(f"mismatches: {len(mismatches)}")
+            over = sum(1 for s in statuses if s.utilization > 100)
+            print(f"over budget: {over}, projected over: {sum(1 for s in statuses if s.projected > s.budget.amount)}")
+            db.session.remove()
+    finally:
+        cleanup(db_path, app)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Category subtree totals through the closure table vs a recursive walk of
+parent_id (one subtree over the transactions, every subtree over the monthly
+rollup), and the cached picker tree vs rebuilding it per request.
+
+A tree of `--fanout` ** `--depth` leaf categories is built under one root
+and the transactions are spread over all of its nodes.
+
+Usage: python benchmarks/bench_category_tree.py [--rows 200000] [--fanout 4] [--depth 4]
+"""
+import argparse
+import random
+
+from sqlalchemy import func, select
+
+from common import cleanup, make_app, seed_transactions, timed
+
+
+def build_tree(fanout, depth):
+    from app import db
+    from app.models import Category
+    from app.services import category_tree
+
+    root = Category(name='Tree root', is_income=False)
+    db.session.add(root)
+    db.session.flush()
+    category_tree.add_category(root)
+    level = [root]
+    for d in range(depth):
+        next_level = []
+        for parent in level:
+            for i in range(fanout):
+                child = Category(name=f'{parent.name}.{i}', is_income=False, parent_id=parent.id)
+                db.session.add(child)
+                db.session.flush()
+                category_tree.add_category(child)
+                next_level.append(child)
+        level = next_level
+    db.session._skip_notification = True
+    db.session.commit()
+    return root.id
+
+
+def spread_over(root_id):
+    """Move the seeded expenses onto random nodes of the tree."""
+    from app import db
+    from app.models import Transaction
+    from app.services import category_tree, rollup_service
+
+    random.seed(3)
+    nodes = sorted(category_tree.subtree_ids(root_id))
+    ids = db.session.scalars(select(Transaction.id).where(Transaction.transaction_type == 'Expense')).all()
+    db.session.execute(Transaction.__table__.update().where(Transaction.__table__.c.id == db.bindparam('tid'))
+                       .values(category_id=db.bindparam('cid')),
+                       [{'tid': tid, 'cid': random.choice(nodes)} for tid in ids])
+    db.session._skip_notification = True
+    db.session.commit()
+    rollup_service.rebuild()
+
+
+def closure_total(root_id):
+    from app import db
+    from app.models import CategoryClosure, Transaction
+    return db.session.query(func.sum(Transaction.amount))\
+        .join(CategoryClosure, CategoryClosure.descendant_id == Transaction.category_id)\
+        .filter(CategoryClosure.ancestor_id == root_id).scalar()
+
+
+def recursive_total(root_id):
+    from app import db
+    from app.models import Category, Transaction
+    walk = select(Category.id).where(Category.id == root_id).cte('walk', recursive=True)
+    walk = walk.union_all(select(Category.id).join(walk, Category.parent_id == walk.c.id))
+    return db.session.query(func.sum(Transaction.amount))\
+        .filter(Transaction.category_id.in_(select(walk.c.id))).scalar()
+
+
+def all_subtree_totals(profile_id):
+    """Rollup total of every category including its descendants, one grouped join."""
+    from app import db
+    from app.models import CategoryClosure, MonthlySummary
+    return dict(db.session.query(CategoryClosure.ancestor_id, func.sum(MonthlySummary.total))
+                .join(MonthlySummary, MonthlySummary.category_id == CategoryClosure.descendant_id)
+                .filter(MonthlySummary.profile_id == profile_id)
+                .group_by(CategoryClosure.ancestor_id).all())
+
+
+def all_subtree_totals_walk(profile_id):
+    """The same totals with the ancestor pairs derived by a recursive walk each time."""
+    from app import db
+    from app.models import Category, MonthlySummary
+    walk = select(Category.id.label('ancestor_id'), Category.id.label('descendant_id')).cte('walk', recursive=True)
+    walk = walk.union_all(select(walk.c.ancestor_id, Category.id).join(walk, Category.parent_id == walk.c.descendant_id))
+    return dict(db.session.query(walk.c.ancestor_id, func.sum(MonthlySummary.total))
+                .join(MonthlySummary, MonthlySummary.category_id == walk.c.descendant_id)
+                .filter(MonthlySummary.profile_id == profile_id)
+                .group_by(walk.c.ancestor_id).all())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=4)
+    args = parser.parse_args()
+
+    app, db_path = make_app(SQLITE_MAINTENANCE_INTERVAL=0)
+    try:
+        from app.models import Profile
+        from app.services import category_tree
+        with app.app_context():
+            root_id = build_tree(args.fanout, args.depth)
+            seed_transactions(args.rows)
+            spread_over(root_id)
+            profile_id = Profile.query.filter_by(is_active=True).first().id
+            nodes = len(category_tree.subtree_ids(root_id))
+
+            print(f"{args.rows} transactions over a {nodes}-node category tree")
+            total, closure_time = timed(lambda: closure_total(root_id), repeat=5)
+            expected, walk_time = timed(lambda: recursive_total(root_id), repeat=5)
+            print(f"subtree total, closure join   {closure_time * 1000:8.1f} ms")
+            print(f"subtree total, recursive walk {walk_time * 1000:8.1f} ms   (same total: {total == expected})")
+            totals, closure_time = timed(lambda: all_subtree_totals(profile_id), repeat=5)
+            expected, walk_time = timed(lambda: all_subtree_totals_walk(profile_id), repeat=5)
+            print(f"every node's rollup, closure  {closure_time * 1000:8.1f} ms")
+            print(f"every node's rollup, walk     {walk_time * 1000:8.1f} ms   (same totals: {totals == expected})")
+            _, rebuild_time = timed(category_tree.rebuild)
+            print(f"closure rebuild               {rebuild_time * 1000:8.1f} ms")
+            _, build_time = timed(lambda: category_tree._build_tree(profile_id), repeat=20)
+            category_tree.get_category_tree(profile_id)
+            _, cached_time = timed(lambda: category_tree.get_category_tree(profile_id), repeat=1000)
+            print(f"picker tree, built            {build_time * 1000:8.2f} ms")
+            print(f"picker tree, cached           {cached_time * 1000:8.4f} ms")
+    finally:
+        cleanup(db_path, app)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Cold start to first paint: time from spawning the server process until
+the readiness probe answers and until the dashboard first renders.
+
+Each run starts a fresh interpreter, as the desktop launcher does, once
+against a new database (full bootstrap) and then against the same,
+already stamped database (the normal start).
+
+    python bench_cold_start.py [--runs 5] [--root /path/to/checkout]
+
+--root runs the server from another checkout, e.g. a `git worktree` of an
+older commit; checkouts without /healthz are timed to the first 200 on /.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER = """
+import sys
+sys.path.insert(0, {root!r})
+from app import create_app
+create_app().run(host='127.0.0.1', port={port}, debug=False, use_reloader=False)
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def wait_for(url, deadline, statuses=(200,)):
+    while time.monotonic() < deadline:
+        status = get(url)
+        if status in statuses:
+            return time.monotonic()
+        time.sleep(0.01)
+    raise RuntimeError(f"{url} not ready in time")
+
+
+def cold_start(root, db_path):
+    port = free_port()
+    base = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', TELEGRAM_BOT_TOKEN='', TELEGRAM_CHAT_ID='')
+    start = time.monotonic()
+    process = subprocess.Popen([sys.executable, '-c', SERVER.format(root=root, port=port)], cwd=root, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = start + 60
+        # Old checkouts have no probe: 404 there still means the server is up
+        ready = wait_for(f'{base}/healthz', deadline, statuses=(200, 404))
+        painted = wait_for(f'{base}/', deadline, statuses=(200, 302))
+        return ready - start, painted - start
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--root', default=ROOT)
+    args = parser.parse_args()
+
+    results = {'fresh db': [], 'stamped db': []}
+    for _ in range(args.runs):
+        fd, db_path = tempfile.mkstemp(suffix='.db', prefix='balancetrack_bench_')
+        os.close(fd)
+        os.remove(db_path)
+        try:
+            results['fresh db'].append(cold_start(args.root, db_path))
+            results['stamped db'].append(cold_start(args.root, db_path))
+        finally:
+            os.remove(db_path)
+
+    print(f"server from {args.root}, {args.runs} runs (median)")
+    for name, timings in results.items():
+        ready = sorted(t[0] for t in timings)[len(timings) // 2]
+        painted = sorted(t[1] for t in timings)[len(timings) // 2]
+        print(f"  {name:<11} ready {ready * 1000:7.0f} ms   first paint {painted * 1000:7.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Multi-currency totals: net worth and the dashboard chart converted in SQL
+against a per-account Python loop, and the cost of the conversion itself.
+
+Accounts get random currencies and every currency a new rate each month, so
+the chart has to pick the rate in effect at the end of each month. The SQL
+results are checked against a conversion of the raw transactions in Python.
+
+Usage: python benchmarks/bench_currency.py [--rows 200000] [--accounts 30]
+"""
+import argparse
+import random
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import func
+
+from common import cleanup, make_app, seed_transactions, timed
+
+
+def add_rate_history(months):
+    """A new rate for every currency at the start of each of the last `months` months."""
+    from app import db
+    from app.models import Currency
+    from app.services import currency_service
+
+    random.seed(11)
+    now = datetime.now()
+    for currency in Currency.query.all():
+        base_rate = currency.exchange_rate
+        year, month = now.year, now.month
+        for _ in range(months):
+            rate = round(base_rate * random.uniform(0.8, 1.2), 4)
+            currency_service.set_rate(currency, rate, datetime(year, month, 1))
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    db.session._skip_notification = True
+    db.session.commit()
+
+
+def loop_net_worth(profile_id, base_id):
+    """The per-account alternative: one query per account plus one for investments."""
+    from app import db
+    from app.models import Account, Currency, Investment
+
+    rates = {c.id: c.exchange_rate for c in Currency.query.all()}
+    total = 0.0
+    for account in Account.query.filter_by(profile_id=profile_id).all():
+        balance = db.session.query(Account.balance).filter(Account.id == account.id).scalar() or 0
+        total += balance * rates[base_id] / rates.get(account.currency_id, rates[base_id])
+    return total + (db.session.query(func.sum(Investment.current_value))
+                    .filter(Investment.profile_id == profile_id).scalar() or 0)
+
+
+def expected_chart(profile_id, base_id, first_month):
+    """Monthly expense totals from the raw transactions, converted in Python."""
+    from app.models import Account, Currency, ExchangeRate, Transaction
+
+    history = defaultdict(list)
+    for entry in ExchangeRate.query.order_by(ExchangeRate.effective_from):
+        history[entry.currency_id].append((entry.effective_from, entry.rate))
+    current = {c.id: c.exchange_rate for c in Currency.query.all()}
+
+    def rate(currency_id, before):
+        rates = [r for start, r in history[currency_id] if start < before]
+        return rates[-1] if rates else current[currency_id]
+
+    totals = defaultdict(float)
+    cents = defaultdict(float)
+    rows = Transaction.query.join(Account, Transaction.account_id == Account.id)\
+        .with_entities(Transaction.date, Transaction.amount, Account.currency_id)\
+        .filter(Account.profile_id == profile_id, Transaction.transaction_type == 'Expense',
+                Transaction.date >= first_month)
+    for when, amount, currency_id in rows:
+        cents[(when.year, when.month, currency_id)] += round(amount * 100)
+    for (year, month, currency_id), total in cents.items():
+        month_end = datetime(year + month // 12, month % 12 + 1, 1)
+        factor = rate(base_id, month_end) / rate(currency_id or base_id, month_end)
+        totals[f"{year:04d}-{month:02d}"] += total * factor
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--accounts', type=int, default=30)
+    args = parser.parse_args()
+
+    app, db_path = make_app(SQLITE_MAINTENANCE_INTERVAL=0)
+    try:
+        from app import db
+        from app.models import Account, Currency, Profile
+        from app.services import currency_service, dashboard_service
+        with app.app_context():
+            account_ids = seed_transactions(args.rows, accounts=args.accounts)
+            currency_ids = [c.id for c in Currency.query.all()]
+            random.seed(5)
+            for account in Account.query.filter(Account.id.in_(account_ids)):
+                account.currency_id = random.choice(currency_ids)
+                account.balance = round(random.uniform(100, 100000), 2)
+            db.session._skip_notification = True
+            db.session.commit()
+            add_rate_history(24)
+            profile_id = Profile.query.filter_by(is_active=True).first().id
+            base = currency_service.get_base_currency(profile_id)
+
+            print(f"{args.rows} transactions, {args.accounts} accounts in {len(currency_ids)} currencies, "
+                  f"24 months of rates, base {base.code}")
+            total, sql_time = timed(lambda: dashboard_service.get_net_worth(profile_id), repeat=20)
+            looped, loop_time = timed(lambda: loop_net_worth(profile_id, base.id), repeat=20)
+            print(f"net worth, one query        {sql_time * 1000:8.2f} ms")
+            print(f"net worth, per account      {loop_time * 1000:8.2f} ms   (difference {abs(total - looped):.4f})")
+
+            now = datetime.now()
+            starts = dashboard_service.month_starts(now, 6)
+            _, converted_time = timed(lambda: dashboard_service.rollup_query(
+                profile_id, starts[0], now, base.id).all(), repeat=20)
+            _, raw_time = timed(lambda: dashboard_service.rollup_query(
+                profile_id, starts[0], now, None).all(), repeat=20)
+            print(f"chart query, converted      {converted_time * 1000:8.2f} ms")
+            print(f"chart query, unconverted    {raw_time * 1000:8.2f} ms")
+
+            metrics = dashboard_service.compute_dashboard_metrics(profile_id, now=now)
+            expected = expected_chart(profile_id, base.id, starts[0])
+            keys = [start.strftime('%Y-%m') for start in starts]
+            worst = max(abs(metrics['expense_data'][i] - expected[k] / 100) for i, k in enumerate(keys))
+            print(f"chart vs Python conversion: max difference {worst:.4f}")
+
+            _, uncached = timed(lambda: currency_service.rate_cache.invalidate()
+                                or currency_service.get_base_currency(profile_id), repeat=200)
+            _, cached = timed(lambda: currency_service.get_base_currency(profile_id), repeat=1000)
+            print(f"base currency lookup, loaded {uncached * 1000:7.3f} ms, cached {cached * 1000:.4f} ms")
+            db.session.remove()
+    finally:
+        cleanup(db_path, app)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Dashboard aggregation latency: per-month extract() queries vs one grouped query.
+
+Usage: python benchmarks/bench_dashboard.py [transactions] [repeat]
+"""
+import sys
+from datetime import datetime, timedelta
+
+from common import cleanup, make_app, seed_transactions, timed
+
+from sqlalchemy import func
+
+from app import db
+from app.models import Account, Category, Profile, Transaction
+from app.services.dashboard_service import compute_dashboard_metrics, dashboard_cache, get_dashboard_metrics
+
+
+def legacy_metrics(profile_id):
+    """The query pattern main.index used before the dashboard service."""
+    now = datetime.now()
+
+    def month_sum(tx_type, m, y):
+        return db.session.query(func.sum(Transaction.amount))\
+            .join(Account, Transaction.account_id == Account.id)\
+            .filter(Account.profile_id == profile_id)\
+            .filter(Transaction.transaction_type == tx_type)\
+            .filter(func.extract('month', Transaction.date) == m)\
+            .filter(func.extract('year', Transaction.date) == y).scalar() or 0
+
+    monthly_income = month_sum('Income', now.month, now.year)
+    monthly_expense = month_sum('Expense', now.month, now.year)
+    income_data, expense_data = [], []
+    for i in range(5, -1, -1):
+        first_of_month = (now.replace(day=1) - timedelta(days=i * 30)).replace(day=1)
+        income_data.append(float(month_sum('Income', first_of_month.month, first_of_month.year)))
+        expense_data.append(float(month_sum('Expense', first_of_month.month, first_of_month.year)))
+    category_data = db.session.query(Category.name, func.sum(Transaction.amount))\
+        .join(Transaction, Transaction.category_id == Category.id)\
+        .join(Account, Transaction.account_id == Account.id)\
+        .filter(Account.profile_id == profile_id)\
+        .filter(Transaction.transaction_type == 'Expense')\
+        .filter(func.extract('month', Transaction.date) == now.month)\
+        .filter(func.extract('year', Transaction.date) == now.year)\
+        .group_by(Category.name).all()
+    return {
+        'monthly_income': monthly_income,
+        'monthly_expense': monthly_expense,
+        'income_data': income_data,
+        'expense_data': expense_data,
+        'categories': {name: float(value) for name, value in category_data}
+    }
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    app, db_path = make_app()
+    try:
+        with app.app_context():
+            seed_transactions(count)
+            profile_id = Profile.query.filter_by(is_active=True).first().id
+
+            old, old_time = timed(lambda: legacy_metrics(profile_id), repeat)
+            new, new_time = timed(lambda: compute_dashboard_metrics(profile_id), repeat)
+            get_dashboard_metrics(profile_id)
+            _, cached_time = timed(lambda: get_dashboard_metrics(profile_id), repeat)
+
+            same = (
+                round(old['monthly_income'], 2) == round(new['monthly_income'], 2)
+                and round(old['monthly_expense'], 2) == round(new['monthly_expense'], 2)
+                and {k: round(v, 2) for k, v in old['categories'].items()}
+                == {k: round(v, 2) for k, v in zip(new['category_labels'], new['category_values'])}
+            )
+
+        client = app.test_client()
+        with app.app_context():
+            dashboard_cache.invalidate()
+            _, page_cold = timed(lambda: (dashboard_cache.invalidate(), client.get('/')), repeat)
+        _, page_warm = timed(lambda: client.get('/'), repeat)
+
+        print(f"{count} transactions, {repeat} runs each")
+        print(f"Legacy per-month queries: {old_time * 1000:8.2f} ms")
+        print(f"Single grouped query:     {new_time * 1000:8.2f} ms ({old_time / new_time:.1f}x)")
+        print(f"Cached:                   {cached_time * 1000:8.4f} ms")
+        print(f"GET / uncached / cached:  {page_cold * 1000:8.2f} ms / {page_warm * 1000:.2f} ms")
+        print(f"Current month results match legacy: {same}")
+    finally:
+        cleanup(db_path, app)
@@ -0,0 +1,63 @@
+"""Columnar vs CSV export: file size, write time and load time.
+
+Needs pyarrow. Load times are measured the way an analysis tool would read
+each file: pandas.read_csv, pyarrow.parquet.read_table and a memory-mapped
+Arrow IPC read.
+
+Usage: python benchmarks/bench_export_columnar.py [transactions]
+"""
+import os
+import sys
+import tempfile
+
+from common import cleanup, make_app, seed_transactions, timed
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.main.utils import export_transactions_to_csv
+from app.models import Profile
+from app.services.columnar_export import export_transactions_to_columnar
+
+
+def write_csv(profile_id, path):
+    with open(path, 'wb') as output:
+        for chunk in export_transactions_to_csv(profile_id):
+            output.write(chunk)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    app, db_path = make_app()
+    directory = tempfile.mkdtemp(prefix='balancetrack_bench_columnar_')
+    paths = {fmt: os.path.join(directory, f'transactions.{fmt}') for fmt in ('csv', 'parquet', 'arrow')}
+    try:
+        with app.app_context():
+            seed_transactions(count)
+            profile_id = Profile.query.filter_by(is_active=True).first().id
+            _, csv_write = timed(lambda: write_csv(profile_id, paths['csv']))
+            _, parquet_write = timed(lambda: export_transactions_to_columnar(profile_id, output=paths['parquet'], fmt='parquet'))
+            _, arrow_write = timed(lambda: export_transactions_to_columnar(profile_id, output=paths['arrow'], fmt='arrow'))
+
+        loaders = {
+            'csv': lambda: pd.read_csv(paths['csv'], parse_dates=['Date']),
+            'parquet': lambda: pq.read_table(paths['parquet']),
+            'arrow': lambda: pa.ipc.open_file(pa.memory_map(paths['arrow'])).read_all(),
+        }
+        writes = {'csv': csv_write, 'parquet': parquet_write, 'arrow': arrow_write}
+        print(f"{count} transactions")
+        for fmt in ('csv', 'parquet', 'arrow'):
+            data, load = timed(loaders[fmt], repeat=3)
+            print(f"{fmt:8s} size={os.path.getsize(paths[fmt]) / 1e6:7.1f} MB  write={writes[fmt]:6.2f} s  "
+                  f"load={load * 1000:8.1f} ms  rows={len(data)}")
+    finally:
+        for path in paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+        os.rmdir(directory)
+        cleanup(db_path, app)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""CSV export: peak RSS and time-to-first-byte, pandas blob vs streaming.
+
+Each mode runs in a fresh child process against the same seeded database so
+the peak RSS of one does not hide the other.
+
+Usage: python benchmarks/bench_export_csv.py [transactions]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from common import cleanup, make_app, seed_transactions, stop_workers
+
+
+def legacy_export():
+    """The pandas-based export the /export/csv route used before streaming."""
+    import pandas as pd
+    from app.models import Transaction
+
+    data = []
+    for tx in Transaction.query.all():
+        data.append({
+            'Date': tx.date.strftime('%Y-%m-%d'),
+            'Account': tx.account.name,
+            'Type': tx.transaction_type,
+            'Category': tx.category.name if tx.category else 'Uncategorized',
+            'Amount': tx.amount,
+            'Description': tx.description
+        })
+    return pd.DataFrame(data).to_csv(index=False).encode('utf-8')
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_child(mode, db_path):
+    app, _ = make_app(db_path)
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    if mode == 'legacy':
+        with app.app_context():
+            body = legacy_export()
+        first_byte = time.perf_counter() - start
+        size = len(body)
+    else:
+        response = app.test_client().get('/export/csv', buffered=False)
+        for chunk in response.response:
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(chunk)
+        response.close()
+    total = time.perf_counter() - start
+    print(json.dumps({'mode': mode, 'ttfb': first_byte, 'total': total, 'bytes': size,
+                      'rss_before': before, 'rss_peak': peak_rss_mb()}))
+    stop_workers(app)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run_child(sys.argv[2], sys.argv[3])
+        return
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    app, db_path = make_app()
+    try:
+        with app.app_context():
+            seed_transactions(count)
+        stop_workers(app)
+
+        print(f"{count} transactions")
+        for mode in ('legacy', 'streaming'):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode, db_path],
+                                    capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:10s} ttfb={result['ttfb'] * 1000:9.1f} ms  total={result['total']:6.2f} s  "
+                  f"size={result['bytes'] / 1e6:6.1f} MB  "
+                  f"peak RSS={result['rss_peak']:6.0f} MB (+{result['rss_peak'] - result['rss_before']:.0f} MB)")
+    finally:
+        cleanup(db_path, app)
+
+
+if __name__ == '__main__':
+    main()
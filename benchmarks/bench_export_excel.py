@@ -0,0 +1,84 @@
+"""Excel export: time and peak RSS, pandas ExcelWriter vs write-only openpyxl.
+
+Each mode runs in a fresh child process against the same seeded database.
+
+Usage: python benchmarks/bench_export_excel.py [transactions]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from common import cleanup, make_app, seed_transactions, stop_workers
+
+
+def legacy_export(profile_id):
+    """The DataFrame + pd.ExcelWriter export used before the write-only path."""
+    from io import BytesIO
+
+    import pandas as pd
+
+    from app.main.utils import EXPORT_COLUMNS, export_rows
+
+    df = pd.DataFrame.from_records(export_rows(profile_id), columns=EXPORT_COLUMNS)
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='Transactions')
+    return len(output.getvalue())
+
+
+def write_only_export(profile_id):
+    from app.main.utils import export_transactions_to_excel
+
+    output = export_transactions_to_excel(profile_id)
+    size = os.fstat(output.fileno()).st_size
+    output.close()
+    return size
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_child(mode, db_path):
+    from app.models import Profile
+
+    app, _ = make_app(db_path)
+    with app.app_context():
+        profile_id = Profile.query.filter_by(is_active=True).first().id
+        before = peak_rss_mb()
+        start = time.perf_counter()
+        size = legacy_export(profile_id) if mode == 'legacy' else write_only_export(profile_id)
+        total = time.perf_counter() - start
+    print(json.dumps({'mode': mode, 'total': total, 'bytes': size,
+                      'rss_before': before, 'rss_peak': peak_rss_mb()}))
+    stop_workers(app)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run_child(sys.argv[2], sys.argv[3])
+        return
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    app, db_path = make_app()
+    try:
+        with app.app_context():
+            seed_transactions(count)
+        stop_workers(app)
+
+        print(f"{count} transactions")
+        for mode in ('legacy', 'write-only'):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode, db_path],
+                                    capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:10s} total={result['total']:6.2f} s  size={result['bytes'] / 1e6:6.1f} MB  "
+                  f"peak RSS={result['rss_peak']:6.0f} MB (+{result['rss_peak'] - result['rss_before']:.0f} MB)")
+    finally:
+        cleanup(db_path, app)
+
+
+if __name__ == '__main__':
+    main()
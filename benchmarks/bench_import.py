@@ -0,0 +1,75 @@
+"""Bulk statement import: rows/s through import_service vs the per-row form.
+
+Generates a CSV statement, imports it with one batched transaction and
+checks that account balances and the monthly rollup still reconcile. The
+per-row baseline posts a small sample through /transactions/add and is
+extrapolated.
+
+Usage: python benchmarks/bench_import.py [rows] [baseline_rows]
+"""
+import io
+import random
+import sys
+from datetime import datetime, timedelta
+
+from common import cleanup, make_app, seed_transactions, timed
+
+from app.models import Profile, Transaction
+from app.services import import_service, ledger_service, rollup_service
+
+
+def make_statement(count, account_names, category_names, seed=7):
+    random.seed(seed)
+    now = datetime.now()
+    out = io.StringIO()
+    out.write('Date,Account,Category,Description,Amount\n')
+    for i in range(count):
+        amount = round(random.uniform(-400, 300), 2)
+        date = (now - timedelta(days=random.randint(0, 365))).strftime('%d/%m/%Y')
+        out.write(f'{date},{random.choice(account_names)},{random.choice(category_names)},'
+                  f'"Statement line {i}, ref {random.randint(1000, 9999)}",{amount}\n')
+    return out.getvalue().encode('utf-8')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    baseline = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    app, db_path = make_app()
+    try:
+        with app.app_context():
+            account_ids = seed_transactions(0)
+            from app.models import Account, Category
+            account_names = [a.name for a in Account.query.filter(Account.id.in_(account_ids))]
+            category_names = [c.name for c in Category.query.all()]
+            profile_id = Profile.query.filter_by(is_active=True).first().id
+            data = make_statement(count, account_names, category_names)
+
+            result, elapsed = timed(lambda: import_service.import_file(profile_id, io.BytesIO(data), 'statement.csv'))
+            print(f"bulk import   {result['imported']} rows in {elapsed:.2f}s ({result['imported'] / elapsed:,.0f} rows/s), "
+                  f"skipped {result['skipped']}")
+            drift = ledger_service.reconcile()
+            problems = rollup_service.check()
+            print(f"ledger drift: {len(drift)} accounts, rollup problems: {len(problems)}")
+
+        client = app.test_client()
+        random.seed(1)
+
+        def post_rows():
+            for i in range(baseline):
+                client.post('/transactions/add', data={
+                    'account_id': str(random.choice(account_ids)), 'amount': '12.34', 'type': 'Expense',
+                    'description': f'form row {i}', 'date': '2026-01-15'
+                })
+        _, per_row = timed(post_rows)
+        rate = baseline / per_row
+        print(f"per-row form  {baseline} rows in {per_row:.2f}s ({rate:,.0f} rows/s), "
+              f"~{count / rate:.0f}s for {count} rows")
+        with app.app_context():
+            print(f"transactions: {Transaction.query.count()}")
+        return 1 if drift or problems else 0
+    finally:
+        cleanup(db_path, app)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
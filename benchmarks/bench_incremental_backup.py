@@ -0,0 +1,121 @@
+"""Full snapshot vs incremental delta backups, with a row-level restore check.
+
+Captures every upload on a local stand-in for the Telegram API, rebuilds the
+database from the last snapshot plus its deltas and compares every table
+(except the activity log, which is written outside the ORM session) with
+the live database.
+
+Usage: python benchmarks/bench_incremental_backup.py [seeded transactions] [rounds]
+"""
+import email
+import email.policy
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common import cleanup, make_app, seed_transactions
+
+from app.services.changelog import restore
+
+UPLOAD_DIR = tempfile.mkdtemp(prefix='balancetrack_uploads_')
+
+
+class StandInTelegram(BaseHTTPRequestHandler):
+    uploads = []
+
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        message = email.message_from_bytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body,
+            policy=email.policy.default
+        )
+        for part in message.iter_parts():
+            if part.get_filename():
+                path = os.path.join(UPLOAD_DIR, part.get_filename())
+                with open(path, 'wb') as f:
+                    f.write(part.get_payload(decode=True))
+                StandInTelegram.uploads.append(path)
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def wait_until_idle(worker):
+    while worker.queue_depth or worker.status()['uploading']:
+        time.sleep(0.05)
+
+
+def table_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = [r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' AND name != 'activity_log'")]
+        return {table: sorted(conn.execute(f'SELECT * FROM "{table}"').fetchall(), key=repr) for table in tables}
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    seeded = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInTelegram)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    app, db_path = make_app(
+        TELEGRAM_BOT_TOKEN='bench-token',
+        TELEGRAM_CHAT_ID='1',
+        TELEGRAM_API_URL=base_url,
+        TELEGRAM_CONNECTIVITY_URL=base_url,
+        BACKUP_DEBOUNCE_SECONDS=0.2,
+        BACKUP_MODE='incremental'
+    )
+    try:
+        with app.app_context():
+            account_ids = seed_transactions(seeded)
+        worker = app.extensions['backup_worker']
+        client = app.test_client()
+        wait_until_idle(worker)
+
+        for r in range(rounds):
+            for i in range(5):
+                client.post('/transactions/add', data={
+                    'account_id': account_ids[i % len(account_ids)], 'category_id': 1, 'amount': f'{10 + i}.25',
+                    'type': 'Expense', 'description': f'Round {r} #{i}', 'date': '2026-01-01'
+                })
+            client.post('/transactions/edit/1', data={
+                'account_id': account_ids[0], 'category_id': 2, 'amount': f'{r + 1}.5',
+                'type': 'Income', 'description': f'Edited in round {r}', 'date': '2026-02-01'
+            })
+            client.post(f'/transactions/delete/{r + 2}')
+            wait_until_idle(worker)
+        worker.stop()
+
+        snapshot = [p for p in StandInTelegram.uploads if '_delta_' not in p][-1]
+        deltas = [p for p in StandInTelegram.uploads if '_delta_' in p and os.path.basename(snapshot).split('.')[0] in p]
+        print(f"Live database:  {os.path.getsize(db_path):>10} bytes")
+        print(f"Full snapshot:  {os.path.getsize(snapshot):>10} bytes")
+        print(f"Delta uploads:  {len(deltas)}, average {sum(map(os.path.getsize, deltas)) / max(len(deltas), 1):.0f} bytes")
+
+        restored = os.path.join(UPLOAD_DIR, 'restored.db')
+        restore(snapshot, deltas, restored)
+        live, rebuilt = table_rows(db_path), table_rows(restored)
+        mismatched = [table for table in live if live[table] != rebuilt.get(table)]
+        print("Restore check:  " + ("OK, every table matches row for row" if not mismatched else f"MISMATCH in {mismatched}"))
+        sys.exit(1 if mismatched else 0)
+    finally:
+        server.shutdown()
+        cleanup(db_path, app)
+        shutil.rmtree(UPLOAD_DIR, ignore_errors=True)
@@ -0,0 +1,85 @@
+"""Integer-cent money columns vs the old REAL columns: file size, aggregate
+speed and summation error on the same seeded transactions.
+
+The float copy is made the way the migration's downgrade does it (REAL
+columns, values / 100), then both files are vacuumed.
+
+Usage: python benchmarks/bench_money.py [rows]   (default 1000000)
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from decimal import Decimal
+
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from common import cleanup, make_app, seed_transactions, stop_workers
+
+QUERIES = {
+    'balance per account': 'SELECT account_id, SUM(amount) FROM "transaction" GROUP BY account_id',
+    'monthly rollup': 'SELECT account_id, category_id, transaction_type, strftime(\'%Y-%m\', date), SUM(amount), '
+                      'COUNT(*) FROM "transaction" GROUP BY 1, 2, 3, 4',
+    'grand total': 'SELECT SUM(amount) FROM "transaction"',
+}
+
+
+def to_float(path):
+    engine = sa.create_engine(f'sqlite:///{path}')
+    with engine.begin() as conn:
+        op = Operations(MigrationContext.configure(conn))
+        with op.batch_alter_table('transaction') as batch_op:
+            batch_op.alter_column('amount', type_=sa.Float(), existing_type=sa.Integer())
+        op.execute('UPDATE "transaction" SET amount = amount / 100.0')
+    engine.dispose()
+
+
+def best_of(conn, sql, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = conn.execute(sql).fetchall()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    app, int_path = make_app()
+    float_path = int_path + '.float.db'
+    try:
+        from app import db
+        with app.app_context():
+            seed_transactions(rows)
+            stop_workers(app)
+            # Closing the pool checkpoints the WAL into the file before it is copied
+            db.session.remove()
+            db.engine.dispose()
+        shutil.copyfile(int_path, float_path)
+        to_float(float_path)
+
+        conns = {}
+        for name, path in (('integer', int_path), ('float', float_path)):
+            conn = sqlite3.connect(path)
+            conn.execute('PRAGMA journal_mode=DELETE')
+            conn.execute('VACUUM')
+            conns[name] = conn
+            print(f"{name:<8} file size {os.path.getsize(path) / 1e6:8.1f} MB")
+
+        print(f"{'query':<20} {'integer ms':>11} {'float ms':>9}")
+        for label, sql in QUERIES.items():
+            (_, int_time), (_, float_time) = best_of(conns['integer'], sql), best_of(conns['float'], sql)
+            print(f"{label:<20} {int_time * 1000:11.1f} {float_time * 1000:9.1f}")
+
+        exact = Decimal(conns['integer'].execute('SELECT SUM(amount) FROM "transaction"').fetchone()[0]) / 100
+        float_sum = conns['float'].execute('SELECT SUM(amount) FROM "transaction"').fetchone()[0]
+        print(f"grand total: integer {exact}, float {float_sum!r}, float error {abs(Decimal(float_sum) - exact):.2E}")
+        for conn in conns.values():
+            conn.close()
+    finally:
+        cleanup(float_path)
+        cleanup(int_path, app)
@@ -0,0 +1,34 @@
+"""Count the SQL statements each page issues, to keep the fixed per-request cost low.
+
+Usage: python benchmarks/bench_request_queries.py [transactions]
+"""
+import sys
+
+from common import cleanup, make_app, seed_transactions
+
+from sqlalchemy import event
+
+from app import db
+
+PAGES = ['/', '/transactions/', '/accounts/', '/budgets/', '/categories/', '/loans/', '/investments/',
+         '/profiles/', '/transactions/add']
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    app, db_path = make_app()
+    try:
+        with app.app_context():
+            seed_transactions(count)
+            engine = db.engine
+
+        statements = []
+        event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+        client = app.test_client()
+        for page in PAGES:
+            client.get(page)  # warm the caches
+            statements.clear()
+            client.get(page)
+            print(f"{page:<20} {len(statements):>3} queries")
+    finally:
+        cleanup(db_path, app)
@@ -0,0 +1,130 @@
+"""Load test of the serving modes: throughput and latency on the dashboard
+and the transaction list with concurrent keep-alive clients, and dashboard
+latency while a CSV export streams on another connection.
+
+Each mode runs in its own server process against the same seeded database;
+the clients run here, each on one persistent HTTP/1.1 connection.
+
+Usage: python benchmarks/bench_serving.py [--rows 50000] [--clients 8] [--seconds 10] [--modes dev threaded waitress]
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from common import cleanup, make_app, seed_transactions, stop_workers
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER = """
+import sys
+sys.path.insert(0, {root!r})
+from app import create_app
+from app.serving import AppServer
+AppServer(create_app(), port={port}, mode={mode!r}).serve_forever()
+"""
+
+# (label, path, path downloaded concurrently by one extra client)
+SCENARIOS = (
+    ('/', '/', None),
+    ('/transactions/', '/transactions/', None),
+    ('/ + export', '/', '/export/csv'),
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/healthz')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("server did not start")
+
+
+def client(port, path, stop, latencies, errors):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+            latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+
+
+def load(port, path, clients, seconds, background=None):
+    """Hammer `path` with `clients` connections, optionally while one more
+    client keeps downloading `background`."""
+    stop = threading.Event()
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client, args=(port, path, stop, latencies, errors)) for _ in range(clients)]
+    if background:
+        threads.append(threading.Thread(target=client, args=(port, background, stop, [], errors)))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--modes', nargs='+', default=['dev', 'threaded', 'waitress'])
+    args = parser.parse_args()
+
+    app, db_path = make_app()
+    with app.app_context():
+        seed_transactions(args.rows)
+    stop_workers(app)
+
+    print(f"{args.rows} transactions, {args.clients} clients, {args.seconds:.0f} s per path")
+    print(f"{'mode':<9} {'path':<15} {'req/s':>7} {'p50 ms':>7} {'p95 ms':>7} {'errors':>6}")
+    try:
+        for mode in args.modes:
+            port = free_port()
+            env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', TELEGRAM_BOT_TOKEN='', TELEGRAM_CHAT_ID='')
+            server = subprocess.Popen([sys.executable, '-c', SERVER.format(root=ROOT, port=port, mode=mode)],
+                                      cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_ready(port)
+                for label, path, background in SCENARIOS:
+                    latencies, errors = load(port, path, args.clients, args.seconds, background)
+                    latencies.sort()
+                    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+                    print(f"{mode:<9} {label:<15} {len(latencies) / args.seconds:7.1f} "
+                          f"{statistics.median(latencies or [0]) * 1000:7.1f} {p95 * 1000:7.1f} {len(errors):6}")
+            finally:
+                server.terminate()
+                server.wait()
+    finally:
+        cleanup(db_path)
+
+
+if __name__ == '__main__':
+    main()
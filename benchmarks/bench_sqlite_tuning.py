@@ -0,0 +1,117 @@
+"""SQLite defaults vs the tuned connection profile (WAL, synchronous=NORMAL,
+larger cache, mmap, in-memory temp store).
+
+  write     single-row commits per second, through the engine and through
+            the add-transaction route (activity log + ledger + rollup)
+  mixed     reader threads running an aggregate query while one writer
+            keeps committing: reader throughput and p95, writer commits/s
+
+Usage: python benchmarks/bench_sqlite_tuning.py [--rows 100000] [--seconds 5] [--readers 4]
+"""
+import argparse
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+
+from common import cleanup, make_app, seed_transactions
+
+PROFILES = {
+    'default': {'SQLITE_JOURNAL_MODE': 'delete', 'SQLITE_SYNCHRONOUS': '', 'SQLITE_CACHE_SIZE_KB': 0,
+                'SQLITE_MMAP_SIZE_MB': 0, 'SQLITE_TEMP_STORE': ''},
+    'tuned': {},
+}
+
+INSERT = text('INSERT INTO "transaction" (account_id, amount, transaction_type, description, date, created_at) '
+              'VALUES (:account_id, 1.0, \'Expense\', \'bench\', :now, :now)')
+AGGREGATE = text('SELECT account_id, transaction_type, SUM(amount), COUNT(*) FROM "transaction" '
+                 'GROUP BY account_id, transaction_type')
+
+
+def engine_commits(engine, account_id, seconds):
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        with engine.begin() as conn:
+            conn.execute(INSERT, {'account_id': account_id, 'now': datetime.now()})
+        count += 1
+    return count / seconds
+
+
+def route_commits(app, account_id, seconds):
+    client = app.test_client()
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        client.post('/transactions/add', data={'account_id': str(account_id), 'amount': '3.5', 'type': 'Expense',
+                                               'description': 'bench', 'date': '2026-01-02'})
+        count += 1
+    return count / seconds
+
+
+def mixed(engine, account_id, seconds, readers):
+    stop = threading.Event()
+    latencies, errors, writes = [], [], [0]
+
+    def writer():
+        while not stop.is_set():
+            try:
+                with engine.begin() as conn:
+                    conn.execute(INSERT, {'account_id': account_id, 'now': datetime.now()})
+                writes[0] += 1
+            except Exception as e:
+                errors.append(type(e).__name__)
+
+    def reader():
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(AGGREGATE).all()
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(type(e).__name__)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+    return len(latencies) / seconds, p95, writes[0] / seconds, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{args.rows} transactions, {args.seconds:.0f} s per test, {args.readers} readers")
+    print(f"{'profile':<16} {'engine commits/s':>16} {'route commits/s':>15} "
+          f"{'reads/s':>8} {'read p95 ms':>11} {'writes/s':>9} {'errors':>6}")
+    for name, overrides in PROFILES.items():
+        app, db_path = make_app(SQLITE_MAINTENANCE_INTERVAL=0, **overrides)
+        try:
+            from app import db
+            with app.app_context():
+                account_id = seed_transactions(args.rows)[0]
+                engine = db.engine
+                with engine.connect() as conn:
+                    journal = conn.exec_driver_sql('PRAGMA journal_mode').scalar()
+                write_rate = engine_commits(engine, account_id, args.seconds)
+                route_rate = route_commits(app, account_id, args.seconds)
+                reads, p95, writes, errors = mixed(engine, account_id, args.seconds, args.readers)
+            print(f"{name + ' (' + journal + ')':<16} {write_rate:16.0f} {route_rate:15.0f} "
+                  f"{reads:8.1f} {p95 * 1000:11.1f} {writes:9.0f} {errors:6}")
+        finally:
+            cleanup(db_path, app)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Startup time of run.py and of the desktop launcher, each in a fresh
+interpreter against an already bootstrapped database.
+
+  run.py    import run (create_app), as `flask run` / `python run.py` do
+  launcher  import launcher, create_app, start the server thread and wait
+            for /healthz, i.e. everything before the window opens
+  frozen    with --exe, spawn the PyInstaller build (dist/BalanceTrack) and
+            wait for its /healthz; it needs an existing launcher config
+            (the first-run folder dialog is not automated)
+
+    python bench_startup.py [--runs 5] [--exe dist/BalanceTrack]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUN_PY = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import run
+print(time.perf_counter() - start, len(sys.modules))
+"""
+
+LAUNCHER = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import launcher
+app = launcher.create_app()
+server = launcher.run_flask(app)
+assert launcher.wait_until_ready()
+print(time.perf_counter() - start, len(sys.modules))
+server.stop()
+"""
+
+
+def run_script(script, db_path):
+    """Wall time of a fresh interpreter, plus the in-process time it reports."""
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', TELEGRAM_BOT_TOKEN='', TELEGRAM_CHAT_ID='')
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', script.format(root=ROOT)], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode:
+        sys.exit(result.stderr)
+    # The last line is ours; the dev server may print before it
+    inner, modules = result.stdout.strip().splitlines()[-1].split()
+    return wall, float(inner), int(modules)
+
+
+def run_frozen(exe, timeout=60):
+    start = time.perf_counter()
+    process = subprocess.Popen([exe], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen('http://127.0.0.1:5555/healthz', timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError("frozen launcher did not become ready")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--exe', help="Path to the PyInstaller build of launcher.py")
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix='.db', prefix='balancetrack_bench_')
+    os.close(fd)
+    os.remove(db_path)
+    try:
+        run_script(RUN_PY, db_path)  # bootstrap the database once
+        for name, script in (('run.py', RUN_PY), ('launcher', LAUNCHER)):
+            timings = [run_script(script, db_path) for _ in range(args.runs)]
+            print(f"{name:<9} process {statistics.median(t[0] for t in timings) * 1000:6.0f} ms   "
+                  f"in-process {statistics.median(t[1] for t in timings) * 1000:6.0f} ms   "
+                  f"{timings[-1][2]} modules")
+    finally:
+        os.remove(db_path)
+
+    if args.exe:
+        timings = [run_frozen(args.exe) for _ in range(args.runs)]
+        print(f"{'frozen':<9} ready   {statistics.median(timings) * 1000:6.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Transaction list latency as history grows: full .all() load vs keyset pages.
+
+Usage: python benchmarks/bench_transaction_list.py [sizes...]   (default 10000 100000 1000000)
+"""
+import sys
+
+from common import cleanup, make_app, seed_transactions, timed
+
+from app.models import Account, Profile, Transaction
+from app.services.transaction_service import page_transactions
+
+
+def legacy_list(profile_id):
+    """What transactions.index did before: every row, plus lazy loads per row."""
+    rows = Transaction.query.join(Account, Transaction.account_id == Account.id)\
+        .filter(Account.profile_id == profile_id).order_by(Transaction.date.desc()).all()
+    for tx in rows:
+        tx.account.name, tx.category
+    return rows
+
+
+def deep_cursor(profile_id, pages):
+    cursor = None
+    for _ in range(pages):
+        _, cursor, _ = page_transactions(profile_id, after=cursor)
+    return cursor
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    print(f"{'rows':>9} {'legacy .all()':>14} {'first page':>11} {'page 20':>9} {'filtered':>9} {'HTTP page':>10}")
+    for size in sizes:
+        app, db_path = make_app()
+        try:
+            with app.app_context():
+                seed_transactions(size)
+                profile_id = Profile.query.filter_by(is_active=True).first().id
+                account_id = Account.query.first().id
+
+                legacy = '-'
+                if size <= 100000:
+                    _, legacy_time = timed(lambda: legacy_list(profile_id))
+                    legacy = f"{legacy_time * 1000:.1f} ms"
+                _, first = timed(lambda: page_transactions(profile_id), 20)
+                cursor = deep_cursor(profile_id, 20)
+                _, deep = timed(lambda: page_transactions(profile_id, after=cursor), 20)
+                filters = {'account_id': account_id, 'type': 'Expense', 'min_amount': 100.0}
+                _, filtered = timed(lambda: page_transactions(profile_id, filters), 20)
+
+            client = app.test_client()
+            _, http = timed(lambda: client.get('/transactions/'), 10)
+            print(f"{size:>9} {legacy:>14} {first * 1000:>8.2f} ms {deep * 1000:>6.2f} ms "
+                  f"{filtered * 1000:>6.2f} ms {http * 1000:>7.2f} ms")
+        finally:
+            cleanup(db_path, app)
@@ -0,0 +1,77 @@
+"""Import-time budget check for app startup.
+
+Runs `create_app()` in a fresh interpreter under `python -X importtime`
+and fails (exit status 1) if startup loads any module that should only be
+imported on first use (exports, statement import, Telegram sync, dialogs),
+or if importing the app takes longer than --budget-ms.
+
+    python check_startup_imports.py [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages app startup must not import
+LAZY_MODULES = ('pandas', 'numpy', 'openpyxl', 'pyarrow', 'requests', 'urllib3', 'tkinter', 'webview')
+
+STARTUP = """
+import sys
+sys.path.insert(0, {root!r})
+from app import create_app
+create_app()
+"""
+
+
+def import_times(db_path):
+    """(module, self_us, cumulative_us) for every import create_app() makes."""
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', TELEGRAM_BOT_TOKEN='', TELEGRAM_CHAT_ID='')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', STARTUP.format(root=ROOT)],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode:
+        sys.exit(result.stderr)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget-ms', type=float, default=1500)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix='.db', prefix='balancetrack_bench_')
+    os.close(fd)
+    try:
+        rows = import_times(db_path)
+    finally:
+        os.remove(db_path)
+
+    app_ms = max((cumulative for name, _, cumulative in rows if name == 'app'), default=0) / 1000
+    print(f"{len(rows)} modules imported, 'app' package {app_ms:.0f} ms cumulative")
+    for name, self_us, _ in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:7.1f} ms  {name}")
+
+    loaded = sorted({name.split('.')[0] for name, _, _ in rows} & set(LAZY_MODULES))
+    failed = False
+    if loaded:
+        failed = True
+        print(f"FAIL: startup imports modules that should load lazily: {', '.join(loaded)}")
+    if app_ms > args.budget_ms:
+        failed = True
+        print(f"FAIL: importing the app took {app_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if failed:
+        sys.exit(1)
+    print("Startup imports are within budget.")
+
+
+if __name__ == '__main__':
+    main()
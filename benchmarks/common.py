@@ -0,0 +1,110 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Allow running the benchmarks as plain scripts from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+
+def make_app(db_path=None, **overrides):
+    """Create an app bound to a throwaway SQLite file with config overrides."""
+    from app import create_app
+
+    if db_path is None:
+        fd, db_path = tempfile.mkstemp(suffix='.db', prefix='balancetrack_bench_')
+        os.close(fd)
+        os.remove(db_path)
+
+    attrs = {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'TELEGRAM_BOT_TOKEN': None,
+        'TELEGRAM_CHAT_ID': None,
+    }
+    attrs.update(overrides)
+    BenchConfig = type('BenchConfig', (Config,), attrs)
+    return create_app(BenchConfig), db_path
+
+
+def seed_transactions(count, accounts=3, seed=42):
+    """Insert `count` random transactions for the active profile in bulk."""
+    from app import db
+    from app.models import Account, Category, Profile, Transaction
+    from app.services.dedup_service import fingerprint
+    from seed_data import seed_categories, seed_currencies
+
+    random.seed(seed)
+    # Seeding is setup, not a user change, so keep it out of backup notifications
+    db.session._skip_notification = True
+    seed_currencies()
+    db.session._skip_notification = True
+    seed_categories()
+
+    profile = Profile.query.filter_by(is_active=True).first()
+    account_ids = []
+    for i in range(accounts):
+        account = Account(profile_id=profile.id, name=f'Bench Account {i + 1}', account_type='Bank', balance=0.0)
+        db.session.add(account)
+        db.session.flush()
+        account_ids.append(account.id)
+    db.session._skip_notification = True
+    db.session.commit()
+
+    categories = Category.query.all()
+    now = datetime.now()
+    batch = []
+    for i in range(count):
+        category = random.choice(categories)
+        batch.append({
+            'account_id': random.choice(account_ids),
+            'category_id': category.id,
+            'amount': round(random.uniform(1, 500), 2),
+            'transaction_type': 'Income' if category.is_income else 'Expense',
+            'description': f'Bench transaction {i}',
+            'date': now - timedelta(days=random.randint(0, 730), minutes=random.randint(0, 1440)),
+            'created_at': now
+        })
+        row = batch[-1]
+        row['fingerprint'] = fingerprint(row['account_id'], row['date'], row['amount'], row['description'])
+        if len(batch) >= 10000:
+            db.session.execute(Transaction.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Transaction.__table__.insert(), batch)
+    db.session._skip_notification = True
+    db.session.commit()
+
+    from app.services import rollup_service
+    rollup_service.rebuild()
+    return account_ids
+
+
+def timed(func, repeat=1):
+    """Run `func` `repeat` times and return (last result, seconds per call)."""
+    start = time.perf_counter()
+    result = None
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def stop_workers(app):
+    """Stop the app's background threads before its database disappears."""
+    for name in ('activity_log', 'backup_worker', 'export_jobs', 'analytics_snapshot', 'sqlite_maintenance'):
+        worker = app.extensions.get(name)
+        if worker:
+            worker.stop()
+
+
+def cleanup(db_path, app=None):
+    if app is not None:
+        stop_workers(app)
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        try:
+            os.remove(db_path + suffix)
+        except OSError:
+            pass
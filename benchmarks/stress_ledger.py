@@ -0,0 +1,94 @@
+"""Hammer transactions add/delete from many threads and check for balance drift.
+
+Every thread posts a mix of expenses, incomes and transfers through the real
+routes and deletes about a third of them again. Afterwards each account
+balance must equal its opening balance plus the surviving history.
+
+    python benchmarks/stress_ledger.py [--threads 16] [--per-thread 50]
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from common import cleanup, make_app, seed_transactions
+
+
+def worker(app, account_ids, count, seed, errors):
+    from app.models import Transaction
+
+    rng = random.Random(seed)
+    client = app.test_client()
+    tag = f'stress-{seed}'
+    for i in range(count):
+        tx_type = rng.choice(('Expense', 'Income', 'Transfer'))
+        source, destination = rng.sample(account_ids, 2)
+        data = {
+            'account_id': str(source),
+            'amount': f'{rng.uniform(1, 100):.2f}',
+            'type': tx_type,
+            'description': f'{tag}-{i}',
+            'date': '2026-01-15',
+        }
+        if tx_type == 'Transfer':
+            data['transfer_to_account_id'] = str(destination)
+        response = client.post('/transactions/add', data=data)
+        if response.status_code != 302:
+            errors.append(f'add {tag}-{i}: HTTP {response.status_code}')
+
+        if rng.random() < 0.33:
+            with app.app_context():
+                row = Transaction.query.filter_by(description=f'{tag}-{i}').first()
+                transaction_id = row.id if row else None
+            if transaction_id is None:
+                errors.append(f'delete {tag}-{i}: not found')
+                continue
+            response = client.post(f'/transactions/delete/{transaction_id}')
+            if response.status_code != 302:
+                errors.append(f'delete {tag}-{i}: HTTP {response.status_code}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--per-thread', type=int, default=50)
+    args = parser.parse_args()
+
+    app, db_path = make_app(ACTIVITY_LOG_BUFFERED=True)
+    try:
+        with app.app_context():
+            account_ids = seed_transactions(0, accounts=4)
+
+        errors = []
+        threads = [threading.Thread(target=worker, args=(app, account_ids, args.per_thread, seed, errors))
+                   for seed in range(args.threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        from app.models import Transaction
+        from app.services import ledger_service
+        with app.app_context():
+            drift = ledger_service.reconcile()
+            remaining = Transaction.query.count()
+
+        operations = args.threads * args.per_thread
+        print(f"{args.threads} threads x {args.per_thread} adds in {elapsed:.2f}s "
+              f"({operations / elapsed:.0f} adds/s), {remaining} transactions left")
+        print(f"request errors: {len(errors)}")
+        for line in errors[:10]:
+            print(f"  {line}")
+        for account_id, stored, expected in drift:
+            print(f"DRIFT account {account_id}: stored={stored:.2f} expected={expected:.2f}")
+        print("drift: none" if not drift else f"drift: {len(drift)} accounts")
+        return 1 if drift else 0
+    finally:
+        cleanup(db_path, app)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -86,6 +86,7 @@ def build():
         "flask_sqlalchemy",
         "flask_login",
         "flask_migrate",
+        "waitress",
         "clr-loader", # For pywebview on Windows
         "tkinter",
         "tkinter.filedialog",
@@ -16,11 +16,60 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'hard-to-guess-string'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///finance.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Seconds a SQLite connection waits on a locked database before failing
+    SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', 30))
+    # SQLite performance profile applied to every connection (see app/services/sqlite_tuning.py);
+    # an empty string or 0 keeps SQLite's default
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'wal')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'normal')
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB') or 16384)
+    SQLITE_MMAP_SIZE_MB = int(os.environ.get('SQLITE_MMAP_SIZE_MB') or 256)
+    SQLITE_TEMP_STORE = os.environ.get('SQLITE_TEMP_STORE', 'memory')
+    # Seconds between PRAGMA optimize + WAL checkpoint runs; 0 disables
+    SQLITE_MAINTENANCE_INTERVAL = float(os.environ.get('SQLITE_MAINTENANCE_INTERVAL', 600))
+
+    # WSGI server used by the launcher: waitress, threaded or dev (see app/serving.py)
+    SERVER_MODE = os.environ.get('SERVER_MODE', 'waitress')
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 8))
+    SERVER_KEEPALIVE_SECONDS = int(os.environ.get('SERVER_KEEPALIVE_SECONDS', 120))
+    SERVER_CONNECTION_LIMIT = int(os.environ.get('SERVER_CONNECTION_LIMIT', 100))
+    SERVER_SHUTDOWN_TIMEOUT = float(os.environ.get('SERVER_SHUTDOWN_TIMEOUT', 10))
+
+    # Currency totals are shown in when a profile has no base currency of its own
+    BASE_CURRENCY = os.environ.get('BASE_CURRENCY', 'BDT')
     
     # Telegram/OTP Configuration
     TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
     TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID')
+    TELEGRAM_API_URL = os.environ.get('TELEGRAM_API_URL') or 'https://api.telegram.org'
+    TELEGRAM_CONNECTIVITY_URL = os.environ.get('TELEGRAM_CONNECTIVITY_URL') or 'https://8.8.8.8'
+
+    # Database backup settings
+    BACKUP_DEBOUNCE_SECONDS = float(os.environ.get('BACKUP_DEBOUNCE_SECONDS', 10))
+    BACKUP_MAX_RETRIES = int(os.environ.get('BACKUP_MAX_RETRIES', 5))
+    BACKUP_RETRY_BACKOFF = float(os.environ.get('BACKUP_RETRY_BACKOFF', 2))
+    BACKUP_COMPRESSION = os.environ.get('BACKUP_COMPRESSION', 'gzip') # gzip, zstd or none
+    BACKUP_MODE = os.environ.get('BACKUP_MODE', 'full') # full or incremental
+    BACKUP_FULL_INTERVAL_HOURS = float(os.environ.get('BACKUP_FULL_INTERVAL_HOURS', 24))
     
     # OTP settings
     OTP_EXPIRY_MINUTES = int(os.environ.get('OTP_EXPIRY_MINUTES', 5))
     MAX_OTP_RETRIES = int(os.environ.get('MAX_OTP_RETRIES', 3))
+
+    # Activity log settings
+    ACTIVITY_LOG_BUFFERED = os.environ.get('ACTIVITY_LOG_BUFFERED', '1') == '1'
+    ACTIVITY_LOG_BATCH_SIZE = int(os.environ.get('ACTIVITY_LOG_BATCH_SIZE', 100))
+    ACTIVITY_LOG_FLUSH_INTERVAL = float(os.environ.get('ACTIVITY_LOG_FLUSH_INTERVAL', 2.0))
+    # Failed flushes a batch is retried for before it is dropped
+    ACTIVITY_LOG_MAX_RETRIES = int(os.environ.get('ACTIVITY_LOG_MAX_RETRIES', 5))
+    ACTIVITY_LOG_EXCLUDE_PREFIXES = ('/static/', '/favicon.ico', '/healthz')
+    ACTIVITY_LOG_EXCLUDE_METHODS = ('HEAD', 'OPTIONS')
+
+    # Background export jobs
+    EXPORT_JOB_WORKERS = int(os.environ.get('EXPORT_JOB_WORKERS', 2))
+    EXPORT_DIR = os.environ.get('EXPORT_DIR') # Defaults to <instance>/exports
+    EXPORT_JOB_TTL_SECONDS = int(os.environ.get('EXPORT_JOB_TTL_SECONDS', 3600))
+
+    # Arrow analytics snapshot for external tools (needs pyarrow); unset to disable
+    ANALYTICS_SNAPSHOT_DIR = os.environ.get('ANALYTICS_SNAPSHOT_DIR')
+    ANALYTICS_SNAPSHOT_INTERVAL = float(os.environ.get('ANALYTICS_SNAPSHOT_INTERVAL', 60))
@@ -1,12 +1,9 @@
 import os
 import sys
 import json
-import threading
 import time
-import tkinter as tk
-from tkinter import filedialog, messagebox
-import webview
-from app import create_app, db
+import urllib.request
+from app import create_app
 
 # Configuration file location
 CONFIG_DIR = os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'BalanceTrack')
@@ -37,6 +34,9 @@ def save_config(config):
         json.dump(config, f)
 
 def select_db_location():
+    # tkinter is only needed for first-run and error dialogs
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
     root = tk.Tk()
     root.withdraw()
     messagebox.showinfo("First Run", "Welcome to BalanceTrack! Please select a folder where you want to store your database and application data.")
@@ -44,8 +44,27 @@ def select_db_location():
     root.destroy()
     return folder_selected
 
+HOST = '127.0.0.1'
+PORT = 5555
+READY_TIMEOUT = 30
+
 def run_flask(app):
-    app.run(host='127.0.0.1', port=5555, debug=False, use_reloader=False)
+    # Serves on a background thread with the configured SERVER_MODE
+    from app.serving import AppServer
+    return AppServer(app, HOST, PORT).start()
+
+def wait_until_ready(timeout=READY_TIMEOUT, interval=0.05):
+    # Poll the readiness probe instead of sleeping a fixed time
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://{HOST}:{PORT}/healthz', timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            pass
+        time.sleep(interval)
+    return False
 
 if __name__ == '__main__':
     config = get_config()
@@ -60,19 +79,24 @@ if __name__ == '__main__':
     db_path = os.path.join(config['db_path'], 'finance.db')
     os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
     
+    # Creates/upgrades the database in the chosen location on first run
     app = create_app()
     
-    # Initialize DB in the new location if it doesn't exist
-    with app.app_context():
-        db.create_all()
-    
     # Start Flask in a separate thread
-    flask_thread = threading.Thread(target=run_flask, args=(app,), daemon=True)
-    flask_thread.start()
+    server = run_flask(app)
+    
+    # Loading the webview toolkit overlaps with the server starting up
+    import webview
     
     # Wait for Flask to start
-    time.sleep(2)
+    if not wait_until_ready():
+        from tkinter import messagebox
+        messagebox.showerror("BalanceTrack", "The application server did not start.")
+        sys.exit(1)
     
     # Launch Webview
-    window = webview.create_window('BalanceTrack', 'http://127.0.0.1:5555', width=1280, height=800, min_size=(1024, 768))
+    window = webview.create_window('BalanceTrack', f'http://{HOST}:{PORT}', width=1280, height=800, min_size=(1024, 768))
     webview.start()
+    
+    # The window was closed: finish in-flight requests before exiting
+    server.stop()
@@ -0,0 +1,52 @@
+"""Add indexes for the hot query paths
+
+Revision ID: 3c9d2e7a41b5
+Revises: 62f056b867ab
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9d2e7a41b5'
+down_revision = '62f056b867ab'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) - kept in sync with the Index/index=True
+# declarations in app/models.py
+INDEXES = [
+    ('ix_profile_is_active', 'profile', ['is_active']),
+    ('ix_account_profile_id', 'account', ['profile_id']),
+    ('ix_category_profile_id', 'category', ['profile_id']),
+    ('ix_category_parent_id', 'category', ['parent_id']),
+    ('ix_budget_profile_id', 'budget', ['profile_id']),
+    ('ix_loan_profile_id', 'loan', ['profile_id']),
+    ('ix_investment_profile_id', 'investment', ['profile_id']),
+    ('ix_transaction_date_id', 'transaction', ['date', 'id']),
+    ('ix_transaction_account_date', 'transaction', ['account_id', 'date']),
+    ('ix_transaction_category_date', 'transaction', ['category_id', 'date']),
+    ('ix_transaction_type_date', 'transaction', ['transaction_type', 'date']),
+    ('ix_transaction_transfer_to', 'transaction', ['transfer_to_account_id']),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, columns in INDEXES:
+        # Databases created by older builds may predate the profile_id columns
+        if table not in tables:
+            continue
+        existing = {c['name'] for c in inspector.get_columns(table)}
+        if set(columns) <= existing:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+    op.execute('ANALYZE')
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,40 @@
+"""Add opening_balance to account
+
+Revision ID: 8f1a6b2d5c07
+Revises: 3c9d2e7a41b5
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f1a6b2d5c07'
+down_revision = '3c9d2e7a41b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'opening_balance' in [c['name'] for c in inspector.get_columns('account')]:
+        return
+    with op.batch_alter_table('account', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('opening_balance', sa.Float(), nullable=True, server_default='0.0'))
+
+    # Opening balance = current balance minus everything the history applied
+    op.execute("""
+        UPDATE account SET opening_balance = COALESCE(balance, 0) - COALESCE((
+            SELECT SUM(CASE WHEN t.transaction_type IN ('Expense', 'Transfer') THEN -t.amount ELSE t.amount END)
+            FROM "transaction" t WHERE t.account_id = account.id
+        ), 0) - COALESCE((
+            SELECT SUM(t.amount) FROM "transaction" t
+            WHERE t.transaction_type = 'Transfer' AND t.transfer_to_account_id = account.id
+        ), 0)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('account', schema=None) as batch_op:
+        batch_op.drop_column('opening_balance')
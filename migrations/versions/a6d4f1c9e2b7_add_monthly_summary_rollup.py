@@ -0,0 +1,63 @@
+"""Add monthly_summary rollup table
+
+Revision ID: a6d4f1c9e2b7
+Revises: b4e2f9c1d8a3
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d4f1c9e2b7'
+down_revision = 'b4e2f9c1d8a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    if 'monthly_summary' in tables:
+        return
+    # The profile table comes from the bootstrap, not from a revision
+    constraints = [sa.ForeignKeyConstraint(['profile_id'], ['profile.id'], )] if 'profile' in tables else []
+    # total is stored like transaction.amount: floats until d7c3a9e5f2b1
+    # converts both to integer cents
+    amount = next(c['type'] for c in inspector.get_columns('transaction') if c['name'] == 'amount')
+    total_type = sa.Integer() if isinstance(amount, sa.Integer) else sa.Float()
+    op.create_table('monthly_summary',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('transaction_type', sa.String(length=20), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('total', total_type, nullable=False),
+    sa.Column('tx_count', sa.Integer(), nullable=False),
+    *constraints,
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('profile_id', 'account_id', 'category_id', 'transaction_type', 'year', 'month',
+                        name='uq_monthly_summary_key')
+    )
+
+    # Same aggregation as app.services.rollup_service.rebuild; databases
+    # without profiles yet are backfilled by the bootstrap instead
+    if 'profile_id' not in [c['name'] for c in inspector.get_columns('account')]:
+        return
+    op.execute(
+        'INSERT INTO monthly_summary (profile_id, account_id, category_id, transaction_type, year, month, '
+        'total, tx_count) '
+        "SELECT a.profile_id, t.account_id, COALESCE(NULLIF(t.category_id, ''), 0), "
+        "COALESCE(t.transaction_type, ''), CAST(strftime('%Y', t.date) AS INTEGER), "
+        "CAST(strftime('%m', t.date) AS INTEGER), SUM(t.amount), COUNT(t.id) "
+        'FROM "transaction" t JOIN account a ON t.account_id = a.id '
+        'WHERE a.profile_id IS NOT NULL '
+        'GROUP BY 1, 2, 3, 4, 5, 6'
+    )
+
+
+def downgrade():
+    op.drop_table('monthly_summary')
@@ -0,0 +1,34 @@
+"""Add transaction fingerprint for duplicate detection
+
+Revision ID: b4e2f9c1d8a3
+Revises: 8f1a6b2d5c07
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e2f9c1d8a3'
+down_revision = '8f1a6b2d5c07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows are fingerprinted by the app on its next start
+    # (dedup_service.backfill_fingerprints), which needs the Python normalizer
+    inspector = sa.inspect(op.get_bind())
+    if 'fingerprint' not in [c['name'] for c in inspector.get_columns('transaction')]:
+        with op.batch_alter_table('transaction', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('fingerprint', sa.String(length=16), nullable=True))
+    op.create_index('ix_transaction_fingerprint', 'transaction', ['fingerprint'], if_not_exists=True)
+    op.create_index('ix_transaction_account_amount', 'transaction', ['account_id', 'amount'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_transaction_account_amount', table_name='transaction')
+    op.drop_index('ix_transaction_fingerprint', table_name='transaction')
+    with op.batch_alter_table('transaction', schema=None) as batch_op:
+        batch_op.drop_column('fingerprint')
@@ -0,0 +1,32 @@
+"""Add table_version stamps for cross-process cache invalidation
+
+Revision ID: c8e3a5f7d2b9
+Revises: f2a7d9c3b8e1
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e3a5f7d2b9'
+down_revision = 'f2a7d9c3b8e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'table_version' in inspector.get_table_names():
+        return
+    op.create_table('table_version',
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('writer', sa.String(length=32), nullable=True),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade():
+    op.drop_table('table_version')
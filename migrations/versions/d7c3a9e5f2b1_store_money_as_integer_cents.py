@@ -0,0 +1,56 @@
+"""Store money columns as integer cents
+
+Revision ID: d7c3a9e5f2b1
+Revises: a6d4f1c9e2b7
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7c3a9e5f2b1'
+down_revision = 'a6d4f1c9e2b7'
+branch_labels = None
+depends_on = None
+
+MONEY_COLUMNS = {
+    'account': ('balance', 'opening_balance'),
+    'transaction': ('amount',),
+    'budget': ('amount',),
+    'loan': ('total_amount', 'remaining_balance'),
+    'investment': ('principal_amount', 'current_value'),
+    'monthly_summary': ('total',),
+}
+
+
+def _columns(integer):
+    """(table, {column: declared type}) for money columns that are (not) integer yet."""
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for table, names in MONEY_COLUMNS.items():
+        if table not in tables:
+            continue
+        declared = {c['name']: c['type'] for c in inspector.get_columns(table)}
+        columns = {name: declared[name] for name in names
+                   if name in declared and isinstance(declared[name], sa.Integer) == integer}
+        if columns:
+            yield table, columns
+
+
+def upgrade():
+    for table, columns in list(_columns(integer=False)):
+        op.execute(f'UPDATE "{table}" SET ' + ', '.join(
+            f'"{name}" = CAST(ROUND("{name}" * 100) AS INTEGER)' for name in columns))
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, existing_type in columns.items():
+                batch_op.alter_column(name, type_=sa.Integer(), existing_type=existing_type)
+
+
+def downgrade():
+    for table, columns in list(_columns(integer=True)):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, existing_type in columns.items():
+                batch_op.alter_column(name, type_=sa.Float(), existing_type=existing_type)
+        op.execute(f'UPDATE "{table}" SET ' + ', '.join(f'"{name}" = "{name}" / 100.0' for name in columns))
@@ -0,0 +1,47 @@
+"""Add category closure table for subtree queries
+
+Revision ID: e5b8c2d4a6f3
+Revises: d7c3a9e5f2b1
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b8c2d4a6f3'
+down_revision = 'd7c3a9e5f2b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'category_closure' not in inspector.get_table_names():
+        op.create_table('category_closure',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+        )
+    op.create_index('ix_category_closure_descendant', 'category_closure', ['descendant_id', 'depth'],
+                    if_not_exists=True)
+
+    # Same walk as app.services.category_tree.rebuild
+    op.execute('DELETE FROM category_closure')
+    op.execute(
+        'INSERT INTO category_closure (ancestor_id, descendant_id, depth) '
+        'WITH RECURSIVE walk(ancestor_id, descendant_id, depth) AS ('
+        '  SELECT id, id, 0 FROM category'
+        '  UNION ALL'
+        '  SELECT walk.ancestor_id, category.id, walk.depth + 1 FROM category'
+        '  JOIN walk ON category.parent_id = walk.descendant_id'
+        '  WHERE walk.depth < (SELECT COUNT(*) FROM category)'
+        ') SELECT ancestor_id, descendant_id, MIN(depth) FROM walk GROUP BY ancestor_id, descendant_id'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_category_closure_descendant', table_name='category_closure')
+    op.drop_table('category_closure')
@@ -0,0 +1,54 @@
+"""Add exchange rate history and profile base currency
+
+Revision ID: f2a7d9c3b8e1
+Revises: e5b8c2d4a6f3
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a7d9c3b8e1'
+down_revision = 'e5b8c2d4a6f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    if 'exchange_rate' not in tables:
+        op.create_table('exchange_rate',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('currency_id', sa.Integer(), nullable=False),
+        sa.Column('rate', sa.Float(), nullable=False),
+        sa.Column('effective_from', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['currency_id'], ['currency.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('currency_id', 'effective_from', name='uq_exchange_rate_currency_from')
+        )
+    # The profile table comes from the bootstrap, which also adds the column
+    if 'profile' in tables and 'base_currency_id' not in [c['name'] for c in inspector.get_columns('profile')]:
+        with op.batch_alter_table('profile', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('base_currency_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_profile_base_currency_id', 'currency', ['base_currency_id'], ['id'])
+
+    # The current rates become the first entry of each currency's history
+    # (same as app.services.currency_service.seed_rate_history)
+    op.execute(
+        "INSERT INTO exchange_rate (currency_id, rate, effective_from) "
+        "SELECT id, COALESCE(exchange_rate, 1.0), '1970-01-01 00:00:00.000000' FROM currency "
+        "WHERE id NOT IN (SELECT currency_id FROM exchange_rate)"
+    )
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'profile' in inspector.get_table_names() and \
+            'base_currency_id' in [c['name'] for c in inspector.get_columns('profile')]:
+        # The batch rebuild drops the column's foreign key with it, whatever it is named
+        with op.batch_alter_table('profile', schema=None) as batch_op:
+            batch_op.drop_column('base_currency_id')
+    op.drop_table('exchange_rate')
@@ -0,0 +1,23 @@
+import argparse
+import sys
+
+from app.services.changelog import restore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild a BalanceTrack database from a full snapshot plus incremental deltas.")
+    parser.add_argument('snapshot', help="Full snapshot file (.db, .db.gz or .db.zst)")
+    parser.add_argument('deltas', nargs='*', help="Delta files (.jsonl.gz) taken against the snapshot")
+    parser.add_argument('-o', '--output', default='finance_restored.db', help="Path of the rebuilt database")
+    args = parser.parse_args()
+
+    try:
+        applied = restore(args.snapshot, args.deltas, args.output)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Restore failed: {e}")
+        sys.exit(1)
+    print(f"Restored {args.output} from {args.snapshot} and {applied} delta(s).")
+
+
+if __name__ == '__main__':
+    main()